@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Cassette de grabación / reproducción para el fetcher de los crawlers
+En modo record cada request que hace DJIFetcher (respuesta o error) se graba
+en un archivo JSONL comprimido; en modo replay se sirve desde ese archivo a
+máxima velocidad y sin red, así las corridas son deterministas y comparables.
+
+Cada sesión de grabación (un Cassette en modo record) abre con una marca en el
+archivo. Una URL grabada de nuevo en una sesión posterior reemplaza a su
+grabación anterior; las que no se volvieron a pedir (p.ej. un `continue`
+grabado después de un `restart`) conservan la suya.
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+
+import requests
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from dji_http_cache import SKIP_HEADERS
+
+DEFAULT_CASSETTE = os.environ.get('DJI_CASSETTE', 'dji_cassette.jsonl.gz')
+
+# Errores de red que se pueden grabar y reproducir
+ERROR_TYPES = {
+    'timeout': requests.exceptions.Timeout,
+    'connection': requests.exceptions.ConnectionError,
+    'request': requests.exceptions.RequestException,
+}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """La URL pedida en replay no está en el cassette"""
+
+
+class Cassette:
+    """Archivo de interacciones HTTP grabadas, indexadas por URL"""
+
+    def __init__(self, path=DEFAULT_CASSETTE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.interactions = defaultdict(deque)
+        self.last = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.session_started = False
+
+    # --- grabación ---------------------------------------------------------
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            if not self.session_started:
+                # Marca de sesión: lo que se graba desde acá tapa las grabaciones viejas de cada URL
+                line = json.dumps({'session': datetime.now().isoformat()}) + '\n' + line
+                self.session_started = True
+            # Cada append es un miembro gzip nuevo: el archivo sigue siendo válido
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line)
+            self.recorded += 1
+
+    def record_response(self, url, response):
+        self._append({
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS},
+            'body': base64.b64encode(response.content).decode('ascii'),
+        })
+
+    def record_error(self, url, error):
+        if isinstance(error, requests.exceptions.Timeout):
+            kind = 'timeout'
+        elif isinstance(error, requests.exceptions.ConnectionError):
+            kind = 'connection'
+        else:
+            kind = 'request'
+        self._append({'url': url, 'error': kind, 'message': str(error)[:300]})
+
+    # --- reproducción ------------------------------------------------------
+
+    def load(self):
+        """Cargar el cassette completo en memoria para replay
+
+        De cada URL quedan las interacciones de la última sesión que la grabó.
+        """
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette no encontrado: {self.path}")
+        session = 0
+        recorded_in = {}
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'session' in entry:
+                    session += 1
+                    continue
+                url = entry['url']
+                if recorded_in.get(url) != session:
+                    # Regrabada: la secuencia de la sesión anterior ya no vale
+                    self.interactions[url] = deque()
+                    recorded_in[url] = session
+                self.interactions[url].append(entry)
+        print(f"📼 Cassette cargado: {sum(len(q) for q in self.interactions.values())} interacciones, "
+              f"{len(self.interactions)} URLs")
+        return self
+
+    def next_entry(self, url):
+        """Siguiente interacción grabada para `url` (repite la última si se agotan)"""
+        with self.lock:
+            queue = self.interactions.get(url)
+            if queue:
+                entry = queue.popleft()
+                self.last[url] = entry
+            else:
+                entry = self.last.get(url)
+            if entry is not None:
+                self.replayed += 1
+        if entry is None:
+            raise CassetteMiss(f"URL no grabada en el cassette: {url}")
+        return entry
+
+    def replay(self, url):
+        """Devolver el Response grabado o relanzar el error grabado"""
+        entry = self.next_entry(url)
+        if 'error' in entry:
+            raise ERROR_TYPES.get(entry['error'], requests.exceptions.RequestException)(entry['message'])
+
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        response._content = base64.b64decode(entry['body'])
+        response.from_cassette = True
+        return response
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Escritura de checkpoints a prueba de cortes
+Todo archivo de estado se escribe en un temporal del mismo directorio, con
+fsync, y recién entonces se renombra sobre el original: un kill a mitad de
+camino deja el archivo viejo intacto. Los checkpoints que se leen al
+reanudar llevan además un sha256 del contenido y conservan la generación
+anterior (`<archivo>.prev`) para volver a ella si el último está dañado.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+
+MAGIC = b'DJICKPT1 '
+
+PREVIOUS_SUFFIX = '.prev'
+
+
+class CheckpointCorrupt(Exception):
+    """El checkpoint no pasa la verificación de integridad"""
+
+
+def previous_path(path):
+    return path + PREVIOUS_SUFFIX
+
+
+def fsync_directory(path):
+    """Persistir el rename en el directorio (no disponible en todos los sistemas)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data, keep_previous=False):
+    """Escribir `data` en `path` de forma atómica (temporal + fsync + rename)
+
+    Con keep_previous=True el archivo actual pasa a ser `<path>.prev`.
+    """
+    atomic_write_chunks(path, [data], keep_previous)
+
+
+def atomic_write_chunks(path, chunks, keep_previous=False):
+    """Como atomic_write_bytes, pero escribiendo los trozos a medida que se generan"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    if keep_previous and os.path.exists(path):
+        os.replace(path, previous_path(path))
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+
+def atomic_write_json(path, data):
+    atomic_write_bytes(path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+
+
+def atomic_write_json_stream(path, pairs):
+    """Escribir un objeto JSON a partir de pares (clave, valor) sin armarlo en memoria
+
+    Sirve para las vistas del store: se recorren fila por fila. El texto es
+    el mismo que daría atomic_write_json con el dict completo.
+    """
+    atomic_write_chunks(path, (chunk.encode('utf-8') for chunk in iter_json_object(pairs)))
+
+
+def iter_json_object(pairs, level=0):
+    """Trozos de json.dumps(dict(pairs), indent=2); los valores iteradores van como listas"""
+    inner = '\n' + '  ' * (level + 1)
+    empty = True
+    for key, value in pairs:
+        yield ('{' if empty else ',') + inner + json.dumps(key, ensure_ascii=False) + ': '
+        yield from iter_json_value(value, level + 1)
+        empty = False
+    yield '{}' if empty else '\n' + '  ' * level + '}'
+
+
+def iter_json_array(values, level):
+    inner = '\n' + '  ' * (level + 1)
+    empty = True
+    for value in values:
+        yield ('[' if empty else ',') + inner
+        yield from iter_json_value(value, level + 1)
+        empty = False
+    yield '[]' if empty else '\n' + '  ' * level + ']'
+
+
+def iter_json_value(value, level):
+    if isinstance(value, Iterator):
+        yield from iter_json_array(value, level)
+    else:
+        # Los saltos de línea de json.dumps son solo de estructura: se corren al nivel actual
+        yield json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * level)
+
+
+def dump_checksummed(path, payload):
+    """Guardar `payload` con encabezado y sha256, rotando la generación anterior"""
+    digest = hashlib.sha256(payload).hexdigest().encode('ascii')
+    atomic_write_bytes(path, MAGIC + digest + b'\n' + payload, keep_previous=True)
+
+
+def load_checksummed(path):
+    """Leer un checkpoint y verificar su sha256; devuelve el payload
+
+    Los archivos sin encabezado (checkpoints de antes de este formato) se
+    devuelven tal cual: no hay con qué verificarlos.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        return data
+    header, _, payload = data.partition(b'\n')
+    expected = header[len(MAGIC):].decode('ascii', 'replace')
+    if hashlib.sha256(payload).hexdigest() != expected:
+        raise CheckpointCorrupt(f"sha256 no coincide en {path}")
+    return payload
+
+
+def load_with_fallback(path, decode):
+    """Cargar `path` o, si falta o está dañado, su generación anterior
+
+    `decode(payload)` convierte los bytes verificados (p.ej. pickle.loads);
+    cualquier excepción al decodificar cuenta como corrupción. Devuelve
+    (valor, ruta usada) o (None, None) si no hay ninguna generación válida.
+    """
+    for candidate in (path, previous_path(path)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            value = decode(load_checksummed(candidate))
+        except Exception as e:
+            print(f"⚠️ Checkpoint dañado {candidate}: {e}")
+            continue
+        if candidate != path:
+            print(f"♻️ Usando la generación anterior del checkpoint: {candidate}")
+        return value, candidate
+    return None, None
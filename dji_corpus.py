@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Corpus comprimido y segmentado de páginas crawleadas
+Cada página es un registro JSON (URL, título, tipo, métodos y texto) que se
+comprime como un miembro gzip independiente y se agrega al segmento en
+curso; al pasar SEGMENT_MAX_BYTES se abre el siguiente. Un índice TSV al
+lado registra URL, segmento, offset y largo de cada registro, así cualquier
+página se lee descomprimiendo solo sus bytes. Los segmentos siguen siendo
+gzip válidos: `zcat corpus.000001.jsonl.gz` da el JSONL completo.
+
+Para el crawler el corpus es un sink más: su offset es el largo del índice
+y al reanudar se trunca índice y segmento hasta el último registro que el
+checkpoint confirmó.
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+
+DEFAULT_CORPUS_DIR = os.environ.get('DJI_CORPUS_DIR', 'dji_corpus')
+
+# Tamaño (comprimido) a partir del cual se abre un segmento nuevo
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+
+# Buffer de escritura de segmento e índice (se vacía en cada checkpoint)
+CORPUS_BUFFER_BYTES = 1024 * 1024
+
+INDEX_NAME = 'index.tsv'
+SEGMENT_PATTERN = re.compile(r'corpus\.(\d{6})\.jsonl\.gz$')
+
+
+def segment_name(seq):
+    return f"corpus.{seq:06d}.jsonl.gz"
+
+
+def parse_index_line(line):
+    """'url\\tsegmento\\toffset\\tlargo' -> (url, (segmento, offset, largo)); None si está cortada"""
+    parts = line.rstrip('\n').split('\t')
+    if len(parts) != 4 or not line.endswith('\n'):
+        return None
+    url, seq, offset, length = parts
+    return url, (int(seq), int(offset), int(length))
+
+
+def load_corpus_index(directory=DEFAULT_CORPUS_DIR):
+    """URL -> (segmento, offset, largo); si una URL se escribió dos veces gana la última"""
+    index = {}
+    path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(path):
+        return index
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = parse_index_line(line)
+            if entry is not None:
+                index[entry[0]] = entry[1]
+    return index
+
+
+def read_corpus_record(directory, location):
+    """Leer y descomprimir un solo registro a partir de su (segmento, offset, largo)"""
+    seq, offset, length = location
+    with open(os.path.join(directory, segment_name(seq)), 'rb') as f:
+        f.seek(offset)
+        return json.loads(gzip.decompress(f.read(length)))
+
+
+class CorpusWriter:
+    """Segmentos JSONL gzip + índice por URL, con la interfaz de un TextSink"""
+
+    def __init__(self, directory=DEFAULT_CORPUS_DIR, segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        # Para OutputSinks el corpus se identifica por su índice
+        self.path = os.path.join(directory, INDEX_NAME)
+        self.offset = 0                   # bytes del índice, incluido lo que está en buffer
+        self.seq = None
+        self.segment_bytes = 0
+        self.segment = None
+        self.index = None
+        self.records = 0
+        self.raw_bytes = 0
+
+    def segments(self):
+        """Números de segmento existentes, en orden"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(match.group(1)) for match in map(SEGMENT_PATTERN.match, os.listdir(self.directory))
+                      if match)
+
+    def segment_path(self, seq):
+        return os.path.join(self.directory, segment_name(seq))
+
+    def open(self):
+        """Abrir índice y último segmento para seguir agregando"""
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.segments()
+        self.seq = existing[-1] if existing else 1
+        self.open_segment()
+        self.index = open(self.path, 'ab', buffering=CORPUS_BUFFER_BYTES)
+        self.offset = self.index.tell()
+
+    def open_segment(self):
+        path = self.segment_path(self.seq)
+        self.segment_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+        self.segment = open(path, 'ab', buffering=CORPUS_BUFFER_BYTES)
+
+    def reset(self, header=''):
+        """Empezar el corpus de cero (el encabezado de los reportes no aplica)"""
+        self.remove_files()
+        self.open()
+
+    def add(self, record):
+        """Agregar un registro; devuelve su (segmento, offset, largo)"""
+        if self.index is None:
+            self.open()
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        # mtime=0: el mismo registro produce siempre los mismos bytes
+        member = gzip.compress(line, mtime=0)
+        if self.segment_bytes and self.segment_bytes + len(member) > self.segment_max_bytes:
+            self.segment.close()
+            self.seq += 1
+            self.open_segment()
+
+        location = (self.seq, self.segment_bytes, len(member))
+        self.segment.write(member)
+        self.segment_bytes += len(member)
+
+        entry = f"{record['url']}\t{location[0]}\t{location[1]}\t{location[2]}\n".encode('utf-8')
+        self.index.write(entry)
+        self.offset += len(entry)
+        self.records += 1
+        self.raw_bytes += len(line)
+        return location
+
+    def flush(self):
+        # Primero los datos: el índice nunca apunta más allá de lo escrito
+        if self.segment is not None:
+            self.segment.flush()
+        if self.index is not None:
+            self.index.flush()
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def size(self):
+        """Bytes del índice en disco; -1 si falta el índice o algún segmento que cita"""
+        if not os.path.exists(self.path):
+            return -1
+        existing = set(self.segments())
+        for seq, _, _ in load_corpus_index(self.directory).values():
+            if seq not in existing:
+                return -1
+        return os.path.getsize(self.path)
+
+    def truncate(self, offset):
+        """Volver al estado con `offset` bytes de índice: recorta el último segmento y borra los siguientes"""
+        self.close()
+        with open(self.path, 'r+b') as f:
+            prefix = f.read(offset)
+            f.truncate(offset)
+
+        last = None
+        for line in prefix.decode('utf-8').splitlines(keepends=True):
+            last = parse_index_line(line) or last
+        seq, end = (last[1][0], last[1][1] + last[1][2]) if last else (1, 0)
+        for old in self.segments():
+            if old > seq:
+                os.remove(self.segment_path(old))
+            elif old == seq:
+                with open(self.segment_path(old), 'r+b') as f:
+                    f.truncate(end)
+        self.offset = offset
+
+    def remove_files(self):
+        """Borrar segmentos e índice (restart)"""
+        self.close()
+        for seq in self.segments():
+            os.remove(self.segment_path(seq))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.offset = 0
+        self.records = 0
+        self.raw_bytes = 0
+
+    def stats(self):
+        """Registros, bytes comprimidos en disco y bytes JSON de lo escrito en esta sesión"""
+        self.flush()
+        return {
+            'segments': len(self.segments()),
+            'records': self.records,
+            'disk_bytes': sum(os.path.getsize(self.segment_path(seq)) for seq in self.segments()),
+            'raw_bytes': self.raw_bytes
+        }
+
+
+def main():
+    args = sys.argv[1:]
+    directory = args[0] if args else DEFAULT_CORPUS_DIR
+    index = load_corpus_index(directory)
+    if not index:
+        print(f"❌ No hay corpus en {directory}")
+        return
+
+    if len(args) > 1:
+        location = index.get(args[1])
+        if location is None:
+            print(f"❌ {args[1]} no está en el corpus")
+            return
+        record = read_corpus_record(directory, location)
+        print(f"📄 {record['title']} ({record.get('component_type')}) - {len(record['methods'])} métodos")
+        print(record['text'])
+        return
+
+    writer = CorpusWriter(directory)
+    disk = sum(os.path.getsize(writer.segment_path(seq)) for seq in writer.segments())
+    print(f"📚 Corpus {directory}: {len(index)} páginas en {len(writer.segments())} segmentos, "
+          f"{disk / 1024:.1f} KB comprimidos (índice {os.path.getsize(writer.path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
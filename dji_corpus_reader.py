@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Lectura con acceso directo de las salidas de los crawlers
+Cada archivo se mapea en memoria (mmap) y se consulta con un índice de
+offsets por URL: la búsqueda es un acceso a diccionario y la página se
+devuelve como memoryview sobre el mapa, sin copiar ni leer el resto del
+archivo. Sirve igual con un corpus de una versión del SDK que con varias.
+
+Formatos:
+- Reportes de texto (dji_docs_COMPLETO.txt, dji_docs_full_content.txt,
+  dji_media_manager_info.txt...): las páginas empiezan en las líneas
+  `URL:` / `🔗 URL:`. El índice se arma recorriendo el archivo una vez y se
+  guarda al lado (`<archivo>.idx`); se reconstruye solo si el archivo cambió.
+- Análisis JSON (mediamanager_analysis_*.json): el índice apunta al literal
+  de `full_text` de cada `url`; solo ese literal se decodifica.
+- Corpus comprimido (directorio de CorpusWriter): usa el index.tsv que se
+  escribió junto con el corpus; se descomprime solo el registro pedido.
+"""
+
+import abc
+import bisect
+import gzip
+import json
+import mmap
+import os
+import re
+import sys
+
+from dji_checkpoint_io import atomic_write_bytes
+from dji_corpus import INDEX_NAME, load_corpus_index, segment_name
+
+INDEX_SUFFIX = '.idx'
+
+# Línea de URL que abre cada página en los reportes de texto
+URL_LINE = re.compile(rb'^(?:\xf0\x9f\x94\x97 )?URL: (\S+)[ \t]*\r?$', re.MULTILINE)
+
+# Línea separadora (===... o ---...) que encabeza una página
+SEPARATOR_LINE = re.compile(rb'^(?:=+|-+)\r?$')
+
+# Claves de los análisis JSON (json.dump con ensure_ascii=False: los bytes son UTF-8)
+JSON_URL = re.compile(rb'"url":\s*"((?:[^"\\]|\\.)*)"')
+JSON_FULL_TEXT = re.compile(rb'"full_text":\s*("(?:[^"\\]|\\.)*")', re.DOTALL)
+
+
+def map_file(path):
+    """mmap de solo lectura; None si el archivo está vacío (mmap no acepta largo 0)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedFile(abc.ABC):
+    """Base: archivo mapeado + índice URL -> (inicio, fin) cacheado en `<archivo>.idx`"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.map = map_file(path)
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Cerrar el mapa (las memoryview devueltas tienen que estar liberadas)"""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self.load_index()
+            if self._index is None:
+                self._index = self.build_index()
+                self.save_index(self._index)
+        return self._index
+
+    def signature(self):
+        stat = os.stat(self.path)
+        return f"#{stat.st_size}\t{stat.st_mtime_ns}"
+
+    def load_index(self):
+        """Índice guardado, o None si falta o es de otra versión del archivo"""
+        if not os.path.exists(self.index_path):
+            return None
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            if f.readline().rstrip('\n') != self.signature():
+                return None
+            index = {}
+            for line in f:
+                url, start, end = line.rstrip('\n').split('\t')
+                index[url] = (int(start), int(end))
+        return index
+
+    def save_index(self, index):
+        lines = [self.signature()] + [f"{url}\t{start}\t{end}" for url, (start, end) in index.items()]
+        try:
+            atomic_write_bytes(self.index_path, ('\n'.join(lines) + '\n').encode('utf-8'))
+        except OSError as e:
+            # Directorio de solo lectura: el índice queda solo en memoria
+            print(f"⚠️ No se pudo guardar {self.index_path}: {e}")
+
+    @abc.abstractmethod
+    def build_index(self):
+        """Recorrer el archivo mapeado y devolver URL -> (inicio, fin)"""
+
+    def urls(self):
+        return list(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def page(self, url):
+        """Bytes de la página como memoryview sobre el mapa (sin copia); None si no está"""
+        span = self.index.get(url)
+        if span is None:
+            return None
+        return memoryview(self.map)[span[0]:span[1]]
+
+    def text(self, url):
+        view = self.page(url)
+        if view is None:
+            return None
+        with view:
+            return self.decode(view)
+
+    def decode(self, view):
+        return str(view, 'utf-8')
+
+
+class MappedTextReport(MappedFile):
+    """Reporte de texto con secciones por página que empiezan en una línea `URL:`"""
+
+    def line_start(self, pos):
+        return self.map.rfind(b'\n', 0, pos) + 1
+
+    def header_start(self, url_start):
+        """Inicio del encabezado de la página: el separador de arriba
+
+        En v4 entre el separador y la URL está `PÁGINA n: título` (y a veces
+        una línea con el resto del título); una línea vacía corta la búsqueda.
+        """
+        start = url_start
+        for _ in range(3):
+            if start == 0:
+                break
+            previous = self.line_start(start - 1)
+            line = self.map[previous:start - 1]
+            if SEPARATOR_LINE.match(line):
+                return previous
+            if not line:
+                break
+            start = previous
+        return url_start
+
+    def build_index(self):
+        if self.map is None:
+            return {}
+        starts = [(match.group(1).decode('utf-8'), self.header_start(match.start()))
+                  for match in URL_LINE.finditer(self.map)]
+        index = {}
+        for i, (url, start) in enumerate(starts):
+            end = starts[i + 1][1] if i + 1 < len(starts) else len(self.map)
+            # Si una URL aparece dos veces gana la última (p.ej. un refresh)
+            index[url] = (start, end)
+        return index
+
+
+class MappedAnalysisJSON(MappedFile):
+    """Análisis JSON (mediamanager_analysis_*.json): el texto es el literal `full_text` de cada `url`"""
+
+    def build_index(self):
+        if self.map is None:
+            return {}
+        matches = list(JSON_URL.finditer(self.map))
+        positions = [match.start() for match in matches]
+        index = {}
+        for match in JSON_FULL_TEXT.finditer(self.map):
+            # El full_text es de la última `url` que aparece antes
+            owner = bisect.bisect_left(positions, match.start()) - 1
+            if owner >= 0:
+                url = json.loads(b'"' + matches[owner].group(1) + b'"')
+                index[url] = match.span(1)
+        return index
+
+    def decode(self, view):
+        # La vista es el literal JSON (con comillas y escapes): solo ese trozo se decodifica
+        return json.loads(bytes(view))
+
+
+class MappedCorpus:
+    """Corpus de CorpusWriter: segmentos mapeados + index.tsv escrito durante el crawl"""
+
+    def __init__(self, directory):
+        self.path = directory
+        self.index = load_corpus_index(directory)
+        self.maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for segment in self.maps.values():
+            if segment is not None:
+                segment.close()
+        self.maps = {}
+
+    def urls(self):
+        return list(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def page(self, url):
+        """Miembro gzip comprimido del registro, como memoryview sobre el segmento"""
+        location = self.index.get(url)
+        if location is None:
+            return None
+        seq, offset, length = location
+        if seq not in self.maps:
+            path = os.path.join(self.path, segment_name(seq))
+            self.maps[seq] = map_file(path) if os.path.exists(path) else None
+        segment = self.maps[seq]
+        # Segmento vacío, faltante o recortado (corte antes del flush): el registro no está
+        if segment is None or offset + length > len(segment):
+            return None
+        return memoryview(segment)[offset:offset + length]
+
+    def record(self, url):
+        view = self.page(url)
+        if view is None:
+            return None
+        with view:
+            return json.loads(gzip.decompress(view))
+
+    def text(self, url):
+        record = self.record(url)
+        return record['text'] if record is not None else None
+
+
+def open_mapped(path):
+    """Lector adecuado según el tipo de salida"""
+    if os.path.isdir(path):
+        if not os.path.exists(os.path.join(path, INDEX_NAME)):
+            raise ValueError(f"{path} no es un corpus ({INDEX_NAME} no encontrado)")
+        return MappedCorpus(path)
+    if path.endswith('.json'):
+        return MappedAnalysisJSON(path)
+    return MappedTextReport(path)
+
+
+class CorpusReader:
+    """Consulta por URL sobre varias salidas a la vez (reportes, análisis JSON, corpus)
+
+    Si una URL está en más de una, gana la última de `paths`.
+    """
+
+    def __init__(self, paths):
+        self.readers = [open_mapped(path) for path in paths]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for reader in self.readers:
+            reader.close()
+
+    def reader_for(self, url):
+        for reader in reversed(self.readers):
+            if url in reader:
+                return reader
+        return None
+
+    def urls(self):
+        return list(dict.fromkeys(url for reader in self.readers for url in reader.urls()))
+
+    def resolve(self, name):
+        """URL exacta, o las que terminan en `/name` o `/name.html` (p.ej. DJIMediaManager)"""
+        urls = self.urls()
+        if name in urls:
+            return [name]
+        return [url for url in urls if url.endswith('/' + name) or url.endswith('/' + name + '.html')]
+
+    def page(self, url):
+        reader = self.reader_for(url)
+        return reader.page(url) if reader is not None else None
+
+    def text(self, url):
+        reader = self.reader_for(url)
+        return reader.text(url) if reader is not None else None
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print("Uso: python dji_corpus_reader.py ARCHIVO|CORPUS_DIR [...] [URL|Clase]")
+        print("     (sin URL lista las páginas indexadas)")
+        return
+
+    paths = [arg for arg in args if os.path.exists(arg)]
+    names = [arg for arg in args if not os.path.exists(arg)]
+    with CorpusReader(paths) as reader:
+        if not names:
+            for path, mapped in zip(paths, reader.readers):
+                print(f"📚 {path}: {len(mapped.urls())} páginas")
+                for url in mapped.urls():
+                    print(f"   {url}")
+            return
+
+        for name in names:
+            urls = reader.resolve(name)
+            if not urls:
+                print(f"❌ {name} no está en {', '.join(paths)}")
+            for url in urls:
+                print(reader.text(url))
+
+
+if __name__ == "__main__":
+    main()
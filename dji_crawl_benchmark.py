@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de crawlers DJI sobre un cassette grabado
+Reproduce el mismo tráfico (DJI_FETCH_MODE=replay) para DJIDocsCrawlerV3,
+DJISpecificCrawler y crawl_deep, cada uno en un directorio temporal, y mide
+tiempo y páginas por segundo sin depender de developer.dji.com.
+
+Grabar primero el cassette con cualquiera de los crawlers:
+    DJI_FETCH_MODE=record DJI_CASSETTE=dji_cassette.jsonl.gz python dji_docs_crawler_v3.py restart
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_v3(base_url):
+    from urllib.parse import urljoin
+    from dji_docs_crawler_v3 import DJIDocsCrawlerV3, DEFAULT_BASE_URL
+    base_url = base_url or DEFAULT_BASE_URL
+    crawler = DJIDocsCrawlerV3(base_url)
+    crawler.start_crawl(urljoin(base_url, 'index.html'))
+    return len(crawler.all_docs)
+
+
+def run_v4(base_url):
+    from dji_crawler_v4 import DJISpecificCrawler
+    shutil.copy(os.path.join(REPO_DIR, 'dji_known_urls.txt'), 'dji_known_urls.txt')
+    crawler = DJISpecificCrawler()
+    crawler.crawl_all()
+    return crawler.page_count
+
+
+def run_deep(base_url):
+    from fetchmedia_scheduler_crawler import FetchMediaTaskSchedulerCrawler
+    crawler = FetchMediaTaskSchedulerCrawler()
+    crawler.crawl_deep(crawler.base_url, max_depth=2)
+    return len(crawler.all_content)
+
+
+CRAWLERS = {
+    'v3': ('DJIDocsCrawlerV3', run_v3),
+    'v4': ('DJISpecificCrawler', run_v4),
+    'deep': ('crawl_deep', run_deep),
+}
+
+
+def run_once(runner, base_url):
+    """Correr un crawler en un directorio limpio con la salida silenciada"""
+    workdir = tempfile.mkdtemp(prefix='dji_bench_')
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages = runner(base_url)
+        return pages, time.perf_counter() - started
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def pop_option(args, name, default, cast=str):
+    if name in args:
+        i = args.index(name)
+        value = cast(args[i + 1])
+        del args[i:i + 2]
+        return value
+    return default
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = pop_option(args, '--repeat', 3, int)
+    names = pop_option(args, '--crawlers', ','.join(CRAWLERS)).split(',')
+    base_url = pop_option(args, '--base-url', None)
+    if not args:
+        print("Uso: python dji_crawl_benchmark.py CASSETTE [--repeat N] [--crawlers v3,v4,deep] [--base-url URL]")
+        return
+
+    cassette = os.path.abspath(args[0])
+    if not os.path.exists(cassette):
+        print(f"❌ Cassette no encontrado: {cassette}")
+        return
+
+    # Todos los DJIFetcher que se creen a partir de acá sirven desde el cassette
+    os.environ['DJI_FETCH_MODE'] = 'replay'
+    os.environ['DJI_CASSETTE'] = cassette
+    sys.path.insert(0, REPO_DIR)
+
+    print(f"⏱️ BENCHMARK EN REPLAY: {cassette}")
+    print("=" * 60)
+    for name in names:
+        label, runner = CRAWLERS[name]
+        times = []
+        for _ in range(repeat):
+            pages, seconds = run_once(runner, base_url)
+            times.append(seconds)
+        best = min(times)
+        rate = pages / best if best else 0
+        print(f"{label:<22} {pages:>5} páginas  mejor {best:.2f}s  mediana {statistics.median(times):.2f}s  "
+              f"{rate:.1f} páginas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Checkpoint incremental: snapshot + journal append-only
+Cada cambio de estado del crawl (página registrada, links encolados, fallo,
+lote terminado) se agrega como una línea JSON al segmento de journal en
+curso, así guardar progreso cuesta lo mismo con 50 que con 50.000 páginas.
+Cuando el journal crece tanto como el último snapshot se compacta: se abre
+un segmento nuevo y, en un hilo aparte, se escribe el snapshot completo y se
+borran los segmentos que ya quedaron cubiertos.
+
+Al reanudar: snapshot + replay de los segmentos desde `journal_seq`. El
+snapshot se escribe con sha256 y conserva la generación anterior; los
+segmentos que ella necesita no se borran hasta la compactación siguiente,
+así volver a la generación anterior no pierde operaciones.
+
+Cada flush cierra un grupo de operaciones con una marca {"op": "commit"}:
+el replay solo aplica grupos confirmados. Lo que el buffer del archivo bajó
+a disco antes de tiempo (sin su commit) se descarta, así el journal nunca
+queda adelante de los reportes que se vacían en el mismo checkpoint.
+"""
+
+import json
+import os
+import pickle
+import re
+import threading
+
+from dji_checkpoint_io import atomic_write_json, dump_checksummed, load_with_fallback, previous_path
+
+# No compactar por debajo de este tamaño de journal (ni aunque el snapshot sea chico)
+COMPACT_MIN_BYTES = 4 * 1024 * 1024
+
+
+class PageMethods:
+    """Métodos de todas las páginas como lista plana de solo lectura, agrupados por URL
+
+    Es el all_methods del backend journal (StoredMethods en el store): cada
+    página es dueña de sus métodos, así un refresh reemplaza los de su URL sin
+    tocar los de otra que comparta nombres. `unowned` son los de snapshots
+    viejos que no se pudieron asignar a una página.
+    """
+
+    def __init__(self, pages=None, unowned=()):
+        self.pages = dict(pages or {})
+        self.unowned = list(unowned)
+
+    @classmethod
+    def from_flat(cls, docs, methods):
+        """Snapshot viejo (lista plana): se reparte según methods_count en el orden de all_docs
+
+        Vale si la lista se armó con un extend por página; si los totales no
+        cierran los métodos quedan sin dueño.
+        """
+        counts = [(url, doc.get('methods_count', 0)) for url, doc in docs.items()]
+        if sum(count for _, count in counts) != len(methods):
+            return cls(unowned=methods)
+        pages = {}
+        start = 0
+        for url, count in counts:
+            pages[url] = methods[start:start + count]
+            start += count
+        return cls(pages)
+
+    def set(self, url, methods):
+        """Métodos (nuevos) de una página: van al final, como el extend de un registro nuevo"""
+        self.pages.pop(url, None)
+        self.pages[url] = list(methods)
+
+    def __len__(self):
+        return len(self.unowned) + sum(len(methods) for methods in self.pages.values())
+
+    def __iter__(self):
+        yield from self.unowned
+        for methods in self.pages.values():
+            yield from methods
+
+    def copy(self):
+        # Las listas no se modifican en el lugar (set las reemplaza): alcanza con copiar el dict
+        return PageMethods(self.pages, self.unowned)
+
+
+class CrawlJournal:
+    """Snapshot pickle + segmentos JSONL numerados"""
+
+    def __init__(self, snapshot_file, journal_file, compact_min_bytes=COMPACT_MIN_BYTES):
+        self.snapshot_file = snapshot_file
+        self.journal_root, self.journal_ext = os.path.splitext(journal_file)
+        self.segment_pattern = re.compile(
+            re.escape(os.path.basename(self.journal_root)) + r'\.(\d{6})' + re.escape(self.journal_ext) + '$')
+        self.compact_min_bytes = compact_min_bytes
+
+        self.handle = None
+        self.seq = None
+        self.base_seq = 1                 # primer segmento que cubre el snapshot
+        self.journal_bytes = 0            # escrito desde el último snapshot
+        self.uncommitted = 0              # operaciones desde el último commit
+        self.snapshot_bytes = os.path.getsize(snapshot_file) if os.path.exists(snapshot_file) else 0
+        self.worker = None
+        self.compactions = 0
+
+    def segment_path(self, seq):
+        return f"{self.journal_root}.{seq:06d}{self.journal_ext}"
+
+    def segments(self):
+        """Números de segmento existentes, en orden"""
+        directory = os.path.dirname(self.journal_root) or '.'
+        seqs = []
+        for name in os.listdir(directory):
+            match = self.segment_pattern.match(name)
+            if match:
+                seqs.append(int(match.group(1)))
+        return sorted(seqs)
+
+    # --- lectura ----------------------------------------------------------
+
+    def load_snapshot(self):
+        """Último snapshot válido (o el anterior si está dañado); None si no hay"""
+        state, path = load_with_fallback(self.snapshot_file, pickle.loads)
+        if state is None:
+            if self.segments() and self.segments()[0] > 1:
+                print(f"❌ Ninguna generación de {self.snapshot_file} es válida: "
+                      f"solo se reproduce el journal que queda")
+            return None
+        self.base_seq = state.get('journal_seq', 1)
+        return state
+
+    def replay(self):
+        """Operaciones confirmadas posteriores al snapshot, en el orden en que se escribieron"""
+        for seq in self.segments():
+            if seq < self.base_seq:
+                continue
+            group = []
+            committed = False
+            with open(self.segment_path(seq), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        # Línea cortada por un corte abrupto: es la última, se ignora
+                        break
+                    # Lo reproducido también cuenta para la próxima compactación
+                    self.journal_bytes += len(line)
+                    if op['op'] == 'commit':
+                        committed = True
+                        yield from group
+                        group = []
+                    else:
+                        group.append(op)
+            if not committed:
+                # Segmento de antes de las marcas de commit: vale todo lo legible
+                yield from group
+
+    # --- escritura --------------------------------------------------------
+
+    def append(self, op):
+        if self.handle is None:
+            self.open_segment()
+        line = json.dumps(op, ensure_ascii=False) + '\n'
+        self.handle.write(line)
+        self.journal_bytes += len(line)
+        self.uncommitted += 1
+
+    def open_segment(self):
+        """Empezar un segmento nuevo (nunca se reabre uno viejo)"""
+        existing = self.segments()
+        self.seq = max(existing[-1] + 1 if existing else 1, self.base_seq)
+        self.handle = open(self.segment_path(self.seq), 'a', encoding='utf-8')
+
+    def flush(self):
+        """Confirmar las operaciones anotadas y bajarlas a disco"""
+        if self.uncommitted:
+            self.append({'op': 'commit'})
+            self.uncommitted = 0
+        if self.handle is not None:
+            self.handle.flush()
+
+    def needs_compaction(self):
+        """El journal ya pesa tanto como el snapshot: costo amortizado constante por página"""
+        return self.journal_bytes >= max(self.compact_min_bytes, self.snapshot_bytes)
+
+    def compact(self, state, json_files=(), background=True):
+        """Escribir `state` como snapshot y borrar los segmentos que cubre
+
+        `state` tiene que ser una copia: el crawl sigue mientras el hilo
+        escribe. `json_files` son (ruta, objeto) que se vuelcan en el mismo
+        paso (progreso y datos en JSON). Devuelve False si todavía hay una
+        compactación en curso.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            if background:
+                return False
+            self.worker.join()
+
+        # Lo que se escriba de acá en adelante va a un segmento nuevo (se crea al primer append)
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+        existing = self.segments()
+        previous_base = self.base_seq
+        self.base_seq = max(existing[-1] + 1 if existing else 1, self.base_seq)
+        state = dict(state, journal_seq=self.base_seq)
+        self.journal_bytes = 0
+
+        self.worker = threading.Thread(target=self.write_snapshot, args=(state, list(json_files), previous_base),
+                                       name='journal-compaction')
+        self.worker.start()
+        if not background:
+            self.worker.join()
+        return True
+
+    def write_snapshot(self, state, json_files, previous_base):
+        for path, data in json_files:
+            atomic_write_json(path, data)
+
+        # El snapshot actual pasa a ser la generación anterior (.prev)
+        dump_checksummed(self.snapshot_file, pickle.dumps(state))
+        self.snapshot_bytes = os.path.getsize(self.snapshot_file)
+        self.compactions += 1
+
+        # Solo sobra lo que ni la generación anterior necesita reproducir
+        for old in self.segments():
+            if old < previous_base:
+                os.remove(self.segment_path(old))
+
+    def wait(self):
+        if self.worker is not None:
+            self.worker.join()
+
+    def close(self):
+        self.wait()
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def remove_files(self):
+        """Borrar snapshot y journal (restart)"""
+        self.close()
+        for seq in self.segments():
+            os.remove(self.segment_path(seq))
+        for path in (self.snapshot_file, previous_path(self.snapshot_file)):
+            if os.path.exists(path):
+                os.remove(path)
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        self.base_seq = 1
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Reglas de prioridad para el crawl best-first
+El puntaje de una URL suma el peso de su componente (detección por URL de
+los crawlers) y el de cada término relacionado que contiene. Las reglas se
+pueden reemplazar con un JSON:
+
+    {"components": {"MediaManager": 100, "Camera": 50},
+     "terms": {"fetchmediatask": 90, "download": 10}}
+"""
+
+import json
+
+# Términos de páginas relacionadas con media (los de is_valid_related_url)
+RELATED_TERMS = [
+    'media', 'fetch', 'download', 'task', 'scheduler',
+    'file', 'camera', 'callback', 'listener'
+]
+
+DEFAULT_RULES = {
+    # Peso por tipo de componente (detect_component_type)
+    'components': {
+        'MediaManager': 100,
+        'PlaybackManager': 80,
+        'Camera': 50,
+        'General': 0
+    },
+    # Peso por término en la URL (se suman todos los que aparecen)
+    'terms': dict(
+        {term: 5 for term in RELATED_TERMS},
+        fetchmediatask=90,
+        playback=20,
+        download=10,
+        fetch=10
+    )
+}
+
+
+def load_priority_rules(path=None):
+    """Reglas por defecto, pisadas por las del JSON `path` si se indica"""
+    rules = {key: dict(weights) for key, weights in DEFAULT_RULES.items()}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            custom = json.load(f)
+        for key in rules:
+            rules[key].update(custom.get(key, {}))
+    return rules
+
+
+class PriorityScorer:
+    """Puntaje de una URL según reglas de componente y términos"""
+
+    def __init__(self, rules=None, component_of=None):
+        self.rules = rules or load_priority_rules()
+        self.component_of = component_of
+        self.terms = [(term.lower(), weight) for term, weight in self.rules['terms'].items() if weight]
+
+    def __call__(self, url):
+        url_lower = url.lower()
+        score = sum(weight for term, weight in self.terms if term in url_lower)
+        if self.component_of is not None:
+            score += self.rules['components'].get(self.component_of(url), 0)
+        return score
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Frontera de crawl compartida en SQLite
+Varios procesos (o máquinas con el mismo volumen) sacan URLs de la misma
+tabla sin repetir trabajo: cada lote se reclama con un lease a nombre del
+worker y, si el worker muere, el lease vence y la URL vuelve a pendientes.
+
+Misma interfaz que CrawlFrontier / PriorityFrontier (push, extend,
+push_front, pop_batch, to_list) más complete / record_failure para cerrar
+las URLs reclamadas. En volúmenes de red usar journal_mode='DELETE': WAL
+necesita memoria compartida entre los procesos.
+
+CrawlStore es el checkpoint de un crawl en la misma tecnología: páginas,
+métodos, links, frontera y reintentos en tablas indexadas, para reanudar y
+resumir con consultas en vez de cargar todo el estado en memoria.
+"""
+
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import time
+
+from dji_checkpoint_io import fsync_directory, previous_path
+
+DEFAULT_LEASE_SECONDS = 300.0
+
+# Rotación de la generación anterior (.prev) del checkpoint durante el crawl:
+# lo que pase primero entre estos minutos y esta cantidad de checkpoints
+GENERATION_SECONDS = 10 * 60
+GENERATION_FLUSHES = 500
+
+# Prioridad de las URLs devueltas con push_front (requeue)
+FRONT_PRIORITY = 1e300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    state TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | quarantined
+    priority REAL NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,      -- reintento diferido hasta esta fecha
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    first_failure REAL,
+    last_error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS frontier_claim ON frontier (state, priority DESC, id);
+CREATE INDEX IF NOT EXISTS frontier_lease ON frontier (state, lease_expires);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteFrontier:
+    """Frontera persistente con reclamo de URLs por lease"""
+
+    def __init__(self, path, worker_id=None, score=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 journal_mode='WAL'):
+        self.path = path
+        self.worker_id = worker_id or default_worker_id()
+        self.score = score
+        self.lease_seconds = lease_seconds
+
+        # Autocommit: las transacciones se abren a mano con BEGIN IMMEDIATE
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.expired_leases = 0
+
+    def transaction(self):
+        return Transaction(self.db)
+
+    # --- interfaz de frontera ---------------------------------------------
+
+    def __len__(self):
+        """Trabajo que queda en toda la frontera (pendiente o reclamado por alguien)"""
+        (count,) = self.db.execute(
+            "SELECT COUNT(*) FROM frontier WHERE state IN ('pending', 'leased')").fetchone()
+        return count
+
+    def __contains__(self, url):
+        return self.db.execute(
+            "SELECT 1 FROM frontier WHERE url = ? AND state IN ('pending', 'leased')", (url,)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def push(self, url, priority=None):
+        """Encolar si la URL nunca se vio (en ningún estado); devuelve si era nueva"""
+        return self.extend([url], priority) == 1
+
+    def extend(self, urls, priority=None):
+        """Encolar varias URLs en una sola transacción; devuelve cuántas eran nuevas"""
+        now = time.time()
+        rows = [(url, self.priority_of(url, priority), now) for url in urls]
+        if not rows:
+            return 0
+        with self.transaction():
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority, updated_at) VALUES (?, ?, ?)", rows)
+            return self.db.total_changes - before
+
+    def push_front(self, urls):
+        """Poner URLs delante de todo (aunque ya estuvieran hechas o en cuarentena)"""
+        now = time.time()
+        urls = list(urls)
+        with self.transaction():
+            for offset, url in enumerate(urls):
+                # Prioridades decrecientes: se conserva el orden recibido
+                priority = FRONT_PRIORITY - offset
+                self.db.execute(
+                    "INSERT INTO frontier (url, priority, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET state = 'pending', priority = excluded.priority, "
+                    "not_before = 0, lease_owner = NULL, updated_at = excluded.updated_at",
+                    (url, priority, now))
+        return len(urls)
+
+    def pop_batch(self, size):
+        """Reclamar hasta `size` URLs pendientes con un lease a nombre de este worker"""
+        now = time.time()
+        with self.transaction():
+            self.requeue_expired(now)
+            rows = self.db.execute(
+                "SELECT id, url FROM frontier WHERE state = 'pending' AND not_before <= ? "
+                "ORDER BY priority DESC, id LIMIT ?", (now, size)).fetchall()
+            self.db.executemany(
+                "UPDATE frontier SET state = 'leased', lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?",
+                [(self.worker_id, now + self.lease_seconds, now, row_id) for row_id, _ in rows])
+        return [url for _, url in rows]
+
+    def to_list(self):
+        """URLs pendientes en el orden en que se reclamarían"""
+        return [url for (url,) in self.db.execute(
+            "SELECT url FROM frontier WHERE state = 'pending' ORDER BY priority DESC, id")]
+
+    # --- ciclo de vida de una URL reclamada -------------------------------
+
+    def complete(self, url):
+        self.db.execute(
+            "UPDATE frontier SET state = 'done', lease_owner = NULL, lease_expires = NULL, "
+            "last_error = NULL, updated_at = ? WHERE url = ?", (time.time(), url))
+
+    def record_failure(self, url, error, retry_queue, permanent=False):
+        """Diferir o poner en cuarentena según las reglas de `retry_queue`
+
+        Los intentos se cuentan en la base, así valen entre workers.
+        Devuelve ('retry' | 'quarantined', intentos, próximo intento).
+        """
+        now = time.time()
+        with self.transaction():
+            row = self.db.execute(
+                "SELECT attempts, first_failure FROM frontier WHERE url = ?", (url,)).fetchone()
+            attempts, first_failure = row if row else (0, None)
+            attempts += 1
+            first_failure = first_failure or now
+
+            expired = now - first_failure >= retry_queue.deadline
+            if permanent or attempts >= retry_queue.max_attempts or expired:
+                state, next_attempt = 'quarantined', None
+            else:
+                state, next_attempt = 'pending', now + retry_queue.backoff(attempts)
+
+            self.db.execute(
+                "INSERT INTO frontier (url, updated_at) VALUES (?, ?) ON CONFLICT(url) DO NOTHING",
+                (url, now))
+            self.db.execute(
+                "UPDATE frontier SET state = ?, not_before = ?, attempts = ?, first_failure = ?, "
+                "last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE url = ?",
+                (state, next_attempt or 0, attempts, first_failure, str(error)[:300], now, url))
+        return ('quarantined' if state == 'quarantined' else 'retry'), attempts, next_attempt
+
+    def renew_leases(self):
+        """Extender los leases de este worker (mientras sigue procesando el lote)"""
+        now = time.time()
+        self.db.execute(
+            "UPDATE frontier SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, self.worker_id))
+
+    def requeue_expired(self, now=None):
+        """Devolver a pendientes las URLs de leases vencidos (worker caído)"""
+        now = now or time.time()
+        cursor = self.db.execute(
+            "UPDATE frontier SET state = 'pending', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE state = 'leased' AND lease_expires < ?", (now, now))
+        if cursor.rowcount:
+            self.expired_leases += cursor.rowcount
+            print(f"♻️ {cursor.rowcount} URLs de leases vencidos vuelven a pendientes")
+        return cursor.rowcount
+
+    def release_quarantine(self):
+        """Sacar todas las URLs de cuarentena y devolverlas"""
+        with self.transaction():
+            urls = [url for (url,) in self.db.execute(
+                "SELECT url FROM frontier WHERE state = 'quarantined' ORDER BY id")]
+            self.db.execute(
+                "UPDATE frontier SET state = 'pending', attempts = 0, first_failure = NULL, not_before = 0 "
+                "WHERE state = 'quarantined'")
+        return urls
+
+    def seconds_until_next(self, now=None):
+        """Segundos hasta que algo pueda reclamarse (diferido o lease por vencer)"""
+        now = now or time.time()
+        (next_time,) = self.db.execute(
+            "SELECT MIN(CASE state WHEN 'pending' THEN not_before ELSE lease_expires END) "
+            "FROM frontier WHERE state IN ('pending', 'leased')").fetchone()
+        if next_time is None:
+            return None
+        return max(0.0, next_time - now)
+
+    def stats(self):
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall())
+
+    def priority_of(self, url, priority=None):
+        if priority is not None:
+            return priority
+        return self.score(url) if self.score is not None else 0
+
+    def close(self):
+        self.db.close()
+
+
+class Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK: toma el lock de escritura de entrada"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    component_type TEXT NOT NULL,
+    title TEXT,
+    fetched_at TEXT,
+    methods_count INTEGER NOT NULL DEFAULT 0,
+    content_length INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL                        -- entrada de all_docs en JSON
+);
+CREATE INDEX IF NOT EXISTS pages_component ON pages (component_type);
+CREATE TABLE IF NOT EXISTS methods (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_id INTEGER REFERENCES pages (id),   -- NULL: importado de un checkpoint pickle
+    position INTEGER NOT NULL,
+    method TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS methods_page ON methods (page_id);
+CREATE TABLE IF NOT EXISTS links (
+    page_id INTEGER NOT NULL REFERENCES pages (id),
+    target TEXT NOT NULL,
+    PRIMARY KEY (page_id, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,    -- orden de llegada a la frontera
+    url TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS retries (
+    url TEXT PRIMARY KEY,
+    quarantined INTEGER NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recrawl (
+    url TEXT PRIMARY KEY,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class CrawlStore:
+    """Checkpoint del crawl en SQLite con tablas indexadas
+
+    Recibe las mismas operaciones que CrawlJournal (page, links, retry,
+    recrawl, batch) y las aplica a las tablas; el estado se lee con vistas
+    (visited, docs, component_pages, methods, recrawl_entries) que consultan
+    la base, así reanudar no carga el corpus en memoria. Cada flush cierra
+    la transacción en curso.
+
+    Al abrir se verifica la integridad (PRAGMA quick_check); si la base está
+    dañada se aparta como .corrupt y se vuelve a la generación anterior
+    (.prev) que save_generation deja en cada consolidación. Durante el
+    crawl needs_compaction() pide consolidar cada `generation_seconds` o
+    `generation_flushes` checkpoints, así un crawl largo siempre tiene una
+    generación reciente a la que volver.
+    """
+
+    def __init__(self, path, generation_seconds=GENERATION_SECONDS, generation_flushes=GENERATION_FLUSHES):
+        self.path = path
+        self.generation_seconds = generation_seconds
+        self.generation_flushes = generation_flushes
+        self.last_generation = time.monotonic()
+        self.flushes = 0
+        try:
+            self.connect()
+        except sqlite3.DatabaseError as e:
+            print(f"⚠️ Base de checkpoint dañada {path}: {e}")
+            self.restore_previous()
+            self.connect()
+
+        self.visited = StoredURLSet(self)
+        self.docs = StoredDocs(self)
+        self.methods = StoredMethods(self)
+        self.recrawl_entries = StoredRecrawl(self)
+
+    def connect(self):
+        self.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            (result,) = self.db.execute("PRAGMA quick_check").fetchone()
+            if result != 'ok':
+                raise sqlite3.DatabaseError(f"quick_check: {result}")
+            self.db.executescript(STORE_SCHEMA)
+        except sqlite3.DatabaseError:
+            self.db.close()
+            raise
+
+    def restore_previous(self):
+        """Apartar la base dañada y poner en su lugar la generación anterior"""
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.replace(self.path + suffix, self.path + suffix + '.corrupt')
+        previous = previous_path(self.path)
+        if os.path.exists(previous):
+            shutil.copyfile(previous, self.path)
+            print(f"♻️ Usando la generación anterior del checkpoint: {previous}")
+        else:
+            print(f"❌ No hay generación anterior de {self.path}: se empieza de cero")
+
+    def save_generation(self):
+        """Copia consistente de la base como generación anterior (.prev)"""
+        self.flush()
+        previous = previous_path(self.path)
+        tmp_path = f"{previous}.{os.getpid()}.tmp"
+        target = sqlite3.connect(tmp_path)
+        try:
+            self.db.backup(target)
+        finally:
+            target.close()
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, previous)
+        fsync_directory(previous)
+        self.last_generation = time.monotonic()
+        self.flushes = 0
+
+    def execute(self, sql, params=()):
+        return self.db.execute(sql, params)
+
+    def scalar(self, sql, params=()):
+        row = self.db.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def component_pages(self, component_type):
+        return StoredComponentPages(self, component_type)
+
+    def is_empty(self):
+        return self.scalar("SELECT COUNT(*) FROM pages") == 0 and self.scalar("SELECT COUNT(*) FROM pending") == 0
+
+    # --- operaciones (misma interfaz que CrawlJournal) --------------------
+
+    def begin(self):
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+
+    def append(self, op):
+        self.begin()
+        kind = op['op']
+        if kind == 'page':
+            self.put_page(op['url'], op['doc'], op['methods'], op.get('links', ()))
+            if 'sinks' in op:
+                self.set_meta('sink_offsets', op['sinks'])
+        elif kind == 'links':
+            self.db.executemany("INSERT OR IGNORE INTO pending (url) VALUES (?)", [(url,) for url in op['urls']])
+        elif kind == 'retry':
+            self.db.execute("DELETE FROM pending WHERE url = ?", (op['url'],))
+            self.db.execute(
+                "INSERT OR REPLACE INTO retries (url, quarantined, entry) VALUES (?, ?, ?)",
+                (op['url'], int(op['quarantined']), json.dumps(op['entry'], ensure_ascii=False)))
+        elif kind == 'recrawl':
+            self.recrawl_entries[op['url']] = op['entry']
+        elif kind == 'batch':
+            self.set_meta('current_batch', op['current_batch'])
+
+    def put_page(self, url, doc, methods, links=()):
+        """Guardar (o reemplazar) una página con sus métodos y links salientes"""
+        self.db.execute(
+            "INSERT INTO pages (url, component_type, title, fetched_at, methods_count, content_length, doc) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET "
+            "component_type = excluded.component_type, title = excluded.title, fetched_at = excluded.fetched_at, "
+            "methods_count = excluded.methods_count, content_length = excluded.content_length, doc = excluded.doc",
+            (url, doc['component_type'], doc.get('title'), doc.get('timestamp'), doc.get('methods_count', 0),
+             doc.get('content_length', 0), json.dumps(doc, ensure_ascii=False)))
+        page_id = self.scalar("SELECT id FROM pages WHERE url = ?", (url,))
+        self.db.execute("DELETE FROM methods WHERE page_id = ?", (page_id,))
+        self.db.execute("DELETE FROM links WHERE page_id = ?", (page_id,))
+        self.db.executemany(
+            "INSERT INTO methods (page_id, position, method) VALUES (?, ?, ?)",
+            [(page_id, position, method) for position, method in enumerate(methods)])
+        self.db.executemany(
+            "INSERT OR IGNORE INTO links (page_id, target) VALUES (?, ?)", [(page_id, link) for link in links])
+        self.db.execute("DELETE FROM pending WHERE url = ?", (url,))
+        self.db.execute("DELETE FROM retries WHERE url = ?", (url,))
+
+    def flush(self):
+        if self.db.in_transaction:
+            self.db.execute("COMMIT")
+            self.flushes += 1
+
+    def needs_compaction(self):
+        """Toca rotar la generación anterior: no hay ninguna, o pasó el tiempo o los checkpoints fijados
+
+        Cada operación ya queda en su tabla: no hay journal que compactar.
+        """
+        return (not os.path.exists(previous_path(self.path))
+                or self.flushes >= self.generation_flushes
+                or time.monotonic() - self.last_generation >= self.generation_seconds)
+
+    # --- estado chico que se carga entero al reanudar ---------------------
+
+    def set_meta(self, key, value):
+        self.begin()
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key, default=None):
+        value = self.scalar("SELECT value FROM meta WHERE key = ?", (key,))
+        return default if value is None else json.loads(value)
+
+    def pending_urls(self):
+        return [url for (url,) in self.db.execute("SELECT url FROM pending ORDER BY id")]
+
+    def save_pending(self, urls):
+        """Reemplazar la frontera guardada (cambios en bloque: seed, requeue, reparse)"""
+        self.begin()
+        self.db.execute("DELETE FROM pending")
+        self.db.executemany("INSERT OR IGNORE INTO pending (url) VALUES (?)", [(url,) for url in urls])
+
+    def retry_state(self):
+        """Estado de RetryQueue (entries / quarantined) guardado en la tabla retries"""
+        state = {'entries': {}, 'quarantined': {}}
+        for url, quarantined, entry in self.db.execute("SELECT url, quarantined, entry FROM retries"):
+            state['quarantined' if quarantined else 'entries'][url] = json.loads(entry)
+        return state
+
+    def save_retry_state(self, state):
+        self.begin()
+        self.db.execute("DELETE FROM retries")
+        for key, quarantined in (('entries', 0), ('quarantined', 1)):
+            self.db.executemany(
+                "INSERT OR REPLACE INTO retries (url, quarantined, entry) VALUES (?, ?, ?)",
+                [(url, quarantined, json.dumps(entry, ensure_ascii=False)) for url, entry in state[key].items()])
+
+    def clear_pages(self):
+        """Vaciar páginas, métodos y links (reparse); frontera y reintentos quedan"""
+        self.begin()
+        for table in ('links', 'methods', 'pages'):
+            self.db.execute(f"DELETE FROM {table}")
+
+    def import_state(self, docs, methods, pending, retry_state, recrawl_entries, current_batch, page_methods=None):
+        """Migración única desde un checkpoint pickle (+ journal) ya cargado en memoria
+
+        `page_methods` son los métodos de cada URL; `methods`, los que el
+        pickle no pudo asignar a una página, que se importan con page_id NULL
+        para conservar el total.
+        """
+        page_methods = page_methods or {}
+        self.begin()
+        for url, doc in docs.items():
+            self.put_page(url, doc, page_methods.get(url, ()))
+        self.db.executemany(
+            "INSERT INTO methods (page_id, position, method) VALUES (NULL, ?, ?)", list(enumerate(methods)))
+        for url, entry in recrawl_entries.items():
+            self.recrawl_entries[url] = entry
+        self.save_pending(pending)
+        self.save_retry_state(retry_state)
+        self.set_meta('current_batch', current_batch)
+        self.flush()
+
+    # --- consultas agregadas ----------------------------------------------
+
+    def summary(self):
+        """Totales del crawl sin cargar páginas: una consulta por tabla"""
+        counts = dict(self.db.execute("SELECT component_type, COUNT(*) FROM pages GROUP BY component_type"))
+        return {
+            'pages': sum(counts.values()),
+            'components': counts,
+            'methods': self.scalar("SELECT COUNT(*) FROM methods"),
+            'links': self.scalar("SELECT COUNT(*) FROM links"),
+            'pending': self.scalar("SELECT COUNT(*) FROM pending")
+        }
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def remove_files(self):
+        """Cerrar y borrar la base y su generación anterior (restart)"""
+        self.db.close()
+        for suffix in ('', '-wal', '-shm', '.prev'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+
+class StoredURLSet:
+    """Vista tipo set de las URLs con página registrada"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __contains__(self, url):
+        return self.store.scalar("SELECT 1 FROM pages WHERE url = ?", (url,)) is not None
+
+    def __len__(self):
+        return self.store.scalar("SELECT COUNT(*) FROM pages")
+
+    def __iter__(self):
+        return (url for (url,) in self.store.execute("SELECT url FROM pages ORDER BY id"))
+
+
+class StoredDocs:
+    """Vista tipo dict de all_docs (url -> entrada JSON)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, url):
+        doc = self.store.scalar("SELECT doc FROM pages WHERE url = ?", (url,))
+        if doc is None:
+            raise KeyError(url)
+        return json.loads(doc)
+
+    def get(self, url, default=None):
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def __contains__(self, url):
+        return url in self.store.visited
+
+    def __len__(self):
+        return len(self.store.visited)
+
+    def __iter__(self):
+        return iter(self.store.visited)
+
+    def items(self):
+        return ((url, json.loads(doc)) for url, doc in self.store.execute("SELECT url, doc FROM pages ORDER BY id"))
+
+    def values(self):
+        return (doc for _, doc in self.items())
+
+
+class StoredComponentPages:
+    """Vista tipo lista de las URLs de un tipo de componente"""
+
+    def __init__(self, store, component_type):
+        self.store = store
+        self.component_type = component_type
+
+    def __len__(self):
+        return self.store.scalar("SELECT COUNT(*) FROM pages WHERE component_type = ?", (self.component_type,))
+
+    def __iter__(self):
+        return (url for (url,) in self.store.execute(
+            "SELECT url FROM pages WHERE component_type = ? ORDER BY id", (self.component_type,)))
+
+
+class StoredMethods:
+    """Vista tipo lista de todos los métodos encontrados, en orden de registro"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.scalar("SELECT COUNT(*) FROM methods")
+
+    def __iter__(self):
+        return (method for (method,) in self.store.execute("SELECT method FROM methods ORDER BY id"))
+
+
+class StoredRecrawl:
+    """Vista tipo dict de las entradas de RecrawlSchedule"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, url):
+        entry = self.store.scalar("SELECT entry FROM recrawl WHERE url = ?", (url,))
+        if entry is None:
+            raise KeyError(url)
+        return json.loads(entry)
+
+    def get(self, url, default=None):
+        try:
+            return self[url]
+        except KeyError:
+            return default
+
+    def __setitem__(self, url, entry):
+        self.store.begin()
+        self.store.execute("INSERT OR REPLACE INTO recrawl (url, entry) VALUES (?, ?)", (url, json.dumps(entry)))
+
+    def __contains__(self, url):
+        return self.store.scalar("SELECT 1 FROM recrawl WHERE url = ?", (url,)) is not None
+
+    def __len__(self):
+        return self.store.scalar("SELECT COUNT(*) FROM recrawl")
+
+    def __iter__(self):
+        return (url for (url,) in self.store.execute("SELECT url FROM recrawl"))
+
+    def items(self):
+        return ((url, json.loads(entry)) for url, entry in self.store.execute("SELECT url, entry FROM recrawl"))
+
+    def values(self):
+        return (entry for _, entry in self.items())
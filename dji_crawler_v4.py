@@ -2,23 +2,36 @@
 """
 DJI Documentation Crawler V4 - Con URLs Conocidas
 Crawl específico para URLs conocidas de DJI SDK con máximo detalle
+
+Cada página se escribe en sus reportes apenas se procesa y se descarta: en
+memoria quedan solo los contadores y el conjunto de nombres de métodos, así
+el consumo no crece con la cantidad de URLs y un corte a mitad de camino
+deja en disco todo lo procesado hasta el último checkpoint.
 """
 
-import requests
-import time
 import json
 import os
 import re
+import shutil
+import sys
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+from dji_output_sinks import OutputSinks
+from dji_corpus import CorpusWriter
+
+# Corpus comprimido de este crawler (distinto del de v3)
+V4_CORPUS_DIR = "dji_corpus_v4"
+
+# Ancho reservado para los totales del encabezado (se reescriben en el lugar)
+TOTALS_WIDTH = 10
+
 class DJISpecificCrawler:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, output='text'):
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='v4')
         
         # Archivos de salida
         self.full_content_file = "dji_docs_COMPLETO.txt"
@@ -27,13 +40,28 @@ class DJISpecificCrawler:
         self.camera_methods_file = "dji_CAMERA_METHODS_completo.txt"
         self.all_methods_file = "dji_TODOS_LOS_METODOS.txt"
         self.final_summary_file = "dji_RESUMEN_FINAL_COMPLETO.txt"
+        # Estadísticas por página, acumuladas en disco hasta armar el resumen
+        self.page_stats_file = self.final_summary_file + ".paginas"
         
-        # Datos recolectados
-        self.all_content = []
-        self.methods_found = []
-        self.media_manager_content = []
-        self.playback_manager_content = []
-        self.camera_content = []
+        # Reportes que se escriben página a página (con output='corpus' solo las estadísticas)
+        text_reports = [] if output == 'corpus' else [
+            self.full_content_file,
+            self.media_manager_file,
+            self.playback_manager_file
+        ]
+        self.sinks = OutputSinks(text_reports + [self.page_stats_file])
+        self.totals_offset = 0
+        
+        # Corpus comprimido: un registro gzip por página + índice por URL.
+        # Directorio propio: el de v3 (dji_corpus/) lo reanuda su checkpoint y no se toca
+        self.corpus = CorpusWriter(V4_CORPUS_DIR) if output != 'text' else None
+        
+        # Contadores (lo único que se acumula en memoria además de los nombres de métodos)
+        self.page_count = 0
+        self.methods_found = set()
+        self.media_manager_pages = 0
+        self.playback_manager_pages = 0
+        self.camera_pages = 0
         
         # Cargar URLs conocidas
         self.load_known_urls()
@@ -80,38 +108,128 @@ class DJISpecificCrawler:
         
         return list(set(methods))  # Eliminar duplicados
     
-    def categorize_content(self, url, content, methods):
-        """Categorizar contenido según el tipo"""
+    def totals_header(self):
+        """Líneas de totales con ancho fijo, para poder reescribirlas en el lugar"""
+        return (f"📊 Total páginas: {self.page_count:<{TOTALS_WIDTH}}\n"
+                f"🔧 Total métodos: {len(self.methods_found):<{TOTALS_WIDTH}}\n\n")
+    
+    def start_reports(self):
+        """Empezar el archivo completo, el de estadísticas y el corpus de cero"""
+        if self.full_content_file in self.sinks:
+            self.sinks.reset(self.full_content_file,
+                             "📚 DOCUMENTACIÓN COMPLETA DJI SDK v4 ANDROID API\n"
+                             + "=" * 80 + "\n\n"
+                             + f"🕐 Generado: {datetime.now().isoformat()}\n")
+            self.totals_offset = self.sinks[self.full_content_file].offset
+            self.sinks.write(self.full_content_file, self.totals_header())
+        self.sinks.reset(self.page_stats_file)
+        if self.corpus is not None:
+            self.corpus.reset()
+    
+    def checkpoint_reports(self):
+        """Bajar los reportes a disco y actualizar los totales del encabezado"""
+        self.sinks.flush()
+        if self.corpus is not None:
+            self.corpus.flush()
+        if self.full_content_file not in self.sinks:
+            return
+        with open(self.full_content_file, 'r+b') as f:
+            f.seek(self.totals_offset)
+            f.write(self.totals_header().encode('utf-8'))
+    
+    def write_category_page(self, filename, header, url, clean_text, methods, pages):
+        """Agregar una página a un reporte por categoría (el encabezado va con la primera)"""
+        if filename not in self.sinks:
+            return
+        if pages == 1:
+            self.sinks.reset(filename, header + "=" * 60 + "\n\n")
+        self.sinks.write(
+            filename,
+            f"🔗 URL: {url}\n",
+            f"📊 Métodos: {len(methods)}\n",
+            "-" * 40 + "\n",
+            clean_text,
+            "\n\n"
+        )
+        if methods:
+            self.sinks.write(filename, "🔧 MÉTODOS:\n", *(f"  • {method}\n" for method in methods))
+        self.sinks.write(filename, "\n" + "=" * 60 + "\n\n")
+    
+    def component_of(self, url):
+        """Categoría de una URL: MediaManager, PlaybackManager, Camera o None"""
         url_lower = url.lower()
-        
-        entry = {
-            'url': url,
-            'content': content,
-            'methods': methods,
-            'timestamp': datetime.now().isoformat()
-        }
-        
         if 'mediamanager' in url_lower:
-            self.media_manager_content.append(entry)
+            return 'MediaManager'
+        if 'playback' in url_lower:
+            return 'PlaybackManager'
+        if 'camera' in url_lower:
+            return 'Camera'
+        return None
+    
+    def categorize_content(self, url, clean_text, methods):
+        """Categorizar contenido según el tipo y escribirlo en su reporte"""
+        component = self.component_of(url)
+        
+        if component == 'MediaManager':
+            self.media_manager_pages += 1
+            self.write_category_page(self.media_manager_file, "📱 MEDIA MANAGER - INFORMACIÓN DETALLADA\n",
+                                     url, clean_text, methods, self.media_manager_pages)
             print(f"📱 MediaManager: {len(methods)} métodos encontrados")
-        elif 'playback' in url_lower:
-            self.playback_manager_content.append(entry)
+        elif component == 'PlaybackManager':
+            self.playback_manager_pages += 1
+            self.write_category_page(self.playback_manager_file, "🎮 PLAYBACK MANAGER - INFORMACIÓN DETALLADA\n",
+                                     url, clean_text, methods, self.playback_manager_pages)
             print(f"🎮 PlaybackManager: {len(methods)} métodos encontrados")
-        elif 'camera' in url_lower:
-            self.camera_content.append(entry)
+        elif component == 'Camera':
+            self.camera_pages += 1
             print(f"📷 Camera: {len(methods)} métodos encontrados")
         
-        self.methods_found.extend(methods)
+        self.methods_found.update(methods)
+    
+    def write_page(self, url, title, clean_text, methods):
+        """Agregar una página al archivo completo (o al corpus) y a las estadísticas"""
+        self.page_count += 1
+        if self.corpus is not None:
+            self.corpus.add({
+                'url': url,
+                'title': title,
+                'component_type': self.component_of(url),
+                'fetched_at': datetime.now().isoformat(),
+                'methods': methods,
+                'text': clean_text
+            })
+        self.sinks.write(self.page_stats_file, f"  {str(title)[:40]:<40} | {len(methods):3d} métodos\n")
+        if self.full_content_file not in self.sinks:
+            return
+        self.sinks.write(
+            self.full_content_file,
+            f"\n{'='*80}\n",
+            f"PÁGINA {self.page_count}: {title}\n",
+            f"URL: {url}\n",
+            f"Métodos encontrados: {len(methods)}\n",
+            f"{'='*80}\n\n",
+            "📝 CONTENIDO COMPLETO:\n",
+            "-" * 40 + "\n",
+            clean_text,
+            "\n\n"
+        )
+        if methods:
+            self.sinks.write(
+                self.full_content_file,
+                "🔧 MÉTODOS ENCONTRADOS:\n",
+                "-" * 40 + "\n",
+                *(f"  • {method}\n" for method in methods),
+                "\n"
+            )
     
     def process_single_url(self, url):
         """Procesar una URL específica"""
         try:
             print(f"\n🔍 Procesando: {url}")
             
-            response = self.session.get(url, timeout=20)
-            response.raise_for_status()
+            response = self.fetcher.get(url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
             
             # Extraer título
             title = soup.title.string if soup.title else 'Sin título'
@@ -126,19 +244,9 @@ class DJISpecificCrawler:
             # Extraer métodos
             methods = self.extract_methods(soup, url)
             
-            # Crear entrada completa
-            content_entry = {
-                'url': url,
-                'title': title,
-                'full_text': clean_text,
-                'methods': methods,
-                'method_count': len(methods),
-                'character_count': len(clean_text),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.all_content.append(content_entry)
-            self.categorize_content(url, content_entry, methods)
+            # Escribir la página en sus reportes; no se guarda nada más
+            self.write_page(url, title, clean_text, methods)
+            self.categorize_content(url, clean_text, methods)
             
             print(f"  ✅ Título: {title}")
             print(f"  📊 Métodos: {len(methods)}")
@@ -151,74 +259,14 @@ class DJISpecificCrawler:
             return False
     
     def save_all_content(self):
-        """Guardar todo el contenido en archivos"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Archivo con TODO el contenido
-        with open(self.full_content_file, 'w', encoding='utf-8') as f:
-            f.write("📚 DOCUMENTACIÓN COMPLETA DJI SDK v4 ANDROID API\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(f"🕐 Generado: {datetime.now().isoformat()}\n")
-            f.write(f"📊 Total páginas: {len(self.all_content)}\n")
-            f.write(f"🔧 Total métodos: {len(set(self.methods_found))}\n\n")
-            
-            for i, entry in enumerate(self.all_content, 1):
-                f.write(f"\n{'='*80}\n")
-                f.write(f"PÁGINA {i}: {entry['title']}\n")
-                f.write(f"URL: {entry['url']}\n")
-                f.write(f"Métodos encontrados: {entry['method_count']}\n")
-                f.write(f"{'='*80}\n\n")
-                
-                f.write("📝 CONTENIDO COMPLETO:\n")
-                f.write("-" * 40 + "\n")
-                f.write(entry['full_text'])
-                f.write("\n\n")
-                
-                if entry['methods']:
-                    f.write("🔧 MÉTODOS ENCONTRADOS:\n")
-                    f.write("-" * 40 + "\n")
-                    for method in entry['methods']:
-                        f.write(f"  • {method}\n")
-                    f.write("\n")
-        
-        # 2. Archivo específico de MediaManager
-        if self.media_manager_content:
-            with open(self.media_manager_file, 'w', encoding='utf-8') as f:
-                f.write("📱 MEDIA MANAGER - INFORMACIÓN DETALLADA\n")
-                f.write("=" * 60 + "\n\n")
-                
-                for entry in self.media_manager_content:
-                    f.write(f"🔗 URL: {entry['url']}\n")
-                    f.write(f"📊 Métodos: {len(entry['methods'])}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(entry['content']['full_text'])
-                    f.write("\n\n")
-                    if entry['methods']:
-                        f.write("🔧 MÉTODOS:\n")
-                        for method in entry['methods']:
-                            f.write(f"  • {method}\n")
-                    f.write("\n" + "="*60 + "\n\n")
-        
-        # 3. Archivo específico de PlaybackManager
-        if self.playback_manager_content:
-            with open(self.playback_manager_file, 'w', encoding='utf-8') as f:
-                f.write("🎮 PLAYBACK MANAGER - INFORMACIÓN DETALLADA\n")
-                f.write("=" * 60 + "\n\n")
-                
-                for entry in self.playback_manager_content:
-                    f.write(f"🔗 URL: {entry['url']}\n")
-                    f.write(f"📊 Métodos: {len(entry['methods'])}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(entry['content']['full_text'])
-                    f.write("\n\n")
-                    if entry['methods']:
-                        f.write("🔧 MÉTODOS:\n")
-                        for method in entry['methods']:
-                            f.write(f"  • {method}\n")
-                    f.write("\n" + "="*60 + "\n\n")
+        """Completar los reportes: totales, lista de métodos y resumen final"""
+        self.checkpoint_reports()
+        self.sinks.close()
+        if self.corpus is not None:
+            self.corpus.close()
         
         # 4. Todos los métodos encontrados
-        unique_methods = sorted(set(self.methods_found))
+        unique_methods = sorted(self.methods_found)
         with open(self.all_methods_file, 'w', encoding='utf-8') as f:
             f.write("🔧 TODOS LOS MÉTODOS ENCONTRADOS EN DJI SDK\n")
             f.write("=" * 60 + "\n\n")
@@ -232,29 +280,39 @@ class DJISpecificCrawler:
             f.write("📋 RESUMEN FINAL - CRAWLING DJI SDK\n")
             f.write("=" * 50 + "\n\n")
             f.write(f"🕐 Completado: {datetime.now().isoformat()}\n")
-            f.write(f"📄 Páginas procesadas: {len(self.all_content)}\n")
+            f.write(f"📄 Páginas procesadas: {self.page_count}\n")
             f.write(f"🔧 Métodos únicos: {len(unique_methods)}\n")
-            f.write(f"📱 Páginas MediaManager: {len(self.media_manager_content)}\n")
-            f.write(f"🎮 Páginas PlaybackManager: {len(self.playback_manager_content)}\n")
-            f.write(f"📷 Páginas Camera: {len(self.camera_content)}\n\n")
+            f.write(f"📱 Páginas MediaManager: {self.media_manager_pages}\n")
+            f.write(f"🎮 Páginas PlaybackManager: {self.playback_manager_pages}\n")
+            f.write(f"📷 Páginas Camera: {self.camera_pages}\n\n")
             
             f.write("📂 ARCHIVOS GENERADOS:\n")
-            f.write(f"  • {self.full_content_file} - Contenido completo\n")
-            f.write(f"  • {self.media_manager_file} - MediaManager detallado\n")
-            f.write(f"  • {self.playback_manager_file} - PlaybackManager detallado\n")
+            if self.full_content_file in self.sinks:
+                f.write(f"  • {self.full_content_file} - Contenido completo\n")
+                f.write(f"  • {self.media_manager_file} - MediaManager detallado\n")
+                f.write(f"  • {self.playback_manager_file} - PlaybackManager detallado\n")
+            if self.corpus is not None:
+                f.write(f"  • {self.corpus.directory}/ - Corpus comprimido (segmentos gzip + índice por URL)\n")
             f.write(f"  • {self.all_methods_file} - Todos los métodos\n")
             f.write(f"  • {self.final_summary_file} - Este resumen\n\n")
             
-            # Estadísticas por página
+            # Estadísticas por página (acumuladas en disco durante el crawl)
             f.write("📊 ESTADÍSTICAS POR PÁGINA:\n")
             f.write("-" * 40 + "\n")
-            for entry in self.all_content:
-                f.write(f"  {entry['title'][:40]:<40} | {entry['method_count']:3d} métodos\n")
+            f.flush()
+            with open(self.page_stats_file, 'rb') as stats:
+                shutil.copyfileobj(stats, f.buffer)
+        os.remove(self.page_stats_file)
         
         print(f"\n💾 ARCHIVOS GUARDADOS:")
-        print(f"  📄 {self.full_content_file}")
-        print(f"  📱 {self.media_manager_file}")
-        print(f"  🎮 {self.playback_manager_file}")
+        if self.full_content_file in self.sinks:
+            print(f"  📄 {self.full_content_file}")
+            print(f"  📱 {self.media_manager_file}")
+            print(f"  🎮 {self.playback_manager_file}")
+        if self.corpus is not None:
+            stats = self.corpus.stats()
+            print(f"  📚 {self.corpus.directory}/ - {stats['records']} páginas, "
+                  f"{stats['raw_bytes'] / 1024:.1f} KB -> {stats['disk_bytes'] / 1024:.1f} KB comprimidos")
         print(f"  🔧 {self.all_methods_file}")
         print(f"  📋 {self.final_summary_file}")
     
@@ -268,6 +326,7 @@ class DJISpecificCrawler:
         print("=" * 60)
         
         success_count = 0
+        self.start_reports()
         
         for i, url in enumerate(self.urls, 1):
             print(f"\n[{i}/{len(self.urls)}]", end=" ")
@@ -275,15 +334,14 @@ class DJISpecificCrawler:
             if self.process_single_url(url):
                 success_count += 1
             
-            # Pausa entre requests
-            time.sleep(1)
-            
             # Checkpoint cada 5 URLs
             if i % 5 == 0:
+                self.checkpoint_reports()
                 print(f"  💾 Checkpoint: {success_count}/{i} exitosas")
         
         print(f"\n🎉 Crawling completado!")
         print(f"✅ Exitosas: {success_count}/{len(self.urls)}")
+        self.fetcher.print_stats()
         
         self.save_all_content()
 
@@ -291,7 +349,14 @@ def main():
     print("🎯 DJI DOCUMENTATION CRAWLER V4")
     print("=" * 50)
     
-    crawler = DJISpecificCrawler()
+    # --output text|corpus|both: reportes planos, corpus comprimido o ambos
+    args = sys.argv[1:]
+    output = args[args.index('--output') + 1] if '--output' in args[:-1] else 'text'
+    if output not in ('text', 'corpus', 'both'):
+        print("❌ --output acepta text, corpus o both")
+        sys.exit(1)
+    
+    crawler = DJISpecificCrawler(output)
     crawler.crawl_all()
     
     print("\n✅ Proceso completado! Revisa los archivos generados.")
@@ -5,22 +5,23 @@ Explora toda la documentación DJI SDK de manera incremental y resiliente
 """
 
 import requests
-import time
 import json
 import os
 import sys
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
 import pickle
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+from dji_frontier import CrawlFrontier
+from dji_url_canon import canonicalize_url
+
 class DJIDocsCrawler:
     def __init__(self, base_url="https://developer.dji.com/api-reference/android-api/"):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='v2')
         
         # Archivos de estado
         self.progress_file = "dji_crawl_progress.json"
@@ -29,7 +30,7 @@ class DJIDocsCrawler:
         
         # Estado del crawler
         self.visited_urls = set()
-        self.pending_urls = []
+        self.frontier = CrawlFrontier()  # URLs pendientes (FIFO sin duplicados)
         self.all_docs = {}
         self.current_batch = 0
         self.max_batch_size = 20  # Procesar de a 20 URLs
@@ -41,11 +42,11 @@ class DJIDocsCrawler:
         """Guardar progreso actual"""
         progress = {
             'visited_urls': list(self.visited_urls),
-            'pending_urls': self.pending_urls,
+            'pending_urls': self.frontier.to_list(),
             'current_batch': self.current_batch,
             'timestamp': datetime.now().isoformat(),
             'total_processed': len(self.visited_urls),
-            'total_pending': len(self.pending_urls)
+            'total_pending': len(self.frontier)
         }
         
         # Guardar progreso en JSON
@@ -60,12 +61,12 @@ class DJIDocsCrawler:
         with open(self.checkpoint_file, 'wb') as f:
             pickle.dump({
                 'visited_urls': self.visited_urls,
-                'pending_urls': self.pending_urls,
+                'pending_urls': self.frontier.to_list(),
                 'all_docs': self.all_docs,
                 'current_batch': self.current_batch
             }, f)
         
-        print(f"💾 Progreso guardado: {len(self.visited_urls)} procesadas, {len(self.pending_urls)} pendientes")
+        print(f"💾 Progreso guardado: {len(self.visited_urls)} procesadas, {len(self.frontier)} pendientes")
     
     def load_progress(self):
         """Cargar progreso previo si existe"""
@@ -74,11 +75,11 @@ class DJIDocsCrawler:
                 with open(self.checkpoint_file, 'rb') as f:
                     data = pickle.load(f)
                     self.visited_urls = data.get('visited_urls', set())
-                    self.pending_urls = data.get('pending_urls', [])
+                    self.frontier = CrawlFrontier(data.get('pending_urls', []))
                     self.all_docs = data.get('all_docs', {})
                     self.current_batch = data.get('current_batch', 0)
                 
-                print(f"🔄 Recuperando progreso: {len(self.visited_urls)} ya procesadas, {len(self.pending_urls)} pendientes")
+                print(f"🔄 Recuperando progreso: {len(self.visited_urls)} ya procesadas, {len(self.frontier)} pendientes")
                 return True
             
         except Exception as e:
@@ -100,7 +101,7 @@ class DJIDocsCrawler:
         
         # Filtros adicionales
         skip_patterns = [
-            'javascript:', 'mailto:', '#', 'tel:',
+            'javascript:', 'mailto:', 'tel:',
             '.pdf', '.zip', '.jpg', '.png', '.gif'
         ]
         
@@ -115,10 +116,9 @@ class DJIDocsCrawler:
         try:
             print(f"🔍 Explorando: {url}")
             
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            response = self.fetcher.get(url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
             
             # Extraer contenido relevante
             content = {
@@ -157,7 +157,8 @@ class DJIDocsCrawler:
             # Extraer todos los links válidos
             new_links = []
             for link in soup.find_all('a', href=True):
-                full_url = urljoin(url, link['href'])
+                # Sin #ancla, index.html explícito, path y query normalizados
+                full_url = canonicalize_url(urljoin(url, link['href']))
                 if self.is_valid_dji_url(full_url) and full_url not in self.visited_urls:
                     new_links.append(full_url)
             
@@ -190,13 +191,12 @@ class DJIDocsCrawler:
         if batch_size is None:
             batch_size = self.max_batch_size
         
-        if not self.pending_urls:
+        if not self.frontier:
             print("✅ No hay URLs pendientes para procesar")
             return False
         
         # Tomar el próximo lote
-        batch = self.pending_urls[:batch_size]
-        self.pending_urls = self.pending_urls[batch_size:]
+        batch = self.frontier.pop_batch(batch_size)
         
         print(f"\n🚀 Procesando lote {self.current_batch + 1}: {len(batch)} URLs")
         
@@ -214,13 +214,10 @@ class DJIDocsCrawler:
                 
                 # Agregar nuevos links únicos
                 for link in new_links:
-                    if link not in self.visited_urls and link not in self.pending_urls:
-                        self.pending_urls.append(link)
+                    if link not in self.visited_urls:
+                        self.frontier.push(link)
                 
                 print(f"  ✅ Procesado: {content.get('title', 'Sin título')[:50]}")
-                
-                # Pequeña pausa para no sobrecargar el servidor
-                time.sleep(0.5)
             
             # Guardar progreso cada 5 URLs
             if processed_count % 5 == 0:
@@ -230,31 +227,27 @@ class DJIDocsCrawler:
         self.save_progress()
         
         print(f"📊 Lote completado: {processed_count} nuevas páginas procesadas")
-        print(f"📈 Total acumulado: {len(self.visited_urls)} páginas, {len(self.pending_urls)} pendientes")
+        print(f"📈 Total acumulado: {len(self.visited_urls)} páginas, {len(self.frontier)} pendientes")
         
-        return len(self.pending_urls) > 0
+        return len(self.frontier) > 0
     
     def start_crawl(self, start_url=None):
         """Iniciar o continuar el crawling"""
-        if start_url and not self.pending_urls and not self.visited_urls:
-            self.pending_urls.append(start_url)
+        if start_url and not self.frontier and not self.visited_urls:
+            self.frontier.push(canonicalize_url(start_url))
             print(f"🚀 Iniciando crawl desde: {start_url}")
-        elif self.pending_urls:
-            print(f"🔄 Continuando crawl con {len(self.pending_urls)} URLs pendientes")
+        elif self.frontier:
+            print(f"🔄 Continuando crawl con {len(self.frontier)} URLs pendientes")
         else:
             print("❌ No hay URLs para procesar")
             return
         
         # Procesar en lotes
-        while self.pending_urls:
+        while self.frontier:
             has_more = self.process_batch()
             
             if not has_more:
                 break
-            
-            # Pausa entre lotes
-            print(f"⏸️ Pausa de 2 segundos entre lotes...")
-            time.sleep(2)
         
         print("\n🎉 Crawling completado!")
         self.generate_summary()
@@ -6,60 +6,293 @@ Explora toda la documentación DJI SDK y guarda información detallada en texto
 
 import requests
 import time
-import json
 import os
+import signal
 import sys
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
-import pickle
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
+import copy
+
+from dji_fetcher import DJIFetcher
+from dji_html_archive import HTMLArchive
+from dji_html_parser import make_soup
+from dji_retry_queue import RetryQueue
+from dji_frontier import CrawlFrontier, PriorityFrontier
+from dji_crawl_priority import PriorityScorer, load_priority_rules
+from dji_url_canon import URLCanonicalizer, canonicalize_url
+from dji_seed import load_url_files, load_sitemap_urls
+from dji_crawl_store import SQLiteFrontier, CrawlStore
+from dji_recrawl import RecrawlSchedule
+from dji_crawl_journal import CrawlJournal, PageMethods
+from dji_checkpoint_io import atomic_write_json_stream
+from dji_output_sinks import OutputSinks
+from dji_corpus import CorpusWriter
+
+DEFAULT_BASE_URL = "https://developer.dji.com/api-reference/android-api/"
+
+# Subdirectorio del archivo HTML de este crawler (reparse / refresh)
+ARCHIVE_NAME = 'v3'
+
+# Respuestas que no tiene sentido reintentar
+PERMANENT_STATUS_CODES = (404, 410)
+
+# Con frontera compartida, cada cuánto volver a mirar si otro worker encoló algo
+SHARED_POLL_SECONDS = 2.0
+
+# Salidas de texto: reportes planos, corpus comprimido o ambos
+OUTPUT_MODES = ('text', 'corpus', 'both')
+
+# Cierre de cada sección de página en los reportes por componente
+SECTION_FOOTER = "\n\n===============================================================================\n"
+
+def is_valid_dji_url(url, base_url=DEFAULT_BASE_URL):
+    """Verificar si la URL es válida para DJI docs
+    
+    Se llama con la URL ya canonicalizada: las #anclas no se descartan, se
+    quitan en canonicalize_url y apuntan a la página que contiene el ancla.
+    """
+    if not url:
+        return False
+    
+    parsed = urlparse(url)
+    base = urlparse(base_url)
+    if parsed.netloc != base.netloc:
+        return False
+    
+    if not parsed.path.startswith(base.path):
+        return False
+    
+    # Filtros adicionales
+    skip_patterns = [
+        'javascript:', 'mailto:', 'tel:',
+        '.pdf', '.zip', '.jpg', '.png', '.gif'
+    ]
+    
+    for pattern in skip_patterns:
+        if pattern in url.lower():
+            return False
+    
+    return True
+
+def extract_methods_from_content(soup):
+    """Extraer métodos específicos del contenido"""
+    methods = []
+    
+    # Buscar métodos de diferentes maneras
+    method_selectors = [
+        'div[id*="method"]',
+        'div[class*="method"]',
+        'section[id*="method"]',
+        'div[id*="function"]',
+        'h3[id*="method"]',
+        'h4[id*="method"]',
+        'code:contains("(")',
+        'pre:contains("(")'
+    ]
+    
+    for selector in method_selectors:
+        try:
+            elements = soup.select(selector)
+            for elem in elements:
+                text = elem.get_text(strip=True)
+                if '(' in text and len(text) < 200:  # Probablemente un método
+                    methods.append(text)
+        except:
+            continue
+    
+    # Buscar también en el texto general
+    text_content = soup.get_text()
+    lines = text_content.split('\n')
+    for line in lines:
+        line = line.strip()
+        if ('(' in line and ')' in line and 
+            any(keyword in line.lower() for keyword in ['public', 'void', 'boolean', 'string', 'int', 'callback']) and
+            len(line) < 150):
+            methods.append(line)
+    
+    return list(dict.fromkeys(methods))  # Eliminar duplicados (orden estable entre corridas)
+
+def detect_component_type(url):
+    """Detectar tipo de contenido según la URL"""
+    url_lower = url.lower()
+    if 'mediamanager' in url_lower:
+        return 'MediaManager'
+    if 'playback' in url_lower:
+        return 'PlaybackManager'
+    if 'camera' in url_lower:
+        return 'Camera'
+    return 'General'
+
+def parse_page(url, html, base_url=DEFAULT_BASE_URL, backend=None):
+    """Parsear una página y devolver un dict con datos planos
+    
+    No toca estado del crawler, así se puede ejecutar en otro proceso
+    (reparse) y el resultado se registra después con record_page.
+    """
+    soup = make_soup(html, backend)
+    
+    # Extraer contenido básico
+    title = str(soup.title.string) if soup.title and soup.title.string else 'Sin título'
+    
+    # Extraer todos los links válidos (crudos: se canonicalizan al registrar,
+    # así el crawler cuenta las variantes que colapsan)
+    links = []
+    for link in soup.find_all('a', href=True):
+        full_url = urljoin(url, link['href'])
+        if is_valid_dji_url(canonicalize_url(full_url), base_url):
+            links.append(full_url)
+    
+    return {
+        'url': url,
+        'title': title,
+        'full_text': soup.get_text(separator='\n', strip=True),
+        'component_type': detect_component_type(url),
+        'methods': extract_methods_from_content(soup),
+        'links': links
+    }
+
+def parse_archived_page(task):
+    """Worker de reparse: leer un body del archivo y parsearlo"""
+    url, digest, base_url, archive_dir = task
+    try:
+        html = HTMLArchive(archive_dir).load(digest)
+        return parse_page(url, html, base_url)
+    except Exception as e:
+        return {'url': url, 'error': str(e)}
 
 class DJIDocsCrawlerV3:
-    def __init__(self, base_url="https://developer.dji.com/api-reference/android-api/"):
+    def __init__(self, base_url=DEFAULT_BASE_URL, concurrency=1, parse_workers=0,
+                 priority_rules=None, page_budget=None, time_budget=None,
+                 shared_frontier=None, worker_id=None, checkpoint='sqlite', output='text'):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.worker_id = worker_id
+        
+        # Crawl best-first (opt-in): con reglas, la frontera saca primero lo más valioso
+        self.scorer = None
+        if priority_rules is not None:
+            self.scorer = PriorityScorer(priority_rules, component_of=detect_component_type)
+        
+        # Presupuesto de la corrida: máximo de páginas nuevas y/o de segundos
+        self.page_budget = page_budget
+        self.time_budget = time_budget
+        
+        # Descargas concurrentes (opt-in): máximo de requests en vuelo a la vez
+        self.concurrency = max(1, int(concurrency))
+        
+        # Parseo en procesos aparte (opt-in): el fetch no espera al parseo
+        self.parse_workers = max(0, int(parse_workers))
+        self.parse_queue_size = self.parse_workers * 2
+        self.parse_pool = None
+        
+        # Frontera compartida en SQLite (opt-in): varios workers, un solo crawl
+        self.shared_frontier = None
+        if shared_frontier:
+            self.shared_frontier = SQLiteFrontier(shared_frontier, worker_id, score=self.scorer)
+        
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(concurrency=self.concurrency, archive=ARCHIVE_NAME)
+        self.archive = self.fetcher.archive
         
         # Archivos de estado y datos
-        self.progress_file = "dji_crawl_progress.json"
-        self.data_file = "dji_docs_data.json"
-        self.checkpoint_file = "dji_crawl_checkpoint.pkl"
+        self.progress_file = self.worker_file("dji_crawl_progress.json")
+        self.data_file = self.worker_file("dji_docs_data.json")
+        self.checkpoint_file = self.worker_file("dji_crawl_checkpoint.pkl")
+        self.store_file = self.worker_file("dji_crawl_store.db")
         
         # NUEVOS: Archivos de texto para información completa
-        self.full_content_file = "dji_docs_full_content.txt"
-        self.media_manager_file = "dji_media_manager_info.txt"
-        self.playback_manager_file = "dji_playback_manager_info.txt"
-        self.camera_methods_file = "dji_camera_methods.txt"
-        self.all_methods_file = "dji_all_methods_summary.txt"
+        self.full_content_file = self.worker_file("dji_docs_full_content.txt")
+        self.media_manager_file = self.worker_file("dji_media_manager_info.txt")
+        self.playback_manager_file = self.worker_file("dji_playback_manager_info.txt")
+        self.camera_methods_file = self.worker_file("dji_camera_methods.txt")
+        self.all_methods_file = self.worker_file("dji_all_methods_summary.txt")
+        self.summary_file = self.worker_file("dji_crawl_RESUMEN_FINAL.txt")
         
-        # Estado del crawler
+        # Reportes como sinks con offset: al reanudar se sigue agregando donde quedó el checkpoint.
+        # Con output='corpus' los cuerpos de página van solo al corpus comprimido
+        text_reports = [] if output == 'corpus' else [
+            self.full_content_file, self.media_manager_file, self.playback_manager_file,
+            self.camera_methods_file
+        ]
+        self.sinks = OutputSinks(text_reports + [self.all_methods_file])
+        self.corpus = None
+        if output != 'text':
+            self.corpus = CorpusWriter(self.worker_file("dji_corpus"))
+            self.sinks.add(self.corpus)
+        self.sink_offsets = None
+        
+        # Estado del crawler (todas las URLs en forma canónica)
+        self.canonicalizer = URLCanonicalizer()
         self.visited_urls = set()
-        self.pending_urls = []
+        self.frontier = self.make_frontier()  # URLs pendientes sin duplicados
+        self.batch_urls = []  # lote en curso: ya salió de la frontera y sigue pendiente
         self.all_docs = {}
         self.current_batch = 0
         self.max_batch_size = 15  # Reducir un poco para mejor calidad
         
+        # URLs fallidas: reintento con backoff exponencial y cuarentena
+        self.retry_queue = RetryQueue()
+        
+        # Calendario de revisiones: hash por URL e intervalo adaptativo (refresh)
+        self.recrawl = RecrawlSchedule()
+        
         # Contadores por tipo de contenido
         self.media_manager_pages = []
         self.playback_manager_pages = []
         self.camera_pages = []
-        self.all_methods = []
+        self.all_methods = PageMethods()
+        
+        # Checkpoint: base SQLite indexada (por defecto) o snapshot pickle + journal.
+        # El journal se abre siempre: de ahí se migran los checkpoints viejos
+        self.journal = CrawlJournal(self.checkpoint_file, self.worker_file("dji_crawl_journal.jsonl"))
+        self.store = None
+        if checkpoint == 'sqlite':
+            self.store = CrawlStore(self.store_file)
+            self.use_store_views()
+        self.checkpoint = self.store if self.store is not None else self.journal
         
         # Cargar estado previo si existe
-        self.load_progress()
+        self.resumed = self.load_progress()
         
-        # Inicializar archivos de texto
-        self.init_text_files()
+        # Los reportes se preparan recién al escribir: summary y similares no los tocan
+        self.reports_ready = False
+    
+    def prepare_reports(self):
+        """Retomar los reportes de texto desde el checkpoint o empezarlos de cero
+        
+        Un checkpoint sin offsets (anterior a los reportes reanudables) no
+        dice hasta dónde son válidos: se sigue agregando al final de lo que
+        hay, sin truncar nada que quizás no se pueda reconstruir. Con offsets,
+        cada salida se recorta o se empieza por separado (OutputSinks.resume).
+        """
+        if self.reports_ready:
+            return
+        self.reports_ready = True
+        if not self.resumed:
+            self.init_text_files()
+        elif not self.sink_offsets:
+            missing = self.sinks.adopt()
+            print("📎 El checkpoint no registra offsets de los reportes: se sigue agregando al final de los existentes")
+            if missing:
+                self.init_text_files(only=missing)
+        else:
+            restart = self.sinks.resume(self.sink_offsets)
+            if restart and len(self.visited_urls):
+                names = ', '.join(os.path.basename(path) for path in restart)
+                print(f"⚠️ Reportes sin las páginas anteriores del checkpoint, se empiezan de nuevo: {names} "
+                      "(python dji_docs_crawler_v3.py reparse los reconstruye sin red)")
+            if restart:
+                self.init_text_files(only=restart)
+        self.sink_offsets = self.sinks.offsets()
     
-    def init_text_files(self):
-        """Inicializar archivos de texto con headers"""
+    def init_text_files(self, only=None):
+        """Inicializar archivos de texto con headers (todos, o solo los de `only`)"""
+        self.reports_ready = True
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Archivo principal de contenido completo
-        with open(self.full_content_file, 'w', encoding='utf-8') as f:
-            f.write(f"""
+        self.reset_report(only, self.full_content_file, f"""
 ===============================================================================
 DJI SDK v4 - DOCUMENTACIÓN COMPLETA EXTRAÍDA
 ===============================================================================
@@ -71,8 +304,7 @@ URL Base: {self.base_url}
 """)
         
         # Archivo específico de MediaManager
-        with open(self.media_manager_file, 'w', encoding='utf-8') as f:
-            f.write(f"""
+        self.reset_report(only, self.media_manager_file, f"""
 ===============================================================================
 DJI SDK v4 - MEDIA MANAGER - DOCUMENTACIÓN COMPLETA
 ===============================================================================
@@ -83,8 +315,7 @@ Descripción: Toda la información relacionada con DJI MediaManager
 """)
         
         # Archivo específico de PlaybackManager
-        with open(self.playback_manager_file, 'w', encoding='utf-8') as f:
-            f.write(f"""
+        self.reset_report(only, self.playback_manager_file, f"""
 ===============================================================================
 DJI SDK v4 - PLAYBACK MANAGER - DOCUMENTACIÓN COMPLETA
 ===============================================================================
@@ -95,8 +326,7 @@ Descripción: Toda la información relacionada con DJI PlaybackManager
 """)
         
         # Archivo de métodos de cámara
-        with open(self.camera_methods_file, 'w', encoding='utf-8') as f:
-            f.write(f"""
+        self.reset_report(only, self.camera_methods_file, f"""
 ===============================================================================
 DJI SDK v4 - CAMERA METHODS - TODOS LOS MÉTODOS
 ===============================================================================
@@ -107,8 +337,7 @@ Descripción: Todos los métodos disponibles para Camera
 """)
         
         # Resumen de todos los métodos
-        with open(self.all_methods_file, 'w', encoding='utf-8') as f:
-            f.write(f"""
+        self.reset_report(only, self.all_methods_file, f"""
 ===============================================================================
 DJI SDK v4 - RESUMEN DE TODOS LOS MÉTODOS Y FUNCIONES
 ===============================================================================
@@ -117,362 +346,860 @@ Descripción: Índice completo de métodos, funciones y callbacks
 ===============================================================================
 
 """)
+        
+        # Corpus comprimido (si está activo)
+        if self.corpus is not None and (only is None or self.corpus.path in only):
+            self.corpus.reset()
+        self.sink_offsets = self.sinks.offsets()
+    
+    def reset_report(self, only, filename, header):
+        """Empezar un reporte de cero, si está entre las salidas activas (y en `only`, si se pasa)"""
+        if filename in self.sinks and (only is None or filename in only):
+            self.sinks.reset(filename, header)
     
-    def append_to_file(self, filename, content):
-        """Agregar contenido a un archivo de texto"""
+    def append_to_file(self, filename, *chunks):
+        """Agregar contenido (texto o bytes ya codificados) a un archivo de texto"""
+        if filename not in self.sinks:
+            return
         try:
-            with open(filename, 'a', encoding='utf-8') as f:
-                f.write(content)
-                f.write("\n")
+            self.sinks.write(filename, *chunks, b"\n")
         except Exception as e:
             print(f"❌ Error escribiendo a {filename}: {e}")
     
-    def save_progress(self):
-        """Guardar progreso actual"""
+    def worker_file(self, filename):
+        """Nombre de archivo propio del worker: dji_docs_data.json -> dji_docs_data.w1.json"""
+        if not self.worker_id:
+            return filename
+        root, ext = os.path.splitext(filename)
+        return f"{root}.{self.worker_id}{ext}"
+    
+    def save_progress(self, compact=False):
+        """Guardar progreso actual
+        
+        Normalmente solo baja a disco el journal: costo constante por página.
+        El snapshot completo y los JSON de progreso y datos se reescriben al
+        compactar, en segundo plano cuando el journal ya pesa como el snapshot
+        o en el momento con compact=True (cambios en bloque y fin del crawl).
+        """
+        # Primero los reportes: lo que el checkpoint confirma ya tiene que estar escrito
+        self.prepare_reports()
+        self.sinks.flush()
+        self.checkpoint.flush()
+        if compact or self.checkpoint.needs_compaction():
+            self.compact(background=not compact)
+        
+        print(f"💾 Progreso guardado: {len(self.visited_urls)} procesadas, {len(self.frontier)} pendientes")
+        print(f"   📱 MediaManager: {len(self.media_manager_pages)} páginas")
+        print(f"   🎮 PlaybackManager: {len(self.playback_manager_pages)} páginas")
+        print(f"   📷 Camera: {len(self.camera_pages)} páginas")
+        print(f"   ⚙️ Métodos totales: {len(self.all_methods)}")
+        if len(self.retry_queue) or self.retry_queue.quarantined:
+            print(f"   🔁 Reintentos: {len(self.retry_queue)} en cola, {len(self.retry_queue.quarantined)} en cuarentena")
+    
+    def compact(self, background=True):
+        """Escribir snapshot, progreso y datos completos y descartar el journal cubierto"""
+        # Con frontera compartida lo pendiente vive en SQLite, no en el checkpoint.
+        # Lo que queda del lote en curso va adelante: ya salió de la frontera
+        pending = []
+        if not self.shared_frontier:
+            in_batch = [url for url in self.batch_urls if not self.is_known(url)]
+            pending = list(dict.fromkeys(in_batch + self.frontier.to_list()))
         progress = {
-            'visited_urls': list(self.visited_urls),
-            'pending_urls': self.pending_urls,
+            'visited_urls': self.visited_urls,
+            'pending_urls': pending,
             'current_batch': self.current_batch,
             'timestamp': datetime.now().isoformat(),
             'total_processed': len(self.visited_urls),
-            'total_pending': len(self.pending_urls),
+            'total_pending': len(self.frontier),
             'media_manager_count': len(self.media_manager_pages),
             'playback_manager_count': len(self.playback_manager_pages),
             'camera_count': len(self.camera_pages),
-            'total_methods': len(self.all_methods)
+            'total_methods': len(self.all_methods),
+            'retry_pending': len(self.retry_queue),
+            'canonical_saved_fetches': self.canonicalizer.saved_fetches(),
+            'quarantined_urls': list(self.retry_queue.quarantined)
         }
         
-        # Guardar progreso en JSON
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
-        
-        # Guardar datos en JSON
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.all_docs, f, indent=2, ensure_ascii=False)
-        
-        # Guardar checkpoint completo
-        with open(self.checkpoint_file, 'wb') as f:
-            pickle.dump({
-                'visited_urls': self.visited_urls,
-                'pending_urls': self.pending_urls,
-                'all_docs': self.all_docs,
-                'current_batch': self.current_batch,
-                'media_manager_pages': self.media_manager_pages,
-                'playback_manager_pages': self.playback_manager_pages,
-                'camera_pages': self.camera_pages,
-                'all_methods': self.all_methods
-            }, f)
-        
-        print(f"💾 Progreso guardado: {len(self.visited_urls)} procesadas, {len(self.pending_urls)} pendientes")
-        print(f"   📱 MediaManager: {len(self.media_manager_pages)} páginas")
-        print(f"   🎮 PlaybackManager: {len(self.playback_manager_pages)} páginas")
-        print(f"   📷 Camera: {len(self.camera_pages)} páginas")
-        print(f"   ⚙️ Métodos totales: {len(self.all_methods)}")
+        if self.store is not None:
+            # Las páginas ya están en sus tablas: falta lo que cambió en bloque y los JSON
+            self.store.save_pending(pending)
+            self.store.save_retry_state(self.retry_queue.to_dict())
+            self.store.set_meta('current_batch', self.current_batch)
+            self.store.set_meta('sink_offsets', self.sink_offsets)
+            self.store.save_generation()
+            # Visitadas y páginas salen fila por fila de la base: el JSON no se arma en memoria
+            progress['visited_urls'] = iter(self.visited_urls)
+            atomic_write_json_stream(self.progress_file, progress.items())
+            atomic_write_json_stream(self.data_file, self.all_docs.items())
+            print(f"🗄️ Checkpoint consolidado en {self.store_file} (generación anterior en .prev)")
+            return
+        
+        # Copias: el crawl sigue modificando el estado mientras el hilo escribe
+        progress['visited_urls'] = list(self.visited_urls)
+        state = {
+            'visited_urls': set(self.visited_urls),
+            'pending_urls': pending,
+            'all_docs': dict(self.all_docs),
+            'current_batch': self.current_batch,
+            'media_manager_pages': list(self.media_manager_pages),
+            'playback_manager_pages': list(self.playback_manager_pages),
+            'camera_pages': list(self.camera_pages),
+            'page_methods': dict(self.all_methods.pages),
+            'all_methods': list(self.all_methods.unowned),
+            'retry_queue': copy.deepcopy(self.retry_queue.to_dict()),
+            'recrawl': copy.deepcopy(self.recrawl.to_dict()),
+            'sink_offsets': self.sink_offsets
+        }
+        
+        json_files = [(self.progress_file, progress), (self.data_file, state['all_docs'])]
+        if self.journal.compact(state, json_files, background=background):
+            print(f"🗜️ Checkpoint compactado{' en segundo plano' if background else ''}: snapshot completo")
     
     def load_progress(self):
         """Cargar progreso previo si existe"""
         try:
-            if os.path.exists(self.checkpoint_file):
-                with open(self.checkpoint_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self.visited_urls = data.get('visited_urls', set())
-                    self.pending_urls = data.get('pending_urls', [])
-                    self.all_docs = data.get('all_docs', {})
-                    self.current_batch = data.get('current_batch', 0)
-                    self.media_manager_pages = data.get('media_manager_pages', [])
-                    self.playback_manager_pages = data.get('playback_manager_pages', [])
-                    self.camera_pages = data.get('camera_pages', [])
-                    self.all_methods = data.get('all_methods', [])
-                
-                print(f"🔄 Recuperando progreso: {len(self.visited_urls)} ya procesadas")
-                return True
-            
+            if self.store is not None:
+                return self.load_store()
+            return self.load_journal()
         except Exception as e:
             print(f"⚠️ Error cargando progreso: {e}")
         
         return False
     
-    def is_valid_dji_url(self, url):
-        """Verificar si la URL es válida para DJI docs"""
-        if not url:
-            return False
+    def load_store(self):
+        """Reanudar desde la base: solo frontera, reintentos y contadores
         
-        parsed = urlparse(url)
-        if parsed.netloc != 'developer.dji.com':
-            return False
+        Páginas, métodos y calendario de revisiones se consultan con las
+        vistas del store, así la memoria no crece con el corpus.
+        """
+        if self.store.is_empty() and (os.path.exists(self.checkpoint_file) or self.journal.segments()):
+            self.migrate_checkpoint()
         
-        if not parsed.path.startswith('/api-reference/android-api/'):
-            return False
+        self.current_batch = self.store.get_meta('current_batch', 0)
+        self.sink_offsets = self.store.get_meta('sink_offsets')
+        self.retry_queue.load_dict(self.store.retry_state())
+        self.frontier = self.make_frontier(url for url in self.store.pending_urls() if url not in self.visited_urls)
         
-        # Filtros adicionales
-        skip_patterns = [
-            'javascript:', 'mailto:', '#', 'tel:',
-            '.pdf', '.zip', '.jpg', '.png', '.gif'
-        ]
+        if len(self.visited_urls) or len(self.frontier) or len(self.retry_queue):
+            print(f"🔄 Recuperando progreso: {len(self.visited_urls)} ya procesadas (desde {self.store_file})")
+            return True
+        return False
+    
+    def migrate_checkpoint(self):
+        """Importar una sola vez el checkpoint pickle (+ journal) a la base"""
+        print(f"📦 Migrando {self.checkpoint_file} a {self.store_file}...")
+        self.load_journal()
+        self.store.import_state(self.all_docs, self.all_methods.unowned, self.frontier.to_list(),
+                                self.retry_queue.to_dict(), self.recrawl.entries, self.current_batch,
+                                page_methods=self.all_methods.pages)
+        if self.sink_offsets:
+            self.store.set_meta('sink_offsets', self.sink_offsets)
+            self.store.flush()
+        self.use_store_views()
+        summary = self.store.summary()
+        print(f"📦 Migración completa: {summary['pages']} páginas, {summary['methods']} métodos, "
+              f"{summary['pending']} pendientes ({self.checkpoint_file} queda como respaldo)")
+    
+    def use_store_views(self):
+        """Apuntar el estado de páginas a vistas sobre la base"""
+        self.visited_urls = self.store.visited
+        self.all_docs = self.store.docs
+        self.media_manager_pages = self.store.component_pages('MediaManager')
+        self.playback_manager_pages = self.store.component_pages('PlaybackManager')
+        self.camera_pages = self.store.component_pages('Camera')
+        self.all_methods = self.store.methods
+        self.recrawl.entries = self.store.recrawl_entries
+    
+    def load_journal(self):
+        """Cargar snapshot + replay del journal en memoria"""
+        data = self.journal.load_snapshot() or {}
+        # Checkpoints viejos pueden tener variantes sin canonicalizar
+        self.visited_urls = {canonicalize_url(url) for url in data.get('visited_urls', set())}
+        pending = dict.fromkeys(map(canonicalize_url, data.get('pending_urls', [])))
+        self.all_docs = data.get('all_docs', {})
+        self.current_batch = data.get('current_batch', 0)
+        self.media_manager_pages = data.get('media_manager_pages', [])
+        self.playback_manager_pages = data.get('playback_manager_pages', [])
+        self.camera_pages = data.get('camera_pages', [])
+        if 'page_methods' in data:
+            self.all_methods = PageMethods(data['page_methods'], data.get('all_methods', []))
+        else:
+            self.all_methods = PageMethods.from_flat(self.all_docs, data.get('all_methods', []))
+        self.retry_queue.load_dict(data.get('retry_queue', {}))
+        self.recrawl.load_dict(data.get('recrawl', {}))
+        self.sink_offsets = data.get('sink_offsets')
         
-        for pattern in skip_patterns:
-            if pattern in url.lower():
-                return False
+        replayed = self.replay_journal(pending)
+        self.frontier = self.make_frontier(url for url in pending if url not in self.visited_urls)
         
-        return True
+        if data or replayed:
+            print(f"🔄 Recuperando progreso: {len(self.visited_urls)} ya procesadas")
+            if replayed:
+                print(f"   📓 {replayed} operaciones del journal reproducidas sobre el snapshot")
+            return True
+        return False
+    
+    def replay_journal(self, pending):
+        """Aplicar sobre el estado cargado las operaciones posteriores al snapshot
+        
+        `pending` es un dict ordenado de URLs pendientes; las que se
+        registraron o fallaron después del snapshot salen de ahí.
+        """
+        replayed = 0
+        for op in self.journal.replay():
+            replayed += 1
+            kind = op['op']
+            if kind == 'page':
+                pending.pop(op['url'], None)
+                self.apply_page(op['url'], op['doc'], op['methods'])
+                self.retry_queue.record_success(op['url'])
+                self.sink_offsets = op.get('sinks', self.sink_offsets)
+            elif kind == 'links':
+                pending.update(dict.fromkeys(op['urls']))
+            elif kind == 'retry':
+                url = op['url']
+                pending.pop(url, None)
+                self.retry_queue.entries.pop(url, None)
+                if op['quarantined']:
+                    self.retry_queue.quarantined[url] = op['entry']
+                else:
+                    self.retry_queue.entries[url] = op['entry']
+            elif kind == 'recrawl':
+                self.recrawl.entries[op['url']] = op['entry']
+            elif kind == 'batch':
+                self.current_batch = op['current_batch']
+        return replayed
+    
+    def apply_page(self, url, content, page_methods):
+        """Sumar una página al estado en memoria (backend journal)"""
+        previous = self.all_docs.get(url)
+        if previous is not None:
+            self.forget_page(url, previous)
+        self.all_docs[url] = content
+        self.visited_urls.add(url)
+        component_pages = {
+            'MediaManager': self.media_manager_pages,
+            'PlaybackManager': self.playback_manager_pages,
+            'Camera': self.camera_pages
+        }.get(content['component_type'])
+        if component_pages is not None:
+            component_pages.append(url)
+        # Los métodos son de la URL: los de una versión anterior se reemplazan
+        self.all_methods.set(url, page_methods)
+    
+    def forget_page(self, url, doc):
+        """Quitar de las listas por componente la versión anterior de una página (refresh)"""
+        for component_pages in (self.media_manager_pages, self.playback_manager_pages, self.camera_pages):
+            if url in component_pages:
+                component_pages.remove(url)
+    
+    def commit_page(self, url, content, page_methods, links):
+        """Registrar una página procesada en el checkpoint y en el estado"""
+        # Offsets de los reportes con esta página ya escrita: al reanudar se trunca ahí
+        op = {'op': 'page', 'url': url, 'doc': content, 'methods': page_methods, 'sinks': self.sinks.offsets()}
+        # Lo que un snapshot puede confirmar: una página a medio escribir (Ctrl+C) no cuenta
+        self.sink_offsets = op['sinks']
+        if self.store is not None:
+            # Solo la base guarda el grafo de links; las vistas ya ven la página
+            op['links'] = links
+            self.store.append(op)
+        else:
+            self.journal.append(op)
+            self.apply_page(url, content, page_methods)
+        self.retry_queue.record_success(url)
+    
+    def journal_links(self, urls):
+        """Anotar URLs encoladas (con frontera compartida ya quedan en SQLite)"""
+        if urls and self.shared_frontier is None:
+            self.checkpoint.append({'op': 'links', 'urls': urls})
+    
+    def record_digest(self, url, digest):
+        """Pasar el hash de una descarga al calendario de revisiones y anotarlo"""
+        changed = self.recrawl.record(url, digest)
+        self.checkpoint.append({'op': 'recrawl', 'url': url, 'entry': self.recrawl.entries[url]})
+        return changed
+    
+    def make_frontier(self, urls=()):
+        """Frontera FIFO, por prioridad si hay reglas de puntaje, o la compartida"""
+        if self.shared_frontier is not None:
+            self.shared_frontier.extend(urls)
+            return self.shared_frontier
+        if self.scorer is not None:
+            return PriorityFrontier(self.scorer, urls)
+        return CrawlFrontier(urls)
+    
+    def is_valid_dji_url(self, url):
+        """Verificar si la URL es válida para DJI docs"""
+        return is_valid_dji_url(url, self.base_url)
     
     def extract_methods_from_content(self, soup, url):
         """Extraer métodos específicos del contenido"""
-        methods = []
-        
-        # Buscar métodos de diferentes maneras
-        method_selectors = [
-            'div[id*="method"]',
-            'div[class*="method"]',
-            'section[id*="method"]',
-            'div[id*="function"]',
-            'h3[id*="method"]',
-            'h4[id*="method"]',
-            'code:contains("(")',
-            'pre:contains("(")'
-        ]
+        return extract_methods_from_content(soup)
+    
+    def fetch_page(self, url):
+        """Descargar una página y devolver el contenido crudo"""
+        # Se archiva después, en el hilo principal (orden de crawl)
+        return self.fetcher.get(url, archive=False).content
+    
+    def prefetch_page(self, url):
+        """Descargar una página desde un worker; devuelve (contenido, error)"""
+        try:
+            return self.fetch_page(url), None
+        except Exception as e:
+            return None, e
+    
+    def prefetch_batch(self, urls):
+        """Descargar un lote con hasta self.concurrency requests en vuelo.
         
-        for selector in method_selectors:
-            try:
-                elements = soup.select(selector)
-                for elem in elements:
-                    text = elem.get_text(strip=True)
-                    if '(' in text and len(text) < 200:  # Probablemente un método
-                        methods.append(text)
-            except:
-                continue
-        
-        # Buscar también en el texto general
-        text_content = soup.get_text()
-        lines = text_content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if ('(' in line and ')' in line and 
-                any(keyword in line.lower() for keyword in ['public', 'void', 'boolean', 'string', 'int', 'callback']) and
-                len(line) < 150):
-                methods.append(line)
-        
-        return list(set(methods))  # Eliminar duplicados
-    
-    def extract_content_and_links(self, url):
-        """Extraer contenido y links de una página"""
+        Devuelve un iterador de (url, (contenido, error)) en el mismo orden
+        que `urls`, así el procesamiento posterior es idéntico al secuencial.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
         try:
-            print(f"🔍 Explorando: {url}")
-            
-            response = self.session.get(url, timeout=20)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer contenido básico
-            title = soup.title.string if soup.title else 'Sin título'
-            
-            # Extraer contenido completo de la página
-            full_text = soup.get_text(separator='\n', strip=True)
-            
-            # Detectar tipo de contenido
-            url_lower = url.lower()
-            component_type = 'General'
+            for url, result in zip(urls, pool.map(self.prefetch_page, urls)):
+                yield url, result
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def record_page(self, page, fetched_at=None):
+        """Registrar una página ya parseada: reportes de texto, estado y checkpoint
+        
+        Devuelve (content, new_links) con la entrada para all_docs y los
+        links todavía no visitados.
+        """
+        self.prepare_reports()
+        url = page['url']
+        title = page['title']
+        full_text = page['full_text']
+        component_type = page['component_type']
+        page_methods = page['methods']
+        fetched_at = fetched_at or datetime.now()
+        fecha = fetched_at.strftime("%Y-%m-%d %H:%M:%S")
+        
+        # El cuerpo se codifica una sola vez y va como trozo a cada reporte
+        body = full_text.encode('utf-8')
+        
+        if component_type == 'MediaManager':
+            print(f"📱 Encontrado contenido MediaManager")
             
-            if 'mediamanager' in url_lower:
-                component_type = 'MediaManager'
-                print(f"📱 Encontrado contenido MediaManager")
-                self.media_manager_pages.append(url)
-                
-                # Guardar información específica de MediaManager
-                media_content = f"""
+            # Guardar información específica de MediaManager
+            media_header = f"""
 -------------------------------------------------------------------------------
 URL: {url}
 TÍTULO: {title}
-FECHA: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+FECHA: {fecha}
 TIPO: MediaManager
 -------------------------------------------------------------------------------
 
-{full_text}
-
-===============================================================================
 """
-                self.append_to_file(self.media_manager_file, media_content)
-                
-            elif 'playback' in url_lower:
-                component_type = 'PlaybackManager'
-                print(f"🎮 Encontrado contenido PlaybackManager")
-                self.playback_manager_pages.append(url)
-                
-                # Guardar información específica de PlaybackManager
-                playback_content = f"""
+            self.append_to_file(self.media_manager_file, media_header, body, SECTION_FOOTER)
+            
+        elif component_type == 'PlaybackManager':
+            print(f"🎮 Encontrado contenido PlaybackManager")
+            
+            # Guardar información específica de PlaybackManager
+            playback_header = f"""
 -------------------------------------------------------------------------------
 URL: {url}
 TÍTULO: {title}
-FECHA: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+FECHA: {fecha}
 TIPO: PlaybackManager
 -------------------------------------------------------------------------------
 
-{full_text}
-
-===============================================================================
 """
-                self.append_to_file(self.playback_manager_file, playback_content)
-                
-            elif 'camera' in url_lower:
-                component_type = 'Camera'
-                print(f"📷 Encontrado contenido Camera")
-                self.camera_pages.append(url)
-                
-                # Guardar información específica de Camera
-                camera_content = f"""
+            self.append_to_file(self.playback_manager_file, playback_header, body, SECTION_FOOTER)
+            
+        elif component_type == 'Camera':
+            print(f"📷 Encontrado contenido Camera")
+            
+            # Guardar información específica de Camera
+            camera_header = f"""
 -------------------------------------------------------------------------------
 URL: {url}
 TÍTULO: {title}
-FECHA: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+FECHA: {fecha}
 TIPO: Camera
 -------------------------------------------------------------------------------
 
-{full_text}
-
-===============================================================================
 """
-                self.append_to_file(self.camera_methods_file, camera_content)
+            self.append_to_file(self.camera_methods_file, camera_header, body, SECTION_FOOTER)
+        
+        # Métodos de esta página
+        if page_methods:
+            print(f"⚙️ Encontrados {len(page_methods)} métodos en esta página")
             
-            # Extraer métodos de esta página
-            page_methods = self.extract_methods_from_content(soup, url)
-            if page_methods:
-                print(f"⚙️ Encontrados {len(page_methods)} métodos en esta página")
-                self.all_methods.extend(page_methods)
-                
-                # Agregar métodos al resumen
-                methods_content = f"""
+            # Agregar métodos al resumen
+            methods_header = f"""
 -------------------------------------------------------------------------------
 MÉTODOS ENCONTRADOS EN: {url}
 TÍTULO: {title}
-FECHA: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+FECHA: {fecha}
 TOTAL MÉTODOS: {len(page_methods)}
 -------------------------------------------------------------------------------
 
 """
-                for i, method in enumerate(page_methods, 1):
-                    methods_content += f"{i:3d}. {method}\n"
-                
-                methods_content += "\n===============================================================================\n"
-                self.append_to_file(self.all_methods_file, methods_content)
-            
-            # Guardar contenido completo en archivo principal
-            full_content = f"""
+            methods_list = "".join(f"{i:3d}. {method}\n" for i, method in enumerate(page_methods, 1))
+            self.append_to_file(self.all_methods_file, methods_header, methods_list,
+                                "\n===============================================================================\n")
+        
+        # Guardar contenido completo en archivo principal
+        full_header = f"""
 ===============================================================================
 URL: {url}
 TÍTULO: {title}
 TIPO: {component_type}
-FECHA: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+FECHA: {fecha}
 MÉTODOS ENCONTRADOS: {len(page_methods)}
 ===============================================================================
 
-{full_text}
-
 """
-            self.append_to_file(self.full_content_file, full_content)
-            
-            # Preparar estructura de datos
-            content = {
+        self.append_to_file(self.full_content_file, full_header, body, "\n\n")
+        
+        # Registro comprimido con el texto completo, legible por URL sin descomprimir el resto
+        if self.corpus is not None:
+            self.corpus.add({
                 'url': url,
                 'title': title,
                 'component_type': component_type,
-                'timestamp': datetime.now().isoformat(),
-                'methods_count': len(page_methods),
-                'content_length': len(full_text),
-                'methods': page_methods[:20]  # Solo primeros 20 para JSON
-            }
+                'fetched_at': fetched_at.isoformat(),
+                'methods': page_methods,
+                'text': full_text
+            })
+        
+        # Preparar estructura de datos
+        content = {
+            'url': url,
+            'title': title,
+            'component_type': component_type,
+            'timestamp': fetched_at.isoformat(),
+            'methods_count': len(page_methods),
+            'content_length': len(full_text),
+            'methods': page_methods[:20]  # Solo primeros 20 para JSON
+        }
+        
+        links = list(dict.fromkeys(map(self.canonicalizer.canonical, page['links'])))
+        new_links = [link for link in links if link not in self.visited_urls]
+        
+        self.commit_page(url, content, page_methods, links)
+        return content, new_links
+    
+    def extract_content_and_links(self, url, prefetched=None, parsed=None):
+        """Extraer contenido y links de una página
+        
+        Si `prefetched` es una tupla (contenido, error) ya descargada por
+        prefetch_batch, se usa en lugar de hacer el request aquí. Si `parsed`
+        es un Future de parse_page (etapa de parseo), solo se registra.
+        """
+        try:
+            print(f"🔍 Explorando: {url}")
             
-            # Extraer todos los links válidos
-            new_links = []
-            for link in soup.find_all('a', href=True):
-                full_url = urljoin(url, link['href'])
-                if self.is_valid_dji_url(full_url) and full_url not in self.visited_urls:
-                    new_links.append(full_url)
+            if prefetched is None:
+                html = self.fetch_page(url)
+            else:
+                html, error = prefetched
+                if error is not None:
+                    raise error
             
-            return content, new_links
+            if parsed is not None:
+                return self.record_page(parsed.result())
             
-        except requests.exceptions.Timeout:
+            # Archivar en el hilo principal: el índice queda en orden de crawl
+            self.record_digest(url, self.archive.store(url, html))
+            
+            return self.record_page(parse_page(url, html, self.base_url))
+            
+        except requests.exceptions.Timeout as e:
             print(f"⏱️ Timeout en: {url}")
+            self.register_failure(url, e)
             return None, []
         except requests.exceptions.RequestException as e:
             print(f"❌ Error de red en {url}: {e}")
+            self.register_failure(url, e)
             return None, []
         except Exception as e:
             print(f"❌ Error procesando {url}: {e}")
+            self.register_failure(url, e)
             return None, []
     
+    def is_known(self, url):
+        """URL ya procesada, esperando su reintento o en cuarentena: no se vuelve a encolar"""
+        return url in self.visited_urls or url in self.retry_queue or url in self.retry_queue.quarantined
+    
+    def register_failure(self, url, error):
+        """Mandar una URL fallida a la cola de reintentos (o a cuarentena)"""
+        response = getattr(error, 'response', None)
+        permanent = response is not None and response.status_code in PERMANENT_STATUS_CODES
+        if self.shared_frontier is not None:
+            # Los intentos se cuentan en la base compartida, no en este proceso
+            outcome, attempts, next_attempt = self.shared_frontier.record_failure(
+                url, error, self.retry_queue, permanent=permanent)
+            if outcome == 'quarantined':
+                print(f"🚫 En cuarentena ({attempts} intentos): {url}")
+            else:
+                print(f"🔁 Reintento {attempts + 1} programado en {next_attempt - time.time():.0f}s: {url}")
+            return
+        
+        outcome = self.retry_queue.record_failure(url, error, permanent=permanent)
+        if outcome == 'quarantined':
+            entry = self.retry_queue.quarantined[url]
+            print(f"🚫 En cuarentena ({entry['reason']}, {entry['attempts']} intentos): {url}")
+        else:
+            entry = self.retry_queue.entries[url]
+            wait = entry['next_attempt'] - time.time()
+            print(f"🔁 Reintento {entry['attempts'] + 1} programado en {wait:.0f}s: {url}")
+        self.checkpoint.append({'op': 'retry', 'url': url, 'entry': entry, 'quarantined': outcome == 'quarantined'})
+    
+    def parse_pipeline(self, pages):
+        """Etapa de parseo: fetch -> cola acotada -> pool de procesos
+        
+        Cada página descargada se manda a parsear apenas llega, mientras
+        siguen las descargas. Los resultados se registran en el orden de
+        envío, así los reportes salen igual que en modo secuencial.
+        """
+        if self.parse_pool is None:
+            self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        
+        in_flight = deque()
+        for url, prefetched in pages:
+            html, error = prefetched
+            parsed = None
+            if error is None:
+                # Archivar en el hilo principal: el índice queda en orden de crawl
+                self.record_digest(url, self.archive.store(url, html))
+                parsed = self.parse_pool.submit(parse_page, url, html, self.base_url)
+            in_flight.append((url, prefetched, parsed))
+            
+            # Cola llena: registrar el más viejo antes de seguir descargando
+            while len(in_flight) > self.parse_queue_size:
+                url, prefetched, parsed = in_flight.popleft()
+                yield url, self.extract_content_and_links(url, prefetched, parsed)
+        
+        while in_flight:
+            url, prefetched, parsed = in_flight.popleft()
+            yield url, self.extract_content_and_links(url, prefetched, parsed)
+    
+    def close_parse_pool(self):
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(wait=True, cancel_futures=True)
+            self.parse_pool = None
+    
     def process_batch(self, batch_size=None):
         """Procesar un lote de URLs"""
         if batch_size is None:
             batch_size = self.max_batch_size
         
-        if not self.pending_urls:
+        # Los reintentos vencidos entran primero al lote
+        retries = self.retry_queue.due(limit=batch_size)
+        
+        if not self.frontier and not retries:
+            if len(self.retry_queue):
+                print(f"⏳ No hay URLs listas: {len(self.retry_queue)} esperando reintento")
+                return True
             print("✅ No hay URLs pendientes para procesar")
             return False
         
         # Tomar el próximo lote
-        batch = self.pending_urls[:batch_size]
-        self.pending_urls = self.pending_urls[batch_size:]
+        take = batch_size - len(retries)
+        batch = retries + self.frontier.pop_batch(take)
+        in_flight = set(batch)
+        self.batch_urls = batch
+        
+        if not batch:
+            # Frontera compartida: lo que queda está reclamado por otros workers o diferido
+            wait = min(self.frontier.seconds_until_next() or SHARED_POLL_SECONDS, SHARED_POLL_SECONDS)
+            print(f"⏳ {len(self.frontier)} URLs en manos de otros workers o diferidas, esperando {wait:.1f}s")
+            time.sleep(wait)
+            return True
         
         print(f"\n🚀 Procesando lote {self.current_batch + 1}: {len(batch)} URLs")
+        if retries:
+            print(f"🔁 Incluye {len(retries)} reintentos")
+        
+        if self.concurrency > 1 or self.parse_workers:
+            # Descargar en paralelo; el estado se actualiza en este hilo y en orden
+            to_fetch = list(dict.fromkeys(url for url in batch if url not in self.visited_urls))
+            pages = self.prefetch_batch(to_fetch)
+        else:
+            pages = ((url, None) for url in batch)
+        
+        if self.parse_workers:
+            results = self.parse_pipeline(pages)
+        else:
+            results = (
+                (url, self.extract_content_and_links(url, prefetched))
+                for url, prefetched in pages if url not in self.visited_urls
+            )
         
         processed_count = 0
-        for url in batch:
-            if url in self.visited_urls:
-                continue
-            
-            content, new_links = self.extract_content_and_links(url)
+        for url, (content, new_links) in results:
+            if self.shared_frontier is not None:
+                # Renovar en cada intento, también los fallidos: un lote de fetches lentos
+                # o con error puede durar más que el lease y otro worker repetiría sus URLs
+                self.shared_frontier.renew_leases()
             
             if content:
-                self.all_docs[url] = content
-                self.visited_urls.add(url)
                 processed_count += 1
                 
-                # Agregar nuevos links únicos
-                for link in new_links:
-                    if link not in self.visited_urls and link not in self.pending_urls:
-                        self.pending_urls.append(link)
+                # Agregar nuevos links únicos (los del lote en curso ya están en camino)
+                # ni los que esperan reintento o están en cuarentena: respetan su backoff
+                links = [link for link in new_links if not self.is_known(link) and link not in in_flight]
+                self.frontier.extend(links)
+                self.journal_links(links)
                 
-                print(f"  ✅ Procesado: {content.get('title', 'Sin título')[:50]}")
+                if self.shared_frontier is not None:
+                    self.shared_frontier.complete(url)
                 
-                # Pausa para no sobrecargar el servidor
-                time.sleep(1.0)  # Aumentar un poco la pausa
+                print(f"  ✅ Procesado: {content.get('title', 'Sin título')[:50]}")
             
             # Guardar progreso cada 3 URLs (más frecuente)
             if processed_count % 3 == 0:
                 self.save_progress()
         
+        if self.shared_frontier is not None:
+            # URLs del lote que ya estaban visitadas por este worker: cerrar su lease
+            for url in batch:
+                if url in self.visited_urls:
+                    self.shared_frontier.complete(url)
+        
+        self.batch_urls = []
         self.current_batch += 1
+        self.checkpoint.append({'op': 'batch', 'current_batch': self.current_batch})
         self.save_progress()
         
         print(f"📊 Lote completado: {processed_count} nuevas páginas procesadas")
-        print(f"📈 Total acumulado: {len(self.visited_urls)} páginas, {len(self.pending_urls)} pendientes")
+        print(f"📈 Total acumulado: {len(self.visited_urls)} páginas, {len(self.frontier)} pendientes")
         
-        return len(self.pending_urls) > 0
+        return len(self.frontier) > 0 or len(self.retry_queue) > 0
     
     def start_crawl(self, start_url=None):
         """Iniciar o continuar el crawling"""
-        if start_url and not self.pending_urls and not self.visited_urls:
-            self.pending_urls.append(start_url)
+        if (start_url and not self.frontier and not self.visited_urls
+                and not self.is_known(canonicalize_url(start_url))):
+            start_url = self.canonicalizer.canonical(start_url)
+            self.frontier.push(start_url)
+            self.journal_links([start_url])
             print(f"🚀 Iniciando crawl desde: {start_url}")
-        elif self.pending_urls:
-            print(f"🔄 Continuando crawl con {len(self.pending_urls)} URLs pendientes")
+        elif self.frontier or len(self.retry_queue):
+            print(f"🔄 Continuando crawl con {len(self.frontier)} URLs pendientes y {len(self.retry_queue)} reintentos")
         else:
             print("❌ No hay URLs para procesar")
             return
         
+        if self.scorer is not None:
+            print("🎯 Crawl best-first: primero MediaManager, Playback y FetchMediaTaskScheduler")
+        
         # Procesar en lotes
-        while self.pending_urls:
-            has_more = self.process_batch()
-            
-            if not has_more:
+        started = time.monotonic()
+        visited_at_start = len(self.visited_urls)
+        try:
+            while self.frontier or len(self.retry_queue):
+                remaining = self.remaining_budget(started, visited_at_start)
+                if remaining == 0:
+                    print(f"💰 Presupuesto agotado: {len(self.visited_urls) - visited_at_start} páginas nuevas "
+                          f"en {time.monotonic() - started:.0f}s, {len(self.frontier)} quedan pendientes")
+                    break
+                
+                if not self.frontier:
+                    # Solo quedan reintentos: esperar al próximo que venza
+                    wait = self.retry_queue.seconds_until_next()
+                    if wait and self.time_budget is not None and time.monotonic() - started + wait >= self.time_budget:
+                        print(f"💰 El próximo reintento ({wait:.0f}s) no entra en el presupuesto de tiempo")
+                        break
+                    if wait and self.fetcher.mode == 'replay':
+                        # Replay: el cassette responde igual ahora que después, no tiene sentido esperar
+                        print(f"⏩ Replay: se adelanta {wait:.0f}s hasta el próximo reintento")
+                        self.retry_queue.advance(wait)
+                    elif wait:
+                        print(f"⏳ Esperando {wait:.0f}s al próximo reintento ({len(self.retry_queue)} en cola)")
+                        time.sleep(wait)
+                
+                batch_size = min(self.max_batch_size, remaining) if remaining else None
+                has_more = self.process_batch(batch_size)
+                
+                if not has_more:
+                    break
+        except KeyboardInterrupt:
+            print(f"\n⏹️ Crawl interrumpido: {len(self.visited_urls)} procesadas, {len(self.frontier)} pendientes")
+            raise
+        finally:
+            self.close_parse_pool()
+            # Snapshot final, también si se cortó (Ctrl+C, SIGTERM, error): el próximo
+            # continue no tiene journal que reproducir y los JSON quedan al día
+            self.save_progress(compact=True)
+        
+        print("\n🎉 Crawling completado!")
+        self.fetcher.print_stats()
+        self.canonicalizer.print_stats()
+        self.generate_final_summary()
+    
+    def seed(self, start_url=None, url_files=None, use_sitemap=True):
+        """Cargar la frontera de una vez con las listas de URLs y el sitemap
+        
+        Así el primer lote ya sale con todo el ancho de concurrencia en vez de
+        esperar varias rondas de descubrimiento desde index.html.
+        """
+        sources = []
+        if start_url:
+            sources.append([('inicio', start_url)])
+        sources.append(load_url_files(url_files))
+        if use_sitemap:
+            sources.append(load_sitemap_urls(self.fetcher, self.base_url))
+        
+        counts = {}
+        valid = {}
+        for source in sources:
+            for origin, url in source:
+                stats = counts.setdefault(origin, {'urls': 0, 'nuevas': 0})
+                stats['urls'] += 1
+                url = self.canonicalizer.canonical(url)
+                if self.is_valid_dji_url(url) and not self.is_known(url):
+                    valid.setdefault(origin, []).append(url)
+        
+        # Un extend por origen: con frontera compartida es una transacción cada uno
+        for origin, urls in valid.items():
+            counts[origin]['nuevas'] = self.frontier.extend(urls)
+        
+        print(f"🌱 Semillas cargadas: {len(self.frontier)} URLs pendientes")
+        for origin, stats in counts.items():
+            print(f"   {origin}: {stats['urls']} URLs, {stats['nuevas']} nuevas")
+        self.save_progress(compact=True)
+    
+    def remaining_budget(self, started, visited_at_start):
+        """Páginas que quedan en el presupuesto: None sin límite de páginas, 0 agotado
+        
+        El tiempo se controla entre lotes: un lote empezado se termina.
+        """
+        if self.time_budget is not None and time.monotonic() - started >= self.time_budget:
+            return 0
+        if self.page_budget is None:
+            return None
+        return max(0, self.page_budget - (len(self.visited_urls) - visited_at_start))
+    
+    def refresh(self):
+        """Revisitar las páginas ya procesadas que tocan según el calendario
+        
+        Primero las más atrasadas respecto de su intervalo, dentro del
+        presupuesto de páginas/tiempo. Con el cache HTTP una página sin cambios
+        suele costar un 304. Solo las que cambiaron se vuelven a parsear y
+        registrar: su entrada se reemplaza en los datos y la versión nueva se
+        agrega al final de los reportes de texto y del corpus, que son
+        append-only: la versión vieja queda escrita más arriba (los lectores
+        por URL de dji_corpus_reader toman la última; reparse los reescribe
+        sin duplicados).
+        """
+        adopted = self.recrawl.adopt(self.visited_urls, self.archive.latest_entries(), self.all_docs)
+        if adopted:
+            print(f"📅 {adopted} páginas ya procesadas se suman al calendario de revisiones")
+        
+        due = self.recrawl.due()
+        if not due:
+            wait = self.recrawl.seconds_until_next()
+            if wait is None:
+                print("❌ No hay páginas procesadas para revisar")
+            else:
+                print(f"✅ Nada que revisar: la próxima revisión toca en {wait / 3600:.1f}h")
+            return
+        
+        print(f"🔄 Refresh: {len(due)} de {len(self.recrawl)} páginas tocan revisión")
+        started = time.monotonic()
+        checked = 0
+        failed = 0
+        changed_urls = []
+        discovered = []
+        while due:
+            if self.time_budget is not None and time.monotonic() - started >= self.time_budget:
                 break
+            take = self.max_batch_size
+            if self.page_budget is not None:
+                take = min(take, self.page_budget - checked)
+                if take <= 0:
+                    break
+            batch, due = due[:take], due[take:]
             
-            # Pausa entre lotes
-            print(f"⏸️ Pausa de 3 segundos entre lotes...")
-            time.sleep(3)
+            for url, (html, error) in self.prefetch_batch(batch):
+                checked += 1
+                if error is not None:
+                    print(f"❌ Error revisando {url}: {error}")
+                    self.recrawl.record_error(url)
+                    failed += 1
+                    continue
+                if self.record_digest(url, self.archive.store(url, html)):
+                    print(f"  ✏️ Cambió: {url}")
+                    try:
+                        content, new_links = self.record_page(parse_page(url, html, self.base_url))
+                    except Exception as e:
+                        print(f"❌ Error re-parseando {url}: {e}")
+                        # Los datos siguen con la versión anterior: que el próximo refresh la vuelva a tomar
+                        self.recrawl.forget_digest(url)
+                        self.checkpoint.append({'op': 'recrawl', 'url': url, 'entry': self.recrawl.entries[url]})
+                        failed += 1
+                        continue
+                    changed_urls.append(url)
+                    discovered.extend(new_links)
+            self.save_progress()
         
-        print("\n🎉 Crawling completado!")
+        stats = self.recrawl.stats()
+        print(f"\n📅 Refresh: {checked} revisadas en {time.monotonic() - started:.0f}s, "
+              f"{len(changed_urls)} cambiaron, {failed} con error, {len(due)} quedan para el próximo refresh")
+        print(f"   Calendario: {stats['urls']} URLs, {stats['volatile']} volátiles, "
+              f"{stats['stable']} estables, {stats['changed']} con cambios registrados")
+        self.fetcher.print_stats()
+        
+        # Links que aparecieron en las versiones nuevas
+        links = [link for link in dict.fromkeys(discovered) if not self.is_known(link)]
+        if links:
+            self.frontier.extend(links)
+            self.journal_links(links)
+            print(f"🔗 {len(links)} links nuevos encolados (python dji_docs_crawler_v3.py continue los procesa)")
+        
+        if changed_urls:
+            print(f"📝 Las versiones nuevas se agregaron al final de los reportes "
+                  f"(python dji_docs_crawler_v3.py reparse los reescribe sin las viejas)")
+            self.save_progress(compact=True)
+            self.generate_final_summary()
+    
+    def reparse_from_archive(self, workers=None):
+        """Reconstruir datos y reportes de texto desde el archivo HTML, sin red"""
+        entries = [entry for entry in self.archive.latest_entries() if self.is_valid_dji_url(entry['url'])]
+        if not entries:
+            print(f"❌ No hay páginas archivadas en {self.archive.directory}")
+            return
+        
+        archived = self.archive.summary()
+        print(f"🗄️ Archivo {self.archive.directory}: {archived['urls']} URLs, "
+              f"{archived['unique_bodies']} bodies distintos, {archived['raw_bytes'] / 1024:.1f} KB sin comprimir")
+        workers = workers or os.cpu_count() or 1
+        print(f"🧩 Re-parseando {len(entries)} páginas archivadas con {workers} procesos...")
+        
+        # Reiniciar estado derivado; los pendientes se conservan
+        previous_pending = self.frontier.to_list()
+        if self.store is not None:
+            self.store.clear_pages()
+        else:
+            self.visited_urls = set()
+            self.all_docs = {}
+            self.media_manager_pages = []
+            self.playback_manager_pages = []
+            self.camera_pages = []
+            self.all_methods = PageMethods()
+        self.init_text_files()
+        
+        discovered = []
+        tasks = [(entry['url'], entry['sha256'], self.base_url, self.archive.directory) for entry in entries]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map conserva el orden: los reportes salen en el orden original del crawl
+            for entry, page in zip(entries, pool.map(parse_archived_page, tasks, chunksize=8)):
+                if 'error' in page:
+                    print(f"❌ Error re-parseando {page['url']}: {page['error']}")
+                    continue
+                
+                content, new_links = self.record_page(page, fetched_at=datetime.fromisoformat(entry['fetched_at']))
+                discovered.extend(new_links)
+        
+        # Links conocidos que nunca se descargaron siguen pendientes
+        self.frontier = self.make_frontier(url for url in previous_pending + discovered if url not in self.visited_urls)
+        
+        self.save_progress(compact=True)
         self.generate_final_summary()
     
     def generate_final_summary(self):
@@ -483,6 +1210,25 @@ MÉTODOS ENCONTRADOS: {len(page_methods)}
         print(f"   🎮 PlaybackManager páginas: {len(self.playback_manager_pages)}")
         print(f"   📷 Camera páginas: {len(self.camera_pages)}")
         print(f"   ⚙️ Total métodos encontrados: {len(self.all_methods)}")
+        if self.store is not None:
+            print(f"   🔗 Links registrados: {self.store.summary()['links']}")
+        if self.retry_queue.quarantined:
+            print(f"   🚫 URLs en cuarentena: {len(self.retry_queue.quarantined)}")
+            for url, entry in self.retry_queue.quarantined.items():
+                print(f"      - {url} ({entry['last_error'][:80]})")
+        
+        # Salidas activas (con output='corpus' no hay reportes de texto por página)
+        generated = [(filename, description) for filename, description in (
+            (self.full_content_file, "Contenido completo de todas las páginas"),
+            (self.media_manager_file, "Información específica de MediaManager"),
+            (self.playback_manager_file, "Información específica de PlaybackManager"),
+            (self.camera_methods_file, "Métodos y funciones de Camera"),
+            (self.all_methods_file, "Resumen de todos los métodos encontrados")
+        ) if filename in self.sinks]
+        if self.corpus is not None:
+            generated.append((self.corpus.directory + "/", "Corpus comprimido (segmentos gzip + index.tsv por URL)"))
+        generated_files = "\n".join(f"{i}. {filename} - {description}"
+                                     for i, (filename, description) in enumerate(generated, 1))
         
         # Crear resumen final en archivo de texto
         summary_content = f"""
@@ -499,33 +1245,106 @@ DISTRIBUCIÓN POR COMPONENTES:
 - Camera páginas: {len(self.camera_pages)}
 - Otras páginas: {len(self.visited_urls) - len(self.media_manager_pages) - len(self.playback_manager_pages) - len(self.camera_pages)}
 
+URLS FALLIDAS:
+- Esperando reintento: {len(self.retry_queue)}
+- En cuarentena: {len(self.retry_queue.quarantined)}
+
 ARCHIVOS GENERADOS:
-1. {self.full_content_file} - Contenido completo de todas las páginas
-2. {self.media_manager_file} - Información específica de MediaManager
-3. {self.playback_manager_file} - Información específica de PlaybackManager
-4. {self.camera_methods_file} - Métodos y funciones de Camera
-5. {self.all_methods_file} - Resumen de todos los métodos encontrados
+{generated_files}
 
 ===============================================================================
 """
         
-        with open('dji_crawl_RESUMEN_FINAL.txt', 'w', encoding='utf-8') as f:
+        if self.retry_queue.quarantined:
+            summary_content += "\nURLS EN CUARENTENA (reintentar con: python dji_docs_crawler_v3.py requeue):\n"
+            for url, entry in self.retry_queue.quarantined.items():
+                summary_content += f"- {url}\n  {entry['reason']}, {entry['attempts']} intentos, último error: {entry['last_error']}\n"
+            summary_content += "\n===============================================================================\n"
+        
+        with open(self.summary_file, 'w', encoding='utf-8') as f:
             f.write(summary_content)
         
-        print(f"   💾 Resumen final guardado en: dji_crawl_RESUMEN_FINAL.txt")
+        print(f"   💾 Resumen final guardado en: {self.summary_file}")
         print(f"\n📁 ARCHIVOS CREADOS:")
-        print(f"   📜 {self.full_content_file}")
-        print(f"   📱 {self.media_manager_file}")
-        print(f"   🎮 {self.playback_manager_file}")
-        print(f"   📷 {self.camera_methods_file}")
-        print(f"   ⚙️ {self.all_methods_file}")
-        print(f"   📋 dji_crawl_RESUMEN_FINAL.txt")
+        for icon, filename in (('📜', self.full_content_file), ('📱', self.media_manager_file),
+                               ('🎮', self.playback_manager_file), ('📷', self.camera_methods_file),
+                               ('⚙️', self.all_methods_file)):
+            if filename in self.sinks:
+                print(f"   {icon} {filename}")
+        if self.corpus is not None:
+            stats = self.corpus.stats()
+            print(f"   📚 {self.corpus.directory}/ - {stats['segments']} segmentos, "
+                  f"{stats['disk_bytes'] / 1024:.1f} KB comprimidos")
+        print(f"   📋 {self.summary_file}")
+
+def pop_option(args, name, default=None, cast=str):
+    """Quitar `--name valor` de args y devolver el valor convertido"""
+    if name in args:
+        index = args.index(name)
+        if index + 1 >= len(args):
+            print(f"❌ Falta el valor para {name}")
+            sys.exit(1)
+        value = args[index + 1]
+        del args[index:index + 2]
+        return cast(value)
+    return default
+
+def pop_flag(args, name):
+    """Quitar `--name` de args y devolver si estaba"""
+    if name in args:
+        args.remove(name)
+        return True
+    return False
 
 def main():
-    crawler = DJIDocsCrawlerV3()
+    args = sys.argv[1:]
+    concurrency = pop_option(args, '--concurrency', 1, int)
+    base_url = pop_option(args, '--base-url', DEFAULT_BASE_URL)
+    workers = pop_option(args, '--workers', None, int)
+    parse_workers = pop_option(args, '--parse-workers', 0, int)
+    rules_file = pop_option(args, '--priority-rules')
+    page_budget = pop_option(args, '--budget', None, int)
+    time_budget = pop_option(args, '--time-budget', None, float)
+    no_sitemap = pop_flag(args, '--no-sitemap')
+    shared_frontier = pop_option(args, '--shared-frontier')
+    worker_id = pop_option(args, '--worker-id')
+    checkpoint = pop_option(args, '--checkpoint', 'sqlite')
+    output = pop_option(args, '--output', 'text')
+    if output not in OUTPUT_MODES:
+        print("❌ --output acepta text (reportes planos), corpus (segmentos gzip + índice) o both")
+        sys.exit(1)
+    if checkpoint not in ('sqlite', 'journal'):
+        print("❌ --checkpoint acepta sqlite (base indexada) o journal (snapshot pickle + journal)")
+        sys.exit(1)
+    if shared_frontier and not worker_id:
+        print("❌ --shared-frontier necesita --worker-id (nombra los archivos de salida de cada worker)")
+        sys.exit(1)
+    start_url = urljoin(base_url, 'index.html')
+    
+    # Con presupuesto conviene gastar las páginas en lo más valioso: best-first
+    priority = pop_flag(args, '--priority') or rules_file or page_budget or time_budget
+    options = {
+        'concurrency': concurrency,
+        'parse_workers': parse_workers,
+        'priority_rules': load_priority_rules(rules_file) if priority else None,
+        'page_budget': page_budget,
+        'time_budget': time_budget,
+        'shared_frontier': shared_frontier,
+        'worker_id': worker_id,
+        'checkpoint': checkpoint,
+        'output': output
+    }
+    
+    crawler = DJIDocsCrawlerV3(base_url, **options)
+    if concurrency > 1:
+        print(f"⚡ Modo concurrente: hasta {concurrency} requests en vuelo")
+    if parse_workers:
+        print(f"🧠 Parseo en {parse_workers} procesos, en paralelo con las descargas")
+    if shared_frontier:
+        print(f"🤝 Worker {worker_id} sobre la frontera compartida {shared_frontier}")
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if len(args) > 0:
+        command = args[0].lower()
         
         if command == 'continue':
             print("🔄 Continuando crawl desde checkpoint...")
@@ -537,25 +1356,69 @@ def main():
                 crawler.progress_file, crawler.data_file, crawler.checkpoint_file,
                 crawler.full_content_file, crawler.media_manager_file,
                 crawler.playback_manager_file, crawler.camera_methods_file,
-                crawler.all_methods_file, 'dji_crawl_RESUMEN_FINAL.txt'
+                crawler.all_methods_file, crawler.summary_file
             ]
             for file in files_to_clean:
                 if os.path.exists(file):
                     os.remove(file)
-            crawler = DJIDocsCrawlerV3()
-            crawler.start_crawl("https://developer.dji.com/api-reference/android-api/index.html")
+            crawler.journal.remove_files()
+            if crawler.corpus is not None:
+                crawler.corpus.remove_files()
+            if crawler.store is not None:
+                crawler.store.remove_files()
+            crawler = DJIDocsCrawlerV3(base_url, **options)
+            crawler.start_crawl(start_url)
         elif command == 'batch':
-            batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+            batch_size = int(args[1]) if len(args) > 1 else 10
             print(f"🔄 Procesando lote de {batch_size} URLs...")
-            crawler.process_batch(batch_size)
+            try:
+                crawler.process_batch(batch_size)
+            finally:
+                # Los JSON de progreso y datos se escriben al consolidar
+                crawler.save_progress(compact=True)
+                crawler.close_parse_pool()
+                crawler.checkpoint.close()
         elif command == 'summary':
             crawler.generate_final_summary()
+        elif command == 'seed':
+            # Archivos opcionales después del comando; por defecto los de DJIIndexExtractor
+            url_files = args[1:] or None
+            crawler.seed(start_url, url_files, use_sitemap=not no_sitemap)
+            crawler.start_crawl()
+        elif command == 'requeue':
+            if crawler.shared_frontier is not None:
+                urls = crawler.shared_frontier.release_quarantine()
+            else:
+                urls = crawler.retry_queue.release_quarantine()
+            crawler.frontier.push_front(urls)
+            print(f"🔁 {len(urls)} URLs sacadas de cuarentena y devueltas a pendientes")
+            crawler.save_progress(compact=True)
+        elif command == 'refresh':
+            print("📅 Revisando páginas según el calendario adaptativo...")
+            crawler.refresh()
+        elif command == 'reparse':
+            print("🧩 Reconstruyendo datos desde el archivo HTML (sin red)...")
+            crawler.reparse_from_archive(workers)
         else:
             print("❌ Comando no reconocido")
-            print("Uso: python dji_docs_crawler_v3.py [continue|restart|batch|summary]")
+            print("Uso: python dji_docs_crawler_v3.py [continue|restart|batch|summary|reparse|refresh|requeue|seed [archivos...]] [--concurrency N] [--parse-workers N] [--workers N] [--base-url URL]")
+            print("       [--priority] [--priority-rules reglas.json] [--budget N] [--time-budget SEGUNDOS] [--no-sitemap]")
+            print("       [--shared-frontier crawl.db --worker-id ID] [--checkpoint sqlite|journal]")
+            print("       [--output text|corpus|both]")
+            print("   refresh agrega al final de los reportes las páginas que cambiaron (append-only);")
+            print("   reparse reconstruye los reportes desde el archivo HTML, sin duplicados")
     else:
         print("🚀 Iniciando crawl normal...")
-        crawler.start_crawl("https://developer.dji.com/api-reference/android-api/index.html")
+        crawler.start_crawl(start_url)
+
+def interrupt_on_sigterm(signum, frame):
+    """SIGTERM (kill, docker stop) como Ctrl+C: corren los finally y se consolida el checkpoint"""
+    raise KeyboardInterrupt
 
 if __name__ == "__main__":
-    main()
+    signal.signal(signal.SIGTERM, interrupt_on_sigterm)
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("⏹️ Interrumpido: python dji_docs_crawler_v3.py continue retoma desde el checkpoint")
+        sys.exit(130)
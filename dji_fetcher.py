@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Fetcher HTTP compartido por todos los crawlers DJI
+Una sola sesión con pool de conexiones ajustado, keep-alive, compresión
+negociada, deadline total por request y contadores de bytes. Integra el
+scheduler de cortesía, el cache HTTP en disco y el archivo de HTML crudo.
+
+Modos (DJI_FETCH_MODE): live (por defecto), record (graba cada request en el
+cassette DJI_CASSETTE) y replay (sirve el cassette sin red ni esperas).
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE
+from urllib3.util.request import ACCEPT_ENCODING
+
+from dji_politeness import PolitenessScheduler
+from dji_http_cache import HTTPCache, CachingHTTPAdapter
+from dji_html_archive import HTMLArchive, crawler_archive_dir
+from dji_cassette import Cassette, DEFAULT_CASSETTE
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    # Solo lo que urllib3 sabe descomprimir en este entorno (br/zstd si están instalados)
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+# (conexión, lectura) por operación de socket; el deadline acota el total
+DEFAULT_TIMEOUT = (10, 20)
+DEFAULT_DEADLINE = 45.0
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchDeadlineExceeded(requests.exceptions.Timeout):
+    """El request completo (headers + body) superó el deadline total"""
+
+
+class DJIFetcher:
+    """Punto único de acceso HTTP para los crawlers"""
+
+    def __init__(self, concurrency=1, timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE,
+                 headers=None, scheduler=None, cache=True, archive=True, max_throttle_retries=3,
+                 mode=None, cassette=None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_throttle_retries = max_throttle_retries
+        self.scheduler = scheduler or PolitenessScheduler(target_concurrency=concurrency)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+
+        # Un pool por host con lugar para todos los workers; sin reintentos
+        # implícitos de urllib3 (los reintentos son de la cola de cada crawler)
+        pool_size = max(DEFAULT_POOLSIZE, concurrency)
+        self.http_cache = HTTPCache() if cache is True else (cache or None)
+        if self.http_cache is not None:
+            adapter = CachingHTTPAdapter(self.http_cache, pool_connections=pool_size,
+                                         pool_maxsize=pool_size, max_retries=0)
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                    pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # archive: True (directorio común), el nombre del crawler (directorio propio),
+        # un HTMLArchive ya armado o False
+        if archive is True:
+            self.archive = HTMLArchive()
+        elif isinstance(archive, str):
+            self.archive = HTMLArchive(crawler_archive_dir(archive))
+        else:
+            self.archive = archive or None
+
+        # Grabación / reproducción para corridas deterministas
+        self.mode = mode or os.environ.get('DJI_FETCH_MODE', 'live')
+        self.cassette = None
+        if self.mode == 'record':
+            self.cassette = Cassette(cassette or DEFAULT_CASSETTE)
+            print(f"📼 Grabando requests en {self.cassette.path}")
+        elif self.mode == 'replay':
+            self.cassette = Cassette(cassette or DEFAULT_CASSETTE).load()
+        elif self.mode != 'live':
+            raise ValueError(f"Modo de fetch desconocido: {self.mode}")
+
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'throttled': 0,
+            'from_cache': 0,
+            'bytes_wire': 0,       # bytes de body recibidos por la red (comprimidos)
+            'bytes_content': 0,    # bytes de body ya descomprimidos
+            'seconds': 0.0
+        }
+
+    def count(self, **amounts):
+        with self.lock:
+            for key, amount in amounts.items():
+                self.stats[key] += amount
+
+    def get(self, url, timeout=None, deadline=None, archive=True):
+        """GET con cortesía, deadline total y raise_for_status
+
+        Devuelve el Response con el body ya leído en response.content.
+        Con archive=True el body queda guardado en el archivo HTML.
+        """
+        if self.mode == 'replay':
+            return self._replay(url, archive)
+
+        deadline = self.deadline if deadline is None else deadline
+        attempt = 0
+        while True:
+            self.scheduler.acquire(url)
+            started = time.monotonic()
+            try:
+                response = self._get_within_deadline(url, timeout or self.timeout, started + deadline)
+            except Exception as e:
+                # Timeout / error de red: cuenta como latencia alta
+                self.scheduler.record(url, time.monotonic() - started, 599)
+                self.count(requests=1, errors=1, seconds=time.monotonic() - started)
+                if self.cassette is not None:
+                    self.cassette.record_error(url, e)
+                raise
+
+            elapsed = time.monotonic() - started
+            self.scheduler.record(url, elapsed, response.status_code, response.headers)
+            self.count(requests=1, seconds=elapsed)
+
+            if not self.scheduler.is_throttled(response.status_code) or attempt >= self.max_throttle_retries:
+                break
+
+            attempt += 1
+            self.count(throttled=1)
+            print(f"🐢 {response.status_code} en {url}, reintento {attempt}/{self.max_throttle_retries}")
+
+        if self.cassette is not None:
+            self.cassette.record_response(url, response)
+        return self._finish(url, response, archive)
+
+    def _finish(self, url, response, archive):
+        if response.status_code >= 400:
+            self.count(errors=1)
+        response.raise_for_status()
+
+        if archive and self.archive is not None:
+            self.archive.store(url, response.content, response.status_code)
+        return response
+
+    def _replay(self, url, archive):
+        """Servir `url` desde el cassette: sin red, sin cortesía, sin cache"""
+        started = time.monotonic()
+        try:
+            response = self.cassette.replay(url)
+        except Exception:
+            self.count(requests=1, errors=1, seconds=time.monotonic() - started)
+            raise
+        self.count(requests=1, bytes_content=len(response.content), seconds=time.monotonic() - started)
+        return self._finish(url, response, archive)
+
+    def _get_within_deadline(self, url, timeout, deadline_at):
+        """Descargar headers y body por partes, cortando al vencer el deadline"""
+        response = self.session.get(url, timeout=timeout, stream=True)
+
+        if getattr(response, 'from_cache', False):
+            # 304 revalidado: el body viene del disco, no de la red
+            self.count(from_cache=1)
+            return response
+
+        chunks = []
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                if time.monotonic() > deadline_at:
+                    raise FetchDeadlineExceeded(f"Deadline total superado descargando {url}")
+        finally:
+            response.close()
+
+        body = b''.join(chunks)
+        response._content = body
+        response._content_consumed = True
+
+        wire = response.raw.tell() if response.raw is not None else len(body)
+        self.count(bytes_wire=wire, bytes_content=len(body))
+
+        store = getattr(response, 'cache_store', None)
+        if store is not None:
+            store(body)
+        return response
+
+    def print_stats(self):
+        s = self.stats
+        ratio = (s['bytes_content'] / s['bytes_wire']) if s['bytes_wire'] else 0
+        print(f"📡 Fetcher: {s['requests']} requests en {s['seconds']:.1f}s, {s['errors']} errores, "
+              f"{s['throttled']} frenados por el servidor")
+        print(f"   {s['bytes_wire'] / 1024:.1f} KB por la red, {s['bytes_content'] / 1024:.1f} KB de contenido "
+              f"(x{ratio:.1f} por compresión), {s['from_cache']} servidos desde cache")
+        if self.http_cache is not None and self.mode != 'replay':
+            self.http_cache.print_stats()
+        if self.cassette is not None:
+            print(f"📼 Cassette ({self.mode}): {self.cassette.recorded} grabadas, {self.cassette.replayed} reproducidas")
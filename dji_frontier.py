@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Frontera de crawl: cola FIFO de URLs pendientes con deduplicación O(1)
+Reemplaza la lista pending_urls de los crawlers; encolar, sacar un lote y
+preguntar si una URL ya está pendiente no recorre la cola. Se serializa como
+lista, así el checkpoint conserva el formato de siempre.
+
+PriorityFrontier tiene la misma interfaz pero saca primero las URLs con
+mayor puntaje (best-first); a igual puntaje respeta el orden de llegada.
+"""
+
+import heapq
+import itertools
+from collections import deque
+
+
+class CrawlFrontier:
+    """Deque de URLs pendientes + set de pertenencia"""
+
+    def __init__(self, urls=()):
+        self.queue = deque()
+        self.members = set()
+        self.extend(urls)
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __contains__(self, url):
+        return url in self.members
+
+    def __iter__(self):
+        return iter(self.queue)
+
+    def push(self, url):
+        """Encolar al final; devuelve False si ya estaba pendiente"""
+        if url in self.members:
+            return False
+        self.members.add(url)
+        self.queue.append(url)
+        return True
+
+    def extend(self, urls):
+        """Encolar varias URLs; devuelve cuántas eran nuevas"""
+        return sum(1 for url in urls if self.push(url))
+
+    def push_front(self, urls):
+        """Poner URLs al principio de la cola, conservando su orden"""
+        added = 0
+        for url in reversed(list(urls)):
+            if url not in self.members:
+                self.members.add(url)
+                self.queue.appendleft(url)
+                added += 1
+        return added
+
+    def pop_batch(self, size):
+        """Sacar hasta `size` URLs del frente de la cola"""
+        batch = []
+        while self.queue and len(batch) < size:
+            url = self.queue.popleft()
+            self.members.discard(url)
+            batch.append(url)
+        return batch
+
+    def to_list(self):
+        return list(self.queue)
+
+
+class PriorityFrontier:
+    """Heap de URLs pendientes ordenado por `score(url)` + set de pertenencia"""
+
+    def __init__(self, score, urls=()):
+        self.score = score
+        self.heap = []
+        self.members = set()
+        self.counter = itertools.count()
+        self.extend(urls)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, url):
+        return url in self.members
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def push(self, url, score=None):
+        """Encolar según su puntaje; devuelve False si ya estaba pendiente"""
+        if url in self.members:
+            return False
+        self.members.add(url)
+        score = self.score(url) if score is None else score
+        heapq.heappush(self.heap, (-score, next(self.counter), url))
+        return True
+
+    def extend(self, urls):
+        return sum(1 for url in urls if self.push(url))
+
+    def push_front(self, urls):
+        """Pasar URLs delante de todo lo pendiente, conservando su orden"""
+        return sum(1 for url in urls if self.push(url, score=float('inf')))
+
+    def pop_batch(self, size):
+        """Sacar hasta `size` URLs, las de mayor puntaje primero"""
+        batch = []
+        while self.heap and len(batch) < size:
+            _, _, url = heapq.heappop(self.heap)
+            self.members.discard(url)
+            batch.append(url)
+        return batch
+
+    def to_list(self):
+        """URLs pendientes en el orden en que saldrían"""
+        return [url for _, _, url in sorted(self.heap)]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Archivo de HTML crudo direccionado por contenido
+Cada body descargado se guarda comprimido una sola vez (clave = sha256) y un
+índice JSONL registra URL, hash y fecha de cada descarga. Permite re-parsear
+páginas viejas con extractores nuevos sin volver a crawlear.
+
+Cada crawler archiva en su propio subdirectorio (crawler_archive_dir): el
+reparse y el refresh de uno no levantan las páginas que bajaron los otros.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_ARCHIVE_DIR = os.environ.get('DJI_HTML_ARCHIVE_DIR', 'dji_html_archive')
+
+
+def crawler_archive_dir(name):
+    """Directorio de archivo propio del crawler `name` (p.ej. dji_html_archive/v3)"""
+    return os.path.join(DEFAULT_ARCHIVE_DIR, name)
+
+
+class HTMLArchive:
+    """Almacén de bodies comprimidos + índice por URL y fecha de descarga"""
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.index_file = os.path.join(directory, 'index.jsonl')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest + '.html.gz')
+
+    def store(self, url, body, status=200):
+        """Guardar un body descargado y registrar la descarga en el índice"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as raw:
+                # mtime=0: el mismo body produce siempre el mismo archivo
+                with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                    f.write(body)
+            os.replace(tmp_path, path)
+
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'fetched_at': datetime.now().isoformat(),
+            'size': len(body),
+            'status': status
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+        return digest
+
+    def load(self, digest):
+        """Leer un body archivado por su hash"""
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read()
+
+    def iter_index(self):
+        """Recorrer las entradas del índice en orden de descarga"""
+        if not os.path.exists(self.index_file):
+            return
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Línea cortada por un corte abrupto: se ignora
+                    continue
+
+    def latest_entries(self):
+        """Última descarga de cada URL, en el orden en que se vio por primera vez"""
+        latest = {}
+        for entry in self.iter_index():
+            latest[entry['url']] = entry
+        return list(latest.values())
+
+    def summary(self):
+        """URLs archivadas, bodies distintos y bytes sin comprimir de la última descarga de cada una"""
+        entries = self.latest_entries()
+        digests = {entry['sha256'] for entry in entries}
+        return {
+            'urls': len(entries),
+            'unique_bodies': len(digests),
+            'raw_bytes': sum(entry['size'] for entry in entries)
+        }
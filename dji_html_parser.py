@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Backend de parseo HTML para los crawlers DJI
+make_soup() usa el tree builder más rápido instalado (lxml) y cae a
+html.parser si no está o si falla con una página. DJI_HTML_PARSER fuerza
+un backend ('lxml', 'html.parser') o deja la elección automática ('auto').
+
+Chequeo de paridad sobre el archivo HTML (títulos, links y métodos):
+    python dji_html_parser.py [directorio_del_archivo]
+"""
+
+import importlib.util
+import functools
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+DEFAULT_BACKEND = os.environ.get('DJI_HTML_PARSER', 'auto')
+FALLBACK_BACKEND = 'html.parser'
+
+# Tree builders de BeautifulSoup, del más rápido al más lento, y el módulo que requieren
+FAST_BACKENDS = [('lxml', 'lxml')]
+
+
+@functools.lru_cache(maxsize=None)
+def available_backends():
+    """Backends instalados en este entorno, del más rápido al más lento"""
+    backends = [name for name, module in FAST_BACKENDS if importlib.util.find_spec(module)]
+    return tuple(backends) + (FALLBACK_BACKEND,)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_backends(backend=None):
+    """Orden de intento para `backend` (siempre termina en html.parser)"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'auto':
+        return available_backends()
+    if backend == FALLBACK_BACKEND:
+        return (FALLBACK_BACKEND,)
+    if backend not in available_backends():
+        print(f"⚠️ Parser {backend} no instalado, se usa {FALLBACK_BACKEND}")
+        return (FALLBACK_BACKEND,)
+    return (backend, FALLBACK_BACKEND)
+
+
+def make_soup(content, backend=None):
+    """Parsear `content` con el backend rápido y caer a html.parser si falla"""
+    for name in resolve_backends(backend):
+        if name == FALLBACK_BACKEND:
+            break
+        try:
+            soup = BeautifulSoup(content, name)
+        except Exception:
+            continue
+        # Un documento no vacío que queda sin elementos es un parseo fallido
+        if content and soup.find(True) is None:
+            continue
+        return soup
+    return BeautifulSoup(content, FALLBACK_BACKEND)
+
+
+def parity_check(archive_dir=None, rounds=3):
+    """Comparar título, links y métodos de cada backend contra html.parser"""
+    from dji_html_archive import HTMLArchive, crawler_archive_dir
+    from dji_docs_crawler_v3 import ARCHIVE_NAME, parse_page
+
+    # Por defecto las páginas que archivó el crawler v3, el dueño de parse_page
+    archive = HTMLArchive(archive_dir or crawler_archive_dir(ARCHIVE_NAME))
+    entries = archive.latest_entries()
+    if not entries:
+        print(f"❌ No hay páginas archivadas en {archive.directory}")
+        return False
+
+    backends = available_backends()
+    print(f"🔬 Paridad de parsers sobre {len(entries)} páginas: {', '.join(backends)}")
+
+    pages = [(entry['url'], archive.load(entry['sha256'])) for entry in entries]
+    results = {}
+    for backend in backends:
+        # Mejor de varias rondas: la primera paga imports y caches en frío
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            results[backend] = [parse_page(url, html, backend=backend) for url, html in pages]
+            timings.append(time.perf_counter() - started)
+        elapsed = min(timings)
+        print(f"   {backend:<12} {elapsed:.2f}s  {len(pages) / elapsed:.1f} páginas/s")
+
+    ok = True
+    reference = results[FALLBACK_BACKEND]
+    for backend in backends:
+        if backend == FALLBACK_BACKEND:
+            continue
+        mismatches = 0
+        for expected, got in zip(reference, results[backend]):
+            for field in ('title', 'links', 'methods'):
+                if expected[field] != got[field]:
+                    mismatches += 1
+                    print(f"   ❌ {backend} difiere en {field}: {expected['url']}")
+        ok = ok and mismatches == 0
+        print(f"{'✅' if mismatches == 0 else '❌'} {backend}: {mismatches} diferencias contra {FALLBACK_BACKEND}")
+
+    if len(backends) == 1:
+        print("ℹ️ Solo está instalado html.parser (pip install lxml para el backend rápido)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if parity_check(sys.argv[1] if len(sys.argv) > 1 else None) else 1)
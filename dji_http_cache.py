@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP en disco con revalidación (ETag / Last-Modified)
+Se monta como adapter de requests, así cualquier session.get de los crawlers
+envía requests condicionales y un 304 se sirve desde el disco local.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = os.environ.get('DJI_HTTP_CACHE_DIR', '.dji_http_cache')
+
+# Headers que no tienen sentido guardar: el body se guarda ya decodificado
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+class HTTPCache:
+    """Almacén de respuestas con sus validadores, una entrada por URL"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'revalidated': 0,      # 304 servidos desde disco
+            'stored': 0,
+            'bytes_from_cache': 0
+        }
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.json', base + '.body'
+
+    def lookup(self, url):
+        """Devolver la metadata guardada para `url` o None"""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_body(self, url):
+        _, body_path = self._paths(url)
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    def store(self, url, response, body):
+        """Guardar body y validadores de una respuesta 200"""
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS}
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': headers,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'stored_at': datetime.now().isoformat(),
+            'size': len(body)
+        }
+
+        # Escribir primero el body y después la metadata: una entrada sin
+        # metadata es invisible para lookup()
+        # Sufijo por proceso/hilo: varios workers pueden compartir el directorio
+        tmp_body = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_body, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_body, body_path)
+
+        tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+
+        with self.lock:
+            self.stats['stored'] += 1
+
+    def refresh(self, url, meta, not_modified):
+        """Actualizar validadores con los headers de un 304"""
+        for header in ('ETag', 'Last-Modified', 'Date', 'Cache-Control', 'Expires'):
+            if header in not_modified.headers:
+                meta['headers'][header] = not_modified.headers[header]
+        meta['etag'] = meta['headers'].get('ETag', meta.get('etag'))
+        meta['last_modified'] = meta['headers'].get('Last-Modified', meta.get('last_modified'))
+        meta['revalidated_at'] = datetime.now().isoformat()
+
+        meta_path, _ = self._paths(url)
+        tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def print_stats(self):
+        s = self.stats
+        print(f"🗄️ Cache HTTP: {s['requests']} requests, {s['revalidated']} revalidados (304), "
+              f"{s['stored']} guardados, {s['bytes_from_cache'] / 1024:.1f} KB servidos desde disco")
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que agrega If-None-Match / If-Modified-Since y resuelve 304"""
+
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        self.cache.count('requests')
+        meta = self.cache.lookup(request.url)
+        if meta:
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and meta:
+            body = self.cache.load_body(request.url)
+            self.cache.refresh(request.url, meta, response)
+            self.cache.count('revalidated')
+            self.cache.count('bytes_from_cache', len(body))
+            response.close()
+            return self.build_cached_response(request, meta, body)
+
+        if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            if kwargs.get('stream'):
+                # En modo stream el body lo lee el llamador: guarda al terminar
+                response.cache_store = lambda body: self.cache.store(request.url, response, body)
+            else:
+                self.cache.store(request.url, response, response.content)
+
+        return response
+
+    def build_cached_response(self, request, meta, body):
+        """Armar un Response 200 equivalente al original guardado"""
+        response = Response()
+        response.status_code = meta.get('status', 200)
+        response.reason = meta.get('reason', 'OK')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response._content = body
+        response.from_cache = True
+        return response
+
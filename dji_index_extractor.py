@@ -4,19 +4,17 @@ Etapa 1: Extractor de Links del Index Principal de DJI
 Extrae todos los links de la página principal para procesamiento posterior
 """
 
-import requests
 import json
-import time
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+
 class DJIIndexExtractor:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='index_extractor')
         
         self.index_url = "https://developer.dji.com/api-reference/android-api/index.html"
         self.base_url = "https://developer.dji.com/api-reference/android-api/"
@@ -82,10 +80,9 @@ class DJIIndexExtractor:
         print(f"🔍 Extrayendo links de: {self.index_url}")
         
         try:
-            response = self.session.get(self.index_url, timeout=15)
-            response.raise_for_status()
+            response = self.fetcher.get(self.index_url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
             
             # Buscar todos los links
             all_links = []
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Reportes de texto reanudables
+Cada archivo de reporte es un sink append-only que lleva la cuenta de
+cuántos bytes escribió. El checkpoint guarda esos offsets junto con cada
+página registrada; al reanudar, lo que quedó escrito después del último
+offset consistente (páginas que el checkpoint no llegó a registrar) se
+trunca y el crawl sigue agregando, sin volver a bajar nada.
+
+Los archivos quedan abiertos todo el crawl con un buffer grande y se bajan
+a disco con flush() en cada checkpoint, antes de que el checkpoint se
+confirme: lo confirmado nunca apunta más allá de lo escrito.
+"""
+
+import os
+
+# Buffer de cada archivo de reporte (se vacía en cada checkpoint o al llenarse)
+SINK_BUFFER_BYTES = 1024 * 1024
+
+
+class TextSink:
+    """Archivo de texto append-only con offset en bytes"""
+
+    def __init__(self, path, buffer_size=SINK_BUFFER_BYTES):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.offset = 0
+        self.handle = None
+
+    def open(self, mode='ab'):
+        self.close()
+        self.handle = open(self.path, mode, buffering=self.buffer_size)
+
+    def reset(self, header=''):
+        """Empezar el archivo de cero con su encabezado"""
+        self.open('wb')
+        self.offset = 0
+        self.write(header)
+
+    def write(self, *chunks):
+        """Agregar trozos ya codificados (bytes) o texto, sin concatenarlos antes"""
+        if self.handle is None:
+            self.open()
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            self.handle.write(chunk)
+            self.offset += len(chunk)
+
+    def flush(self):
+        if self.handle is not None:
+            self.handle.flush()
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def size(self):
+        """Tamaño en disco (sin lo que todavía está en el buffer)"""
+        return os.path.getsize(self.path) if os.path.exists(self.path) else -1
+
+    def truncate(self, offset):
+        """Descartar lo escrito después de `offset`"""
+        self.close()
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset)
+        self.offset = offset
+
+
+class OutputSinks:
+    """Los reportes de un crawler, indexados por ruta"""
+
+    def __init__(self, paths):
+        self.sinks = {path: TextSink(path) for path in paths}
+
+    def __getitem__(self, path):
+        return self.sinks[path]
+
+    def __contains__(self, path):
+        return path in self.sinks
+
+    def add(self, sink):
+        """Sumar un sink propio (p.ej. CorpusWriter): basta con path, offset, flush, close, size y truncate"""
+        self.sinks[sink.path] = sink
+
+    def reset(self, path, header=''):
+        self.sinks[path].reset(header)
+
+    def write(self, path, *chunks):
+        self.sinks[path].write(*chunks)
+
+    def flush(self):
+        for sink in self.sinks.values():
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks.values():
+            sink.close()
+
+    def offsets(self):
+        return {path: sink.offset for path, sink in self.sinks.items()}
+
+    def adopt(self):
+        """Tomar como offset el tamaño actual de cada archivo (checkpoint sin offsets)
+
+        Devuelve las rutas que no existen, para empezarlas con su encabezado.
+        """
+        missing = []
+        for path, sink in self.sinks.items():
+            sink.close()
+            size = sink.size()
+            if size < 0:
+                missing.append(path)
+            else:
+                sink.offset = size
+        return missing
+
+    def resume(self, offsets):
+        """Volver cada archivo a su offset del checkpoint; devuelve los que hay que empezar de cero
+
+        Cada archivo se resuelve por separado: si llega al menos hasta su
+        offset se recorta ahí; si quedó más corto (o falta) no es consistente
+        con el checkpoint y se empieza de nuevo. Una salida que el checkpoint
+        no conoce (p.ej. otro --output) sigue al final de lo que haya, o
+        empieza de cero si no existe. Los offsets de salidas que ya no están
+        activas no tocan nada.
+        """
+        restart = []
+        trimmed = 0
+        for path, sink in self.sinks.items():
+            sink.close()
+            size = sink.size()
+            if path not in offsets:
+                if size < 0:
+                    restart.append(path)
+                else:
+                    sink.offset = size
+            elif size < offsets[path]:
+                restart.append(path)
+            else:
+                trimmed += size - offsets[path]
+                sink.truncate(offsets[path])
+        if trimmed:
+            print(f"✂️ Reportes recortados {trimmed} bytes: páginas escritas después del último checkpoint")
+        return restart
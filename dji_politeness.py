@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Scheduler de cortesía compartido por todos los crawlers DJI
+Token bucket por host que se adapta a la latencia medida, respeta 429/503
+con Retry-After y solo espera cuando realmente hay un request por enviar.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Códigos que indican que el servidor pide bajar el ritmo
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class HostBucket:
+    """Estado de cortesía de un host"""
+
+    def __init__(self, delay, burst):
+        self.delay = delay              # segundos entre requests (1 / tasa)
+        self.capacity = burst           # requests que se pueden enviar seguidos
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0        # Retry-After / 429
+        self.latency = None             # promedio exponencial de latencia
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def refill(self, now):
+        """Recargar tokens según el tiempo transcurrido"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed / self.delay)
+            self.last_refill = now
+
+
+class PolitenessScheduler:
+    """Token bucket por host con delay adaptativo (estilo AutoThrottle)
+
+    - acquire(url) se llama justo antes de cada request y bloquea solo lo
+      necesario para respetar la tasa del host.
+    - record(...) se llama con cada respuesta: la latencia ajusta el delay
+      y un 429/503 duplica el delay y pausa el host según Retry-After.
+    """
+
+    def __init__(self, start_delay=1.0, min_delay=0.1, max_delay=60.0,
+                 target_concurrency=1, burst=1, smoothing=0.3):
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_concurrency = max(1, target_concurrency)
+        self.burst = max(1, burst)
+        self.smoothing = smoothing
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        bucket = self.hosts.get(host)
+        if bucket is None:
+            bucket = HostBucket(self.start_delay, self.burst)
+            self.hosts[host] = bucket
+        return bucket
+
+    def _clamp(self, delay):
+        return max(self.min_delay, min(self.max_delay, delay))
+
+    def reserve(self, url):
+        """Reservar un turno para `url` y devolver cuántos segundos esperar"""
+        with self.lock:
+            bucket = self._bucket(url)
+            now = time.monotonic()
+            bucket.refill(now)
+
+            wait = max(0.0, bucket.blocked_until - now)
+            if bucket.tokens < 1:
+                wait = max(wait, (1 - bucket.tokens) * bucket.delay)
+
+            # El token se consume ya (puede quedar negativo = turno reservado),
+            # así varios hilos sobre el mismo host no se adelantan entre sí
+            bucket.tokens -= 1
+            bucket.requests += 1
+            bucket.waited += wait
+            return wait
+
+    def acquire(self, url):
+        """Esperar el turno para hacer un request a `url`"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, url, latency, status_code=None, headers=None):
+        """Registrar la respuesta de un request y adaptar el ritmo del host"""
+        with self.lock:
+            bucket = self._bucket(url)
+
+            if status_code in THROTTLE_STATUS_CODES:
+                bucket.throttled += 1
+                bucket.delay = self._clamp(bucket.delay * 2)
+                retry_after = parse_retry_after(headers.get('Retry-After') if headers else None)
+                pause = retry_after if retry_after is not None else bucket.delay
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+                return
+
+            if bucket.latency is None:
+                bucket.latency = latency
+            else:
+                bucket.latency += self.smoothing * (latency - bucket.latency)
+
+            # Objetivo: en promedio `target_concurrency` requests en vuelo.
+            # Los errores no pueden acelerar el ritmo, solo frenarlo.
+            target = self._clamp(bucket.latency / self.target_concurrency)
+            new_delay = self._clamp((bucket.delay + target) / 2)
+            if status_code is not None and status_code >= 400 and new_delay < bucket.delay:
+                return
+            bucket.delay = new_delay
+
+    def is_throttled(self, status_code):
+        return status_code in THROTTLE_STATUS_CODES
+
+    def stats(self):
+        """Resumen por host para logs"""
+        with self.lock:
+            return {
+                host: {
+                    'delay': round(bucket.delay, 3),
+                    'latency': round(bucket.latency, 3) if bucket.latency is not None else None,
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled,
+                    'waited_seconds': round(bucket.waited, 2)
+                }
+                for host, bucket in self.hosts.items()
+            }
+
+
+def parse_retry_after(value):
+    """Interpretar Retry-After (segundos o fecha HTTP) como segundos de espera"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Calendario adaptativo de re-crawl
+Por cada URL ya procesada se guarda el hash del último contenido visto,
+cuándo cambió por última vez y cada cuánto conviene revisarla. Si una
+revisión encuentra el mismo contenido el intervalo se duplica; si cambió,
+se reduce a la mitad. Así un refresh revisa seguido las páginas que cambian
+y casi nunca las estables, en vez de recorrer todo el sitio.
+"""
+
+import time
+from datetime import datetime
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+class RecrawlSchedule:
+    """Estado persistente de revisiones por URL (serializable con to_dict)"""
+
+    def __init__(self, initial_interval=DAY, min_interval=HOUR, max_interval=30 * DAY,
+                 grow=2.0, shrink=0.5):
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grow = grow                  # factor si la página no cambió
+        self.shrink = shrink              # factor si cambió
+        self.entries = {}                 # url -> estado de revisión
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record(self, url, digest, now=None):
+        """Registrar el hash visto en una descarga; devuelve si el contenido cambió
+
+        La primera vez que se ve una URL solo se toma la línea de base.
+        """
+        now = now or time.time()
+        entry = self.entries.get(url)
+        if entry is None:
+            self.entries[url] = {
+                'sha256': digest,
+                'last_checked': now,
+                'last_changed': now,
+                'interval': self.initial_interval,
+                'checks': 1,
+                'changes': 0
+            }
+            return False
+
+        entry['checks'] += 1
+        entry['last_checked'] = now
+        # Sin hash previo (checkpoint sin archivo) no se sabe: se cuenta como cambio
+        changed = entry['sha256'] != digest
+        if changed:
+            entry['sha256'] = digest
+            entry['last_changed'] = now
+            entry['changes'] += 1
+            entry['interval'] = self.clamp(entry['interval'] * self.shrink)
+        else:
+            entry['interval'] = self.clamp(entry['interval'] * self.grow)
+        # Reasignar: `entries` puede ser una vista sobre la base (CrawlStore)
+        self.entries[url] = entry
+        return changed
+
+    def record_error(self, url, now=None):
+        """Revisión fallida: se vuelve a intentar en el próximo refresh que toque"""
+        entry = self.entries.get(url)
+        if entry is not None:
+            entry['last_checked'] = now or time.time()
+            self.entries[url] = entry
+
+    def forget_digest(self, url):
+        """Olvidar el hash visto (la versión nueva no se pudo registrar): la próxima revisión cuenta como cambio"""
+        entry = self.entries.get(url)
+        if entry is not None:
+            entry['sha256'] = None
+            self.entries[url] = entry
+
+    def adopt(self, urls, archived=(), docs=None):
+        """Sumar al calendario URLs procesadas antes de que existiera
+
+        Toma el hash y la fecha del archivo HTML (latest_entries) y, si la
+        página no está archivada, la fecha de `docs[url]['timestamp']`.
+        Devuelve cuántas se agregaron.
+        """
+        archived = {entry['url']: entry for entry in archived}
+        docs = docs or {}
+        added = 0
+        for url in urls:
+            if url in self.entries:
+                continue
+            entry = archived.get(url)
+            if entry is not None:
+                digest, seen_at = entry['sha256'], entry['fetched_at']
+            else:
+                digest, seen_at = None, docs.get(url, {}).get('timestamp')
+            seen = datetime.fromisoformat(seen_at).timestamp() if seen_at else 0.0
+            self.entries[url] = {
+                'sha256': digest,
+                'last_checked': seen,
+                'last_changed': seen,
+                'interval': self.initial_interval,
+                'checks': 1,
+                'changes': 0
+            }
+            added += 1
+        return added
+
+    def overdue(self, entry, now):
+        """Cuántos intervalos pasaron desde la última revisión (>= 1: toca)"""
+        return (now - entry['last_checked']) / entry['interval']
+
+    def due(self, now=None, limit=None):
+        """URLs que toca revisar, las más atrasadas (en intervalos) primero"""
+        now = now or time.time()
+        ready = sorted(
+            (-self.overdue(entry, now), url) for url, entry in self.entries.items()
+            if self.overdue(entry, now) >= 1
+        )
+        urls = [url for _, url in ready]
+        return urls[:limit] if limit is not None else urls
+
+    def seconds_until_next(self, now=None):
+        """Segundos hasta la próxima revisión, o None si no hay URLs"""
+        if not self.entries:
+            return None
+        now = now or time.time()
+        return max(0.0, min(entry['last_checked'] + entry['interval'] for entry in self.entries.values()) - now)
+
+    def stats(self):
+        """Páginas volátiles (intervalo mínimo), estables (máximo) y con algún cambio"""
+        intervals = [entry['interval'] for entry in self.entries.values()]
+        return {
+            'urls': len(self.entries),
+            'volatile': sum(1 for interval in intervals if interval <= self.min_interval),
+            'stable': sum(1 for interval in intervals if interval >= self.max_interval),
+            'changed': sum(1 for entry in self.entries.values() if entry['changes'])
+        }
+
+    def to_dict(self):
+        return {'entries': self.entries}
+
+    def load_dict(self, data):
+        self.entries = dict(data.get('entries', {}))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cola de reintentos con backoff exponencial y cuarentena por URL
+Una página que falla no se pierde: se reprograma con espera creciente y, si
+sigue fallando más allá de los intentos o del plazo total, queda en cuarentena
+para reportarla sin frenar el resto del crawl.
+"""
+
+import random
+import time
+
+
+class RetryQueue:
+    """Estado persistente de URLs fallidas (serializable con to_dict)"""
+
+    def __init__(self, base_delay=30.0, max_delay=3600.0, max_attempts=6,
+                 deadline=24 * 3600.0, jitter=0.2):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.deadline = deadline          # segundos desde el primer fallo
+        self.jitter = jitter
+        self.entries = {}                 # url -> estado de reintento
+        self.quarantined = {}             # url -> estado final
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def backoff(self, attempts):
+        """Espera antes del próximo intento (exponencial con jitter)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def record_failure(self, url, error, now=None, permanent=False):
+        """Registrar un fallo; devuelve 'retry' o 'quarantined'
+
+        Con permanent=True (p.ej. 404) la URL va directo a cuarentena.
+        """
+        now = now or time.time()
+        entry = self.entries.get(url) or {'attempts': 0, 'first_failure': now}
+        entry['attempts'] += 1
+        entry['last_failure'] = now
+        entry['last_error'] = str(error)[:300]
+
+        expired = now - entry['first_failure'] >= self.deadline
+        if permanent or entry['attempts'] >= self.max_attempts or expired:
+            self.entries.pop(url, None)
+            if permanent:
+                entry['reason'] = 'error permanente'
+            else:
+                entry['reason'] = 'plazo vencido' if expired else 'intentos agotados'
+            self.quarantined[url] = entry
+            return 'quarantined'
+
+        entry['next_attempt'] = now + self.backoff(entry['attempts'])
+        self.entries[url] = entry
+        return 'retry'
+
+    def record_success(self, url):
+        self.entries.pop(url, None)
+
+    def due(self, now=None, limit=None):
+        """URLs cuyo próximo intento ya venció, las más atrasadas primero"""
+        now = now or time.time()
+        ready = sorted(
+            (entry['next_attempt'], url) for url, entry in self.entries.items()
+            if entry['next_attempt'] <= now
+        )
+        urls = [url for _, url in ready]
+        return urls[:limit] if limit is not None else urls
+
+    def seconds_until_next(self, now=None):
+        """Segundos hasta el próximo reintento, o None si no hay"""
+        if not self.entries:
+            return None
+        now = now or time.time()
+        return max(0.0, min(entry['next_attempt'] for entry in self.entries.values()) - now)
+
+    def advance(self, seconds):
+        """Reloj virtual: correr todo el calendario `seconds` hacia atrás
+
+        Equivale a que hayan pasado `seconds` sin esperarlos (replay de un
+        cassette): los reintentos vencen y el plazo total se sigue contando.
+        """
+        for entry in self.entries.values():
+            entry['next_attempt'] -= seconds
+            entry['first_failure'] -= seconds
+            entry['last_failure'] -= seconds
+
+    def release_quarantine(self):
+        """Sacar todas las URLs de cuarentena y devolverlas"""
+        urls = list(self.quarantined)
+        self.quarantined = {}
+        return urls
+
+    def to_dict(self):
+        return {'entries': self.entries, 'quarantined': self.quarantined}
+
+    def load_dict(self, data):
+        self.entries = dict(data.get('entries', {}))
+        self.quarantined = dict(data.get('quarantined', {}))
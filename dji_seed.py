@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Semillas para cargar la frontera de un crawl de una sola vez
+Lee las listas de URLs que genera DJIIndexExtractor (dji_urls_for_crawling.txt
+y dji_urls_<categoria>.txt) y los sitemaps que publique el servidor
+(robots.txt -> Sitemap:, /sitemap.xml, índices de sitemaps y .xml.gz).
+"""
+
+import glob
+import gzip
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import urljoin
+
+import requests
+
+DEFAULT_URL_FILES = ['dji_urls_for_crawling.txt', 'dji_urls_*.txt']
+
+# Tope de sitemaps a recorrer (un índice puede apuntar a muchos)
+MAX_SITEMAPS = 200
+
+
+def load_url_files(patterns=None):
+    """URLs de los archivos de texto, en orden y con el archivo de origen"""
+    seen_files = set()
+    for pattern in patterns or DEFAULT_URL_FILES:
+        for path in sorted(glob.glob(pattern)):
+            if path in seen_files:
+                continue
+            seen_files.add(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    url = line.strip()
+                    if url and not url.startswith('#'):
+                        yield path, url
+
+
+def local_name(tag):
+    """Nombre del tag sin namespace ({http://...}loc -> loc)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap(content):
+    """Devolver (urls de páginas, urls de sub-sitemaps) de un sitemap XML"""
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    root = ET.fromstring(content)
+
+    pages, sitemaps = [], []
+    target = sitemaps if local_name(root.tag) == 'sitemapindex' else pages
+    for element in root.iter():
+        if local_name(element.tag) == 'loc' and element.text:
+            target.append(element.text.strip())
+    return pages, sitemaps
+
+
+def discover_sitemaps(fetcher, base_url):
+    """Sitemaps declarados en robots.txt, o /sitemap.xml por convención"""
+    try:
+        robots = fetcher.get(urljoin(base_url, '/robots.txt'), archive=False).text
+        declared = [line.split(':', 1)[1].strip() for line in robots.splitlines()
+                    if line.lower().startswith('sitemap:')]
+        if declared:
+            return declared
+    except requests.exceptions.RequestException:
+        pass
+    return [urljoin(base_url, '/sitemap.xml')]
+
+
+def load_sitemap_urls(fetcher, base_url):
+    """URLs de página de todos los sitemaps del servidor (recorre índices)"""
+    queue = deque(discover_sitemaps(fetcher, base_url))
+    seen = set()
+    while queue and len(seen) < MAX_SITEMAPS:
+        sitemap_url = queue.popleft()
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        try:
+            content = fetcher.get(sitemap_url, archive=False).content
+            pages, sitemaps = parse_sitemap(content)
+        except requests.exceptions.RequestException as e:
+            print(f"ℹ️ Sin sitemap en {sitemap_url}: {e}")
+            continue
+        except (ET.ParseError, OSError, EOFError) as e:
+            print(f"⚠️ Sitemap inválido {sitemap_url}: {e}")
+            continue
+        queue.extend(sitemaps)
+        for url in pages:
+            yield sitemap_url, url
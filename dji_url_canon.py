@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Canonicalización de URLs antes de deduplicar
+Variantes de la misma página (con #ancla, directorio vs index.html, //,
+./.., mayúsculas en el host, parámetros de tracking u orden de la query)
+se reducen a una sola URL, así no se pierden páginas ni se bajan dos veces.
+"""
+
+import functools
+import posixpath
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DIRECTORY_INDEX = 'index.html'
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Parámetros que no cambian el contenido de la página
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref', 'source'}
+TRACKING_PREFIXES = ('utm_',)
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_path(path):
+    """Resolver ./.. y // conservando la barra final; directorio -> index.html"""
+    if not path:
+        return '/' + DIRECTORY_INDEX
+    trailing = path.endswith('/') or path.endswith('/.') or path.endswith('/..')
+    path = posixpath.normpath(path)
+    if path.startswith('//'):
+        # normpath conserva dos barras iniciales (POSIX)
+        path = '/' + path.lstrip('/')
+    if path == '/' or trailing:
+        path = path.rstrip('/') + '/' + DIRECTORY_INDEX
+    return path
+
+
+@functools.lru_cache(maxsize=65536)
+def canonicalize_url(url):
+    """Forma canónica de `url` (sin fragmento, path normalizado, query ordenada)"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(k)]
+    query.sort()
+
+    return urlunsplit((scheme, host, normalize_path(parts.path), urlencode(query), ''))
+
+
+class URLCanonicalizer:
+    """Canonicaliza URLs y cuenta cuántas variantes colapsaron en una sola"""
+
+    def __init__(self):
+        self.variants = {}         # canónica -> variantes crudas vistas
+        self.rewritten = 0         # URLs crudas distintas de su forma canónica
+
+    def canonical(self, url):
+        canonical = canonicalize_url(url)
+        seen = self.variants.setdefault(canonical, set())
+        if url not in seen:
+            seen.add(url)
+            if url != canonical:
+                self.rewritten += 1
+        return canonical
+
+    def saved_fetches(self):
+        """Descargas evitadas: variantes extra que sin canonicalizar se bajarían aparte"""
+        return sum(len(seen) - 1 for seen in self.variants.values())
+
+    def print_stats(self):
+        print(f"🔗 Canonicalización: {len(self.variants)} URLs únicas, {self.rewritten} variantes reescritas, "
+              f"{self.saved_fetches()} descargas duplicadas evitadas")
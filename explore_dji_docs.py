@@ -4,13 +4,18 @@ Script para explorar completamente la documentación DJI SDK Android v4
 Extrae toda la estructura de clases, métodos y componentes de la API
 """
 
-import requests
 import json
-import time
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 import re
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+
+# Patrones compilados una sola vez (se aplican a cada nodo de texto)
+CAMERA_MODE_PATTERN = re.compile(r'CameraMode\.|MEDIA_DOWNLOAD|PLAYBACK|SHOOT_PHOTO')
+METHOD_SIGNATURE_PATTERN = re.compile(r'void\s+\w+\(|boolean\s+\w+\(|\w+\s+\w+\(')
+METHOD_CLASS_PATTERN = re.compile(r'method|function')
+
 class DJIDocsExplorer:
     def __init__(self, base_url):
         self.base_url = base_url
@@ -23,10 +28,10 @@ class DJIDocsExplorer:
             'media_management': {},
             'playback_management': {}
         }
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Linux; Android 10; DJI RC) AppleWebKit/537.36'
-        })
+        # Modos de cámara sin repetir, en orden de aparición (dict = set ordenado)
+        self.camera_modes = {}
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='explore')
     
     def is_valid_url(self, url):
         """Verificar si la URL es válida y pertenece al dominio DJI"""
@@ -38,31 +43,27 @@ class DJIDocsExplorer:
         """Obtener contenido de una página"""
         try:
             print(f"🔍 Explorando: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            response = self.fetcher.get(url)
             return response.text
         except Exception as e:
             print(f"❌ Error accediendo {url}: {e}")
             return None
     
-    def extract_links(self, html, base_url):
-        """Extraer todos los links relevantes de una página"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = set()
+    def extract_links(self, soup, base_url):
+        """Extraer todos los links relevantes de una página (sin repetir, en orden)"""
+        links = {}
         
         for link in soup.find_all('a', href=True):
             href = link['href']
             full_url = urljoin(base_url, href)
             
             if self.is_valid_url(full_url):
-                links.add(full_url)
+                links[full_url] = None
         
-        return links
+        return list(links)
     
-    def analyze_camera_content(self, html, url):
+    def analyze_camera_content(self, soup, url):
         """Analizar contenido específico de cámara"""
-        soup = BeautifulSoup(html, 'html.parser')
-        
         # Buscar información sobre MediaManager
         if 'mediamanager' in url.lower() or 'media' in url.lower():
             print("📱 Encontrado contenido MediaManager")
@@ -80,10 +81,9 @@ class DJIDocsExplorer:
             }
         
         # Buscar modos de cámara
-        camera_modes = soup.find_all(text=re.compile(r'CameraMode\.|MEDIA_DOWNLOAD|PLAYBACK|SHOOT_PHOTO'))
-        for mode in camera_modes:
-            if mode.strip() not in self.api_structure['camera_modes']:
-                self.api_structure['camera_modes'].append(mode.strip())
+        for mode in soup.find_all(string=CAMERA_MODE_PATTERN):
+            self.camera_modes.setdefault(mode.strip(), None)
+        self.api_structure['camera_modes'] = list(self.camera_modes)
     
     def extract_methods(self, soup):
         """Extraer métodos de la página"""
@@ -92,8 +92,8 @@ class DJIDocsExplorer:
         # Buscar métodos en diferentes formatos
         method_patterns = [
             soup.find_all('code'),
-            soup.find_all('span', class_=re.compile(r'method|function')),
-            soup.find_all(text=re.compile(r'void\s+\w+\(|boolean\s+\w+\(|\w+\s+\w+\(')),
+            soup.find_all('span', class_=METHOD_CLASS_PATTERN),
+            soup.find_all(string=METHOD_SIGNATURE_PATTERN),
         ]
         
         for pattern_group in method_patterns:
@@ -118,30 +118,42 @@ class DJIDocsExplorer:
         return descriptions[:3]  # Primeras 3 descripciones
     
     def crawl_recursive(self, url, max_depth=3, current_depth=0):
-        """Crawling recursivo de la documentación"""
-        if (url in self.visited_urls or 
-            current_depth > max_depth or 
-            not self.is_valid_url(url)):
-            return
-        
-        self.visited_urls.add(url)
-        print(f"📖 Profundidad {current_depth}: {url}")
-        
-        html = self.fetch_page(url)
-        if not html:
-            return
-        
-        # Analizar contenido específico de cámara
-        self.analyze_camera_content(html, url)
-        
-        # Extraer y seguir links
-        if current_depth < max_depth:
-            links = self.extract_links(html, url)
-            print(f"🔗 Encontrados {len(links)} links en esta página")
+        """Crawling en profundidad de la documentación
+        
+        Iterativo con una pila explícita (sin límite de recursión de Python);
+        recorre en el mismo orden que la versión recursiva. Cada página se
+        parsea una sola vez y las ya visitadas no se apilan.
+        """
+        stack = [(url, current_depth)]
+        
+        while stack:
+            url, depth = stack.pop()
+            if (url in self.visited_urls or 
+                depth > max_depth or 
+                not self.is_valid_url(url)):
+                continue
+            
+            self.visited_urls.add(url)
+            print(f"📖 Profundidad {depth}: {url}")
+            
+            html = self.fetch_page(url)
+            if not html:
+                continue
+            
+            soup = make_soup(html)
+            
+            # Analizar contenido específico de cámara
+            self.analyze_camera_content(soup, url)
             
-            for link in links:
-                time.sleep(0.5)  # Pausa para no sobrecargar el servidor
-                self.crawl_recursive(link, max_depth, current_depth + 1)
+            # Extraer y seguir links
+            if depth < max_depth:
+                links = self.extract_links(soup, url)
+                print(f"🔗 Encontrados {len(links)} links en esta página")
+                
+                # Al revés: el primer link queda arriba de la pila y se visita primero
+                for link in reversed(links):
+                    if link not in self.visited_urls:
+                        stack.append((link, depth + 1))
     
     def save_results(self, filename='dji_api_structure.json'):
         """Guardar resultados en archivo JSON"""
@@ -163,8 +175,8 @@ class DJIDocsExplorer:
         for url in self.api_structure['playback_management'].keys():
             print(f"   - {url}")
         
-        print(f"\n📷 Modos de cámara encontrados: {len(set(self.api_structure['camera_modes']))}")
-        for mode in set(self.api_structure['camera_modes']):
+        print(f"\n📷 Modos de cámara encontrados: {len(self.camera_modes)}")
+        for mode in self.camera_modes:
             print(f"   - {mode}")
         
         print(f"\n🔍 Total de URLs visitadas: {len(self.visited_urls)}")
@@ -4,29 +4,27 @@ Crawler Específico para DJI FetchMediaTaskScheduler
 Extrae información detallada del FetchMediaTaskScheduler y explora todos los links hacia abajo
 """
 
-import requests
 import re
 import json
-import time
+from collections import deque
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+from dji_crawl_priority import RELATED_TERMS
+
 class FetchMediaTaskSchedulerCrawler:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-        })
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='fetchmedia')
         
         self.base_url = "https://developer.dji.com/api-reference/android-api/Components/Camera/DJIMediaManager_FetchMediaTaskScheduler.html"
         self.visited_urls = set()
+        self.url_depths = {}  # URL encolada -> profundidad mínima (la primera en BFS)
         self.all_content = []
         self.all_methods = []
+        self.queue_stats = {'enqueued': 0, 'duplicates_skipped': 0, 'dequeued': 0, 'max_queue_size': 0}
         
     def is_valid_related_url(self, url):
         """Verificar si la URL es válida y relacionada"""
@@ -41,13 +39,8 @@ class FetchMediaTaskSchedulerCrawler:
             return False
         
         # Filtrar URLs relacionadas con media, fetch, download
-        relevant_terms = [
-            'media', 'fetch', 'download', 'task', 'scheduler',
-            'file', 'camera', 'callback', 'listener'
-        ]
-        
         url_lower = url.lower()
-        if any(term in url_lower for term in relevant_terms):
+        if any(term in url_lower for term in RELATED_TERMS):
             return True
         
         return False
@@ -57,10 +50,9 @@ class FetchMediaTaskSchedulerCrawler:
         try:
             print(f"🔍 Analizando: {url}")
             
-            response = self.session.get(url, timeout=20)
-            response.raise_for_status()
+            response = self.fetcher.get(url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
             
             # Extraer título
             title = soup.title.string if soup.title else 'Sin título'
@@ -231,10 +223,13 @@ class FetchMediaTaskSchedulerCrawler:
         print(f"📊 Profundidad máxima: {max_depth}")
         print("=" * 80)
         
-        urls_to_process = [(start_url, 0)]  # (url, depth)
+        # BFS: cada URL entra una sola vez a la cola, con su menor profundidad
+        urls_to_process = deque()
+        self.enqueue(urls_to_process, start_url, 0)
         
         while urls_to_process:
-            current_url, depth = urls_to_process.pop(0)
+            current_url, depth = urls_to_process.popleft()
+            self.queue_stats['dequeued'] += 1
             
             if current_url in self.visited_urls or depth > max_depth:
                 continue
@@ -247,15 +242,32 @@ class FetchMediaTaskSchedulerCrawler:
             if content and depth < max_depth:
                 # Agregar links relacionados para el siguiente nivel
                 for link_info in related_links:
-                    if link_info['url'] not in self.visited_urls:
-                        urls_to_process.append((link_info['url'], depth + 1))
-            
-            # Pausa entre requests
-            time.sleep(1)
+                    self.enqueue(urls_to_process, link_info['url'], depth + 1)
         
         print(f"\n🎉 Crawling completado!")
         print(f"📄 Total páginas analizadas: {len(self.all_content)}")
         print(f"🔧 Total métodos únicos: {len(set(self.all_methods))}")
+        q = self.queue_stats
+        print(f"📥 Cola: {q['enqueued']} URLs encoladas, {q['duplicates_skipped']} duplicados descartados al encolar, "
+              f"{q['dequeued']} desencoladas, tamaño máximo {q['max_queue_size']}")
+        self.fetcher.print_stats()
+    
+    def enqueue(self, queue, url, depth):
+        """Encolar `url` si nunca se encoló; registra su profundidad
+        
+        La cola es FIFO y cada página encola sus links con depth + 1, así las
+        profundidades entran en orden no decreciente: la primera vez que se
+        ve una URL ya es su profundidad mínima.
+        """
+        if url in self.url_depths:
+            self.queue_stats['duplicates_skipped'] += 1
+            return False
+        
+        self.url_depths[url] = depth
+        queue.append((url, depth))
+        self.queue_stats['enqueued'] += 1
+        self.queue_stats['max_queue_size'] = max(self.queue_stats['max_queue_size'], len(queue))
+        return True
     
     def save_comprehensive_report(self):
         """Guardar reporte comprehensivo"""
@@ -342,7 +354,9 @@ class FetchMediaTaskSchedulerCrawler:
                 'summary': {
                     'total_pages': len(self.all_content),
                     'unique_methods': len(set(self.all_methods)),
-                    'visited_urls': list(self.visited_urls)
+                    'visited_urls': list(self.visited_urls),
+                    'url_depths': self.url_depths,
+                    'queue_stats': self.queue_stats
                 },
                 'unique_methods': sorted(set(self.all_methods)),
                 'all_content': self.all_content
@@ -4,23 +4,18 @@ Crawler Específico para DJI MediaManager
 Extrae información detallada de la página específica de MediaManager
 """
 
-import requests
 import re
 import json
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from dji_fetcher import DJIFetcher
+from dji_html_parser import make_soup
+
 class MediaManagerCrawler:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-        })
+        # Sesión HTTP compartida: pool, cortesía, cache y archivo de HTML
+        self.fetcher = DJIFetcher(archive='mediamanager')
         
         self.url = "https://developer.dji.com/api-reference/android-api/Components/Camera/DJIMediaManager.html"
         
@@ -29,10 +24,9 @@ class MediaManagerCrawler:
         try:
             print(f"🔍 Analizando MediaManager: {self.url}")
             
-            response = self.session.get(self.url, timeout=20)
-            response.raise_for_status()
+            response = self.fetcher.get(self.url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content)
             
             # Extraer título
             title = soup.title.string if soup.title else 'Sin título'
@@ -0,0 +1,115 @@
+"""
+Fixtures compartidas: servidor HTTP local con las páginas de tests/fixtures/site
+"""
+
+import collections
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+SITE_DIR = os.path.join(TESTS_DIR, 'fixtures', 'site')
+
+# Los crawlers son scripts en la raíz del repo
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+class FixtureHandler(http.server.SimpleHTTPRequestHandler):
+    """Sirve el sitio de fixtures; Broken.html responde 500 y registra cada request
+
+    `server.overrides` reemplaza el HTML de una página (nombre -> bytes),
+    para simular que cambió en el sitio. `server.statuses` encola respuestas
+    vacías antes de la normal (nombre -> [(código, headers), ...]).
+    """
+
+    def do_GET(self):
+        server = self.server
+        name = self.path.rsplit('/', 1)[-1]
+        with server.lock:
+            server.hits[name] += 1
+            server.hit_times[name].append(time.monotonic())
+        if name == server.gate_page:
+            # Página "colgada": el test decide qué pasa mientras el crawler espera
+            server.gate_reached.set()
+            server.gate_release.wait(30)
+        with server.lock:
+            queued = server.statuses.get(name)
+            status = queued.pop(0) if queued else None
+        if status is not None:
+            code, headers = status
+            self.send_response(code)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if name == 'Broken.html':
+            self.send_error(500)
+            return
+        body = server.overrides.get(name)
+        if body is not None:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), functools.partial(FixtureHandler, directory=SITE_DIR))
+        self.lock = threading.Lock()
+        self.base_url = f"http://127.0.0.1:{self.server_port}/api-reference/android-api/"
+        self.reset()
+
+    def handle_error(self, request, client_address):
+        # El crawler cortado con SIGKILL deja conexiones rotas: no es un error del test
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def reset(self):
+        self.hits = collections.Counter()
+        self.hit_times = collections.defaultdict(list)
+        self.overrides = {}
+        self.statuses = {}
+        self.gate_page = None
+        self.gate_reached = threading.Event()
+        self.gate_release = threading.Event()
+
+
+@pytest.fixture(autouse=True)
+def live_fetch(monkeypatch):
+    """Los tests eligen el modo de fetch; el del entorno no cuenta"""
+    monkeypatch.delenv('DJI_FETCH_MODE', raising=False)
+
+
+@pytest.fixture(scope='session')
+def fixture_server():
+    server = FixtureServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def site(fixture_server):
+    """Servidor con contadores limpios para cada test"""
+    fixture_server.reset()
+    yield fixture_server
+    fixture_server.gate_release.set()
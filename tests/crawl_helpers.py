@@ -0,0 +1,74 @@
+"""
+Utilidades para correr DJIDocsCrawlerV3 contra el sitio local de tests/fixtures/site
+"""
+
+import json
+import os
+import re
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from dji_docs_crawler_v3 import DJIDocsCrawlerV3
+from dji_politeness import PolitenessScheduler
+
+PAGES = [
+    'index.html', 'Components/MediaManager.html', 'Components/PlaybackManager.html',
+    'Components/Camera.html', 'Components/FlightController.html', 'Components/MediaFile.html',
+    'Components/FetchMediaTaskScheduler.html', 'Components/CameraSettings.html',
+    'Components/Battery.html', 'Components/Gimbal.html'
+]
+
+REPORTS = [
+    'dji_docs_full_content.txt', 'dji_media_manager_info.txt', 'dji_playback_manager_info.txt',
+    'dji_camera_methods.txt', 'dji_all_methods_summary.txt'
+]
+
+# Líneas que cambian entre corridas iguales
+VOLATILE_LINE = re.compile(r'^(Generado|FECHA): .*$', re.MULTILINE)
+
+
+def fast_scheduler(concurrency=1):
+    """Cortesía casi nula: el servidor es local"""
+    return PolitenessScheduler(start_delay=0.01, min_delay=0.01, target_concurrency=concurrency)
+
+
+def make_crawler(base_url, retry_delay=0.1, max_attempts=2, **options):
+    """Crawler sin esperas de cortesía y con reintentos cortos (retry_delay=None: los de siempre)"""
+    crawler = DJIDocsCrawlerV3(base_url, **options)
+    crawler.fetcher.scheduler = fast_scheduler(crawler.concurrency)
+    if retry_delay is not None:
+        crawler.retry_queue.base_delay = retry_delay
+        crawler.retry_queue.max_attempts = max_attempts
+        crawler.retry_queue.jitter = 0
+    return crawler
+
+
+def crawl(directory, monkeypatch, base_url, **options):
+    """Crawl completo desde index.html dentro de `directory`"""
+    os.makedirs(directory, exist_ok=True)
+    monkeypatch.chdir(directory)
+    crawler = make_crawler(base_url, **options)
+    crawler.start_crawl(base_url + 'index.html')
+    return crawler
+
+
+def read_outputs(directory):
+    """Orden de páginas, datos JSON (sin timestamps) y reportes de texto (sin fechas) de un crawl"""
+    with open(os.path.join(directory, 'dji_docs_data.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    docs = {url: {key: value for key, value in doc.items() if key != 'timestamp'}
+            for url, doc in data.items()}
+    reports = {}
+    for name in REPORTS:
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            reports[name] = VOLATILE_LINE.sub('', f.read())
+    return list(data), docs, reports
+
+
+def report_urls(directory, name):
+    with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+        return re.findall(r'^URL: (\S+)$', f.read(), re.MULTILINE)
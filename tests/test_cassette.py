@@ -0,0 +1,92 @@
+"""
+Grabación / reproducción del fetcher (DJI_FETCH_MODE=record|replay)
+"""
+
+import os
+import shutil
+import time
+
+import pytest
+import requests
+
+from crawl_helpers import crawl, fast_scheduler, read_outputs
+from dji_cassette import Cassette, CassetteMiss
+from dji_fetcher import DJIFetcher
+
+PAGE_V1 = b'<html><head><title>Gimbal v1</title></head><body>rotate(Rotation rotation)</body></html>'
+PAGE_V2 = b'<html><head><title>Gimbal v2</title></head><body>rotate(Rotation rotation, Callback cb)</body></html>'
+
+
+def make_fetcher(mode, cassette):
+    return DJIFetcher(mode=mode, cassette=str(cassette), cache=False, archive=False,
+                      scheduler=fast_scheduler())
+
+
+def test_rerecording_replaces_the_previous_recording(site, tmp_path):
+    cassette = tmp_path / 'cassette.jsonl.gz'
+    gimbal = site.base_url + 'Components/Gimbal.html'
+    battery = site.base_url + 'Components/Battery.html'
+
+    site.overrides['Gimbal.html'] = PAGE_V1
+    first = make_fetcher('record', cassette)
+    first.get(gimbal)
+    first.get(battery)
+
+    # El sitio cambió y se graba de nuevo solo Gimbal
+    site.overrides['Gimbal.html'] = PAGE_V2
+    make_fetcher('record', cassette).get(gimbal)
+
+    replay = make_fetcher('replay', cassette)
+    assert replay.get(gimbal).content == PAGE_V2
+    # Lo que la sesión nueva no pidió sigue saliendo de la anterior
+    assert b'Battery' in replay.get(battery).content
+    with pytest.raises(CassetteMiss):
+        replay.get(site.base_url + 'Components/Camera.html')
+
+
+def test_sequence_within_a_session_is_replayed_in_order(site, tmp_path):
+    cassette = tmp_path / 'cassette.jsonl.gz'
+    gimbal = site.base_url + 'Components/Gimbal.html'
+    recorder = make_fetcher('record', cassette)
+    site.overrides['Gimbal.html'] = PAGE_V1
+    recorder.get(gimbal)
+    site.overrides['Gimbal.html'] = PAGE_V2
+    recorder.get(gimbal)
+
+    loaded = Cassette(str(cassette)).load()
+    assert len(loaded.interactions[gimbal]) == 2
+    replay = make_fetcher('replay', cassette)
+    assert replay.get(gimbal).content == PAGE_V1
+    assert replay.get(gimbal).content == PAGE_V2
+    # Agotada la secuencia se repite la última
+    assert replay.get(gimbal).content == PAGE_V2
+
+
+def test_recorded_errors_are_raised_on_replay(site, tmp_path):
+    cassette = tmp_path / 'cassette.jsonl.gz'
+    broken = site.base_url + 'Components/Broken.html'
+    with pytest.raises(requests.exceptions.HTTPError):
+        make_fetcher('record', cassette).get(broken)
+    hits = site.hits['Broken.html']
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        make_fetcher('replay', cassette).get(broken)
+    assert site.hits['Broken.html'] == hits
+
+
+def test_replay_does_not_wait_for_retry_backoff(site, tmp_path, monkeypatch):
+    monkeypatch.setenv('DJI_FETCH_MODE', 'record')
+    crawl(tmp_path / 'record', monkeypatch, site.base_url, max_attempts=6)
+    requests_recorded = sum(site.hits.values())
+
+    os.makedirs(tmp_path / 'replay')
+    shutil.copy(tmp_path / 'record' / 'dji_cassette.jsonl.gz', tmp_path / 'replay')
+    monkeypatch.setenv('DJI_FETCH_MODE', 'replay')
+    started = time.monotonic()
+    # Backoff real (30s, 60s, ...): en replay se adelanta el reloj en vez de dormir
+    crawler = crawl(tmp_path / 'replay', monkeypatch, site.base_url, retry_delay=None)
+
+    assert time.monotonic() - started < 20
+    assert sum(site.hits.values()) == requests_recorded
+    assert crawler.retry_queue.quarantined[site.base_url + 'Components/Broken.html']['attempts'] == 6
+    assert read_outputs(tmp_path / 'replay') == read_outputs(tmp_path / 'record')
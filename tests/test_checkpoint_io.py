@@ -0,0 +1,102 @@
+"""
+Escritura atómica de checkpoints y JSON, y vuelta a la generación anterior (.prev)
+"""
+
+import json
+import os
+import pickle
+
+import pytest
+
+from crawl_helpers import crawl, make_crawler, read_outputs
+from dji_checkpoint_io import (atomic_write_json, atomic_write_json_stream, dump_checksummed, load_checksummed,
+                               load_with_fallback, previous_path)
+
+
+@pytest.mark.parametrize('data', [
+    {},
+    {'a': 1},
+    {'urls': [], 'docs': {}, 'texto': 'línea 1\nlínea 2', 'n': None},
+    {'doc': {'methods': ['getFileSize()', 'fetch(cb)'], 'meta': {'x': [1, {'y': []}]}}, 'ok': True},
+])
+def test_stream_matches_atomic_write_json(tmp_path, data):
+    atomic_write_json(tmp_path / 'full.json', data)
+    atomic_write_json_stream(tmp_path / 'stream.json', iter(data.items()))
+    assert (tmp_path / 'stream.json').read_bytes() == (tmp_path / 'full.json').read_bytes()
+
+
+def test_stream_writes_iterators_as_lists(tmp_path):
+    rows = ({'url': f"u{i}", 'methods': [f"m{i}()"]} for i in range(3))
+    atomic_write_json_stream(tmp_path / 'out.json', [('visited', iter(['a', 'b'])), ('rows', rows), ('none', iter([]))])
+    expected = {'visited': ['a', 'b'], 'rows': [{'url': f"u{i}", 'methods': [f"m{i}()"]} for i in range(3)],
+                'none': []}
+    assert json.loads((tmp_path / 'out.json').read_text()) == expected
+    atomic_write_json(tmp_path / 'full.json', expected)
+    assert (tmp_path / 'out.json').read_bytes() == (tmp_path / 'full.json').read_bytes()
+
+
+def corrupt(path, offset=None):
+    """Pisar bytes del archivo (por defecto del medio), como un fallo de disco"""
+    with open(path, 'r+b') as f:
+        f.seek(os.path.getsize(path) // 2 if offset is None else offset)
+        f.write(b'\x00' * 64)
+
+
+def test_damaged_checkpoint_falls_back_to_previous_generation(tmp_path):
+    path = str(tmp_path / 'state.pkl')
+    dump_checksummed(path, b'generacion 1')
+    dump_checksummed(path, b'generacion 2')
+    assert load_with_fallback(path, bytes) == (b'generacion 2', path)
+
+    corrupt(path)
+    assert load_with_fallback(path, bytes) == (b'generacion 1', previous_path(path))
+
+    # Sin archivo actual también vale la anterior; sin ninguna válida no hay estado
+    os.remove(path)
+    assert load_with_fallback(path, bytes) == (b'generacion 1', previous_path(path))
+    corrupt(previous_path(path))
+    assert load_with_fallback(path, bytes) == (None, None)
+
+
+def test_decode_errors_count_as_corruption(tmp_path):
+    path = str(tmp_path / 'state.pkl')
+    dump_checksummed(path, pickle.dumps({'ok': True}))
+    dump_checksummed(path, b'no es pickle')
+    assert load_with_fallback(path, pickle.loads) == ({'ok': True}, previous_path(path))
+
+
+def test_files_without_header_load_as_is(tmp_path):
+    path = tmp_path / 'legacy.pkl'
+    path.write_bytes(pickle.dumps([1, 2]))
+    assert pickle.loads(load_checksummed(str(path))) == [1, 2]
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_crawler_resumes_from_previous_generation(site, tmp_path, monkeypatch, capsys, checkpoint):
+    crawl(tmp_path / 'ref', monkeypatch, site.base_url, checkpoint=checkpoint)
+
+    os.makedirs(tmp_path / 'crash')
+    monkeypatch.chdir(tmp_path / 'crash')
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    crawler.frontier = crawler.make_frontier([site.base_url + 'index.html'])
+    crawler.process_batch(3)
+    crawler.save_progress(compact=True)
+    first = set(crawler.visited_urls)
+    crawler.process_batch(3)
+    crawler.save_progress(compact=True)
+    second = set(crawler.visited_urls)
+    crawler.checkpoint.close()
+
+    # El checkpoint más reciente se daña: se vuelve a la generación anterior
+    current = crawler.store_file if checkpoint == 'sqlite' else crawler.checkpoint_file
+    assert os.path.exists(previous_path(current))
+    # En la base SQLite el medio puede caer en páginas libres: se daña el encabezado
+    corrupt(current, 0 if checkpoint == 'sqlite' else None)
+    capsys.readouterr()
+    resumed = make_crawler(site.base_url, checkpoint=checkpoint)
+    assert 'Usando la generación anterior del checkpoint' in capsys.readouterr().out
+    assert resumed.resumed
+    assert first <= set(resumed.visited_urls) <= second
+
+    resumed.start_crawl()
+    assert read_outputs(tmp_path / 'crash') == read_outputs(tmp_path / 'ref')
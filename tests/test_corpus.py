@@ -0,0 +1,73 @@
+"""
+Corpus comprimido: segmentos gzip + índice, y truncate al offset de un checkpoint
+"""
+
+import gzip
+import json
+import os
+
+from dji_corpus import CorpusWriter, load_corpus_index, read_corpus_record
+
+
+def record(n):
+    return {'url': f'https://example.com/page{n}.html', 'title': f'Página {n}', 'methods': [],
+            'text': f'contenido {n} ' * 20}
+
+
+def read_segment(writer, seq):
+    with gzip.open(writer.segment_path(seq), 'rt', encoding='utf-8') as f:
+        return [json.loads(line)['url'] for line in f]
+
+
+def test_records_roll_over_segments_and_read_back(tmp_path):
+    writer = CorpusWriter(str(tmp_path / 'corpus'), segment_max_bytes=300)
+    locations = [writer.add(record(n)) for n in range(6)]
+    writer.close()
+
+    assert len(writer.segments()) > 1
+    index = load_corpus_index(writer.directory)
+    assert list(index.values()) == locations
+    for n, location in enumerate(locations):
+        assert read_corpus_record(writer.directory, location) == record(n)
+    # Cada segmento es un gzip válido con sus registros completos
+    urls = [url for seq in writer.segments() for url in read_segment(writer, seq)]
+    assert urls == [record(n)['url'] for n in range(6)]
+
+
+def test_truncate_back_to_a_checkpoint_offset(tmp_path):
+    writer = CorpusWriter(str(tmp_path / 'corpus'), segment_max_bytes=300)
+    kept = [writer.add(record(n)) for n in range(3)]
+    writer.flush()
+    checkpoint = writer.offset
+    for n in range(3, 8):
+        writer.add(record(n))
+    writer.flush()
+    assert writer.segments()[-1] > kept[-1][0]
+
+    writer.truncate(checkpoint)
+
+    # Índice, segmento en curso y segmentos siguientes vuelven al estado confirmado
+    assert os.path.getsize(writer.path) == checkpoint == writer.offset
+    assert list(load_corpus_index(writer.directory).values()) == kept
+    assert writer.segments()[-1] == kept[-1][0]
+    seq, offset, length = kept[-1]
+    assert os.path.getsize(writer.segment_path(seq)) == offset + length
+    assert read_segment(writer, seq)[-1] == record(2)['url']
+
+    # Se sigue agregando desde ahí
+    location = writer.add(record(9))
+    writer.close()
+    assert read_corpus_record(writer.directory, location) == record(9)
+    assert list(load_corpus_index(writer.directory)) == [record(n)['url'] for n in (0, 1, 2, 9)]
+
+
+def test_truncate_to_zero_empties_the_corpus(tmp_path):
+    writer = CorpusWriter(str(tmp_path / 'corpus'), segment_max_bytes=300)
+    for n in range(4):
+        writer.add(record(n))
+    writer.close()
+
+    writer.truncate(0)
+    assert load_corpus_index(writer.directory) == {}
+    assert writer.segments() == [1]
+    assert os.path.getsize(writer.segment_path(1)) == 0
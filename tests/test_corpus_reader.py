@@ -0,0 +1,64 @@
+"""
+Lectura por URL con mmap: corpus comprimido (también cortado) y reportes de texto
+"""
+
+import os
+
+from crawl_helpers import crawl
+from dji_corpus import CorpusWriter
+from dji_corpus_reader import CorpusReader, MappedCorpus
+
+PAGES = ['Camera', 'Gimbal', 'Battery']
+
+
+def record(name):
+    return {'url': f'https://example.com/{name}.html', 'title': name, 'methods': [], 'text': f'{name} ' * 50}
+
+
+def write_corpus(directory):
+    writer = CorpusWriter(str(directory))
+    locations = {name: writer.add(record(name)) for name in PAGES}
+    writer.close()
+    return writer, locations
+
+
+def test_cut_off_segment_hides_only_the_missing_records(tmp_path):
+    writer, locations = write_corpus(tmp_path / 'corpus')
+    # Corte antes del flush: el índice llegó al disco, el final del segmento no
+    seq, offset, length = locations['Battery']
+    with open(writer.segment_path(seq), 'r+b') as f:
+        f.truncate(offset + length - 5)
+
+    with MappedCorpus(writer.directory) as corpus:
+        assert 'https://example.com/Battery.html' in corpus
+        assert corpus.record('https://example.com/Battery.html') is None
+        assert corpus.text('https://example.com/Gimbal.html') == record('Gimbal')['text']
+        assert corpus.page('https://example.com/Missing.html') is None
+
+
+def test_empty_or_missing_segment_reads_as_absent(tmp_path):
+    writer, locations = write_corpus(tmp_path / 'corpus')
+    seq = locations['Camera'][0]
+    with open(writer.segment_path(seq), 'wb'):
+        pass
+    with MappedCorpus(writer.directory) as corpus:
+        assert all(corpus.record(record(name)['url']) is None for name in PAGES)
+
+    os.remove(writer.segment_path(seq))
+    with MappedCorpus(writer.directory) as corpus:
+        assert corpus.text('https://example.com/Camera.html') is None
+
+
+def test_reader_over_text_report_and_corpus(site, tmp_path, monkeypatch):
+    crawler = crawl(tmp_path, monkeypatch, site.base_url, output='both')
+    gimbal = site.base_url + 'Components/Gimbal.html'
+
+    with CorpusReader([str(tmp_path / 'dji_docs_full_content.txt'), crawler.corpus.directory]) as reader:
+        assert reader.resolve('Gimbal') == [gimbal]
+        # Está en los dos: gana el corpus, el último de la lista
+        assert reader.reader_for(gimbal) is reader.readers[-1]
+        assert 'public void rotate(Rotation rotation, CompletionCallback callback)' in reader.text(gimbal)
+    with CorpusReader([str(tmp_path / 'dji_docs_full_content.txt')]) as reader:
+        section = bytes(reader.page(gimbal)).decode('utf-8')
+        assert f'URL: {gimbal}' in section
+        assert section.count('URL: ') == 1
@@ -0,0 +1,119 @@
+"""
+Checkpoint por journal/store: los JSON de progreso y datos se consolidan al
+terminar cada comando, también con `batch` y al cortar el crawl
+"""
+
+import functools
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from crawl_helpers import PAGES, REPO_DIR, TESTS_DIR, crawl, make_crawler, read_outputs, report_urls
+import dji_docs_crawler_v3
+import dji_fetcher
+from dji_politeness import PolitenessScheduler
+
+# Crawl que se corta con SIGTERM con el handler de la línea de comandos instalado
+SIGTERM_SCRIPT = """
+import signal, sys
+sys.path.insert(0, sys.argv[1])
+from crawl_helpers import make_crawler
+from dji_docs_crawler_v3 import interrupt_on_sigterm
+signal.signal(signal.SIGTERM, interrupt_on_sigterm)
+crawler = make_crawler(sys.argv[2], checkpoint=sys.argv[3])
+crawler.start_crawl(sys.argv[2] + 'index.html')
+"""
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['dji_docs_crawler_v3.py', *args])
+    dji_docs_crawler_v3.main()
+
+
+@pytest.fixture
+def fast_cli(monkeypatch):
+    """main() arma su propio fetcher: sin esperas de cortesía contra el servidor local"""
+    monkeypatch.setattr(dji_fetcher, 'PolitenessScheduler',
+                        functools.partial(PolitenessScheduler, start_delay=0.01, min_delay=0.01))
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_batch_command_updates_json_outputs(site, tmp_path, monkeypatch, fast_cli, checkpoint):
+    monkeypatch.chdir(tmp_path)
+    options = ['--base-url', site.base_url, '--checkpoint', checkpoint]
+    run_cli(monkeypatch, *options, '--budget', '1')
+    run_cli(monkeypatch, *options, 'batch', '3')
+    run_cli(monkeypatch, *options, 'batch', '3')
+
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    visited = set(crawler.visited_urls)
+    assert len(visited) > 1
+    assert set(read_json('dji_docs_data.json')) == visited
+    progress = read_json('dji_crawl_progress.json')
+    assert progress['total_processed'] == len(visited)
+    assert set(progress['visited_urls']) == visited
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_interrupt_mid_page_consolidates_committed_pages(site, tmp_path, monkeypatch, checkpoint):
+    crawl(tmp_path / 'ref', monkeypatch, site.base_url, checkpoint=checkpoint)
+
+    # Ctrl+C entre los reportes de una página: ya escribió algunos, el checkpoint no la tiene
+    os.makedirs(tmp_path / 'cut')
+    monkeypatch.chdir(tmp_path / 'cut')
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    append_to_file = crawler.append_to_file
+    writes = []
+
+    def interrupted_append(filename, *chunks):
+        writes.append(filename)
+        if len(writes) == 12:
+            raise KeyboardInterrupt
+        append_to_file(filename, *chunks)
+
+    crawler.append_to_file = interrupted_append
+    with pytest.raises(KeyboardInterrupt):
+        crawler.start_crawl(site.base_url + 'index.html')
+
+    visited = set(crawler.visited_urls)
+    assert 0 < len(visited) < len(PAGES)
+    assert set(read_json('dji_docs_data.json')) == visited
+    assert read_json('dji_crawl_progress.json')['total_processed'] == len(visited)
+
+    resumed = make_crawler(site.base_url, checkpoint=checkpoint)
+    assert set(resumed.visited_urls) == visited
+    resumed.start_crawl()
+    assert sorted(report_urls(tmp_path / 'cut', 'dji_docs_full_content.txt')) == \
+        sorted(site.base_url + page for page in PAGES)
+    assert read_outputs(tmp_path / 'cut') == read_outputs(tmp_path / 'ref')
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_sigterm_consolidates_checkpoint(site, tmp_path, checkpoint):
+    site.gate_page = 'Gimbal.html'
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    process = subprocess.Popen([sys.executable, '-c', SIGTERM_SCRIPT, TESTS_DIR, site.base_url, checkpoint],
+                               cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert site.gate_reached.wait(60), "el crawler no llegó a Gimbal.html"
+        process.send_signal(signal.SIGTERM)
+        site.gate_page = None
+        site.gate_release.set()
+        assert process.wait(30) != 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+    progress = read_json(tmp_path / 'dji_crawl_progress.json')
+    data = read_json(tmp_path / 'dji_docs_data.json')
+    assert 0 < progress['total_processed'] < len(PAGES)
+    assert set(data) == set(progress['visited_urls'])
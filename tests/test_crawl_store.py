@@ -0,0 +1,87 @@
+"""
+Checkpoint en SQLite (CrawlStore) y frontera compartida entre workers (SQLiteFrontier)
+"""
+
+import json
+import time
+
+from crawl_helpers import crawl, make_crawler, read_outputs
+from dji_crawl_store import SQLiteFrontier
+
+
+def read_progress(directory):
+    with open(directory / 'dji_crawl_progress.json', 'r', encoding='utf-8') as f:
+        progress = json.load(f)
+    progress.pop('timestamp')
+    return progress
+
+
+def test_store_writes_the_same_json_as_the_journal(site, tmp_path, monkeypatch):
+    crawl(tmp_path / 'journal', monkeypatch, site.base_url, checkpoint='journal')
+
+    crawl(tmp_path / 'sqlite', monkeypatch, site.base_url, checkpoint='sqlite')
+
+    assert read_outputs(tmp_path / 'sqlite') == read_outputs(tmp_path / 'journal')
+    sqlite_progress = read_progress(tmp_path / 'sqlite')
+    journal_progress = read_progress(tmp_path / 'journal')
+    assert sorted(sqlite_progress.pop('visited_urls')) == sorted(journal_progress.pop('visited_urls'))
+    assert sqlite_progress == journal_progress
+
+
+def test_expired_lease_goes_back_to_another_worker(tmp_path):
+    path = str(tmp_path / 'frontier.db')
+    first = SQLiteFrontier(path, 'w1', lease_seconds=0.2)
+    second = SQLiteFrontier(path, 'w2', lease_seconds=0.2)
+    first.extend(['a', 'b', 'c'])
+
+    assert first.pop_batch(2) == ['a', 'b']
+    assert second.pop_batch(5) == ['c']
+    assert second.pop_batch(5) == []
+    assert len(second) == 3
+
+    # w1 murió sin cerrar su lote: al vencer el lease otro worker lo reclama
+    time.sleep(0.3)
+    second.renew_leases()
+    assert second.pop_batch(5) == ['a', 'b']
+    assert second.expired_leases == 2
+    for url in 'abc':
+        second.complete(url)
+    assert len(first) == 0
+    assert first.stats() == {'done': 3}
+    first.close()
+    second.close()
+
+
+def test_renewed_lease_is_not_taken_by_another_worker(tmp_path):
+    path = str(tmp_path / 'frontier.db')
+    first = SQLiteFrontier(path, 'w1', lease_seconds=0.3)
+    second = SQLiteFrontier(path, 'w2', lease_seconds=0.3)
+    first.extend(['a', 'b'])
+    assert first.pop_batch(2) == ['a', 'b']
+
+    time.sleep(0.2)
+    first.renew_leases()
+    time.sleep(0.2)
+    # Pasó más que el lease desde el reclamo, pero no desde la renovación
+    assert second.pop_batch(5) == []
+    assert 0 < second.seconds_until_next() <= 0.3
+    first.close()
+    second.close()
+
+
+def test_crawler_renews_leases_after_every_fetch_attempt(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    crawler = make_crawler(site.base_url, shared_frontier=str(tmp_path / 'frontier.db'), worker_id='w1')
+    renew_leases = crawler.shared_frontier.renew_leases
+    renewals = []
+
+    def counted_renew():
+        renewals.append(sum(site.hits.values()))
+        renew_leases()
+
+    crawler.shared_frontier.renew_leases = counted_renew
+    crawler.start_crawl(site.base_url + 'index.html')
+
+    # También después de los intentos fallidos (Broken.html, Missing.html)
+    assert renewals == list(range(1, sum(site.hits.values()) + 1))
+    assert site.hits['Broken.html'] == 2
@@ -0,0 +1,35 @@
+"""
+Crawls completos de DJIDocsCrawlerV3 contra el sitio local de tests/fixtures/site
+
+- modo concurrente igual al secuencial
+"""
+
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from crawl_helpers import PAGES, REPORTS, REPO_DIR, TESTS_DIR, crawl, make_crawler, read_outputs, report_urls
+
+def test_sequential_crawl_visits_every_page(site, tmp_path, monkeypatch):
+    crawler = crawl(tmp_path / 'seq', monkeypatch, site.base_url)
+
+    assert set(crawler.visited_urls) == {site.base_url + page for page in PAGES}
+    assert sorted(report_urls(tmp_path / 'seq', 'dji_docs_full_content.txt')) == sorted(crawler.visited_urls)
+    assert report_urls(tmp_path / 'seq', 'dji_media_manager_info.txt') == [site.base_url + 'Components/MediaManager.html']
+    assert len(crawler.camera_pages) == 2
+    # Cada página se descarga una vez: las variantes con #ancla no generan otro request
+    assert all(site.hits[page.rsplit('/', 1)[-1]] == 1 for page in PAGES)
+
+
+def test_concurrent_output_matches_sequential(site, tmp_path, monkeypatch):
+    crawl(tmp_path / 'seq', monkeypatch, site.base_url)
+    crawl(tmp_path / 'conc', monkeypatch, site.base_url, concurrency=4)
+
+    sequential = read_outputs(tmp_path / 'seq')
+    concurrent = read_outputs(tmp_path / 'conc')
+    assert concurrent[0] == sequential[0]     # mismo orden de páginas
+    assert concurrent[1] == sequential[1]
+    assert concurrent[2] == sequential[2]
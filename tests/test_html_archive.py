@@ -0,0 +1,42 @@
+"""
+Archivo de HTML crudo por crawler y reparse sin red
+"""
+
+from crawl_helpers import crawl, make_crawler, read_outputs
+from dji_html_archive import HTMLArchive, crawler_archive_dir
+
+EXTRA_PAGE = b'<html><head><title>Extra</title></head><body><pre>public void extra()</pre></body></html>'
+
+
+def test_reparse_rebuilds_outputs_from_its_own_archive(site, tmp_path, monkeypatch, capsys):
+    crawler = crawl(tmp_path, monkeypatch, site.base_url)
+    before = read_outputs(tmp_path)
+    assert crawler.archive.directory == crawler_archive_dir('v3')
+
+    # Otro crawler archivó una página del mismo sitio: el reparse de v3 no la toma
+    extra = site.base_url + 'Components/Extra.html'
+    HTMLArchive(crawler_archive_dir('explore')).store(extra, EXTRA_PAGE)
+
+    capsys.readouterr()
+    reparsed = make_crawler(site.base_url)
+    reparsed.reparse_from_archive(workers=2)
+    out = capsys.readouterr().out
+
+    assert extra not in reparsed.all_docs
+    assert read_outputs(tmp_path) == before
+    assert site.hits['Extra.html'] == 0
+    summary = reparsed.archive.summary()
+    assert summary['urls'] == len(crawler.visited_urls)
+    assert f"{summary['urls']} URLs, {summary['unique_bodies']} bodies distintos" in out
+
+
+def test_store_deduplicates_bodies_by_content(tmp_path):
+    archive = HTMLArchive(str(tmp_path / 'archive'))
+    first = archive.store('https://example.com/a.html', b'<html>igual</html>')
+    assert archive.store('https://example.com/b.html', b'<html>igual</html>') == first
+    archive.store('https://example.com/a.html', b'<html>nuevo</html>')
+
+    assert [entry['url'] for entry in archive.latest_entries()] == ['https://example.com/a.html',
+                                                                   'https://example.com/b.html']
+    assert archive.load(first) == b'<html>igual</html>'
+    assert archive.summary() == {'urls': 2, 'unique_bodies': 2, 'raw_bytes': 36}
@@ -0,0 +1,42 @@
+"""
+Cache HTTP con revalidación: un 304 se sirve con el body guardado en disco
+"""
+
+from crawl_helpers import fast_scheduler
+from dji_fetcher import DJIFetcher
+from dji_http_cache import HTTPCache
+
+
+def make_fetcher(directory):
+    return DJIFetcher(cache=HTTPCache(str(directory)), archive=False, scheduler=fast_scheduler())
+
+
+def test_not_modified_is_served_from_the_cached_body(site, tmp_path):
+    url = site.base_url + 'Components/Gimbal.html'
+    first = make_fetcher(tmp_path / 'cache').get(url)
+    assert not getattr(first, 'from_cache', False)
+
+    # Otra corrida con el mismo directorio: request condicional, el servidor responde 304
+    fetcher = make_fetcher(tmp_path / 'cache')
+    second = fetcher.get(url)
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.text == first.text
+    assert site.hits['Gimbal.html'] == 2
+    assert fetcher.http_cache.stats['revalidated'] == 1
+    assert fetcher.http_cache.stats['bytes_from_cache'] == len(first.content)
+    assert fetcher.stats['from_cache'] == 1
+
+
+def test_responses_without_validators_are_not_cached(site, tmp_path):
+    # Las páginas reemplazadas no mandan Last-Modified ni ETag
+    site.overrides['Gimbal.html'] = b'<html><head><title>Gimbal v2</title></head></html>'
+    url = site.base_url + 'Components/Gimbal.html'
+    fetcher = make_fetcher(tmp_path / 'cache')
+    fetcher.get(url)
+    assert fetcher.http_cache.lookup(url) is None
+
+    response = fetcher.get(url)
+    assert not getattr(response, 'from_cache', False)
+    assert fetcher.http_cache.stats['stored'] == 0
@@ -0,0 +1,124 @@
+"""
+Reportes de texto reanudables: cada salida vuelve a su offset del checkpoint
+
+- corte con SIGKILL a mitad del crawl y continue: cada URL una sola vez
+- continue con otro --output: los reportes que siguen no se truncan
+"""
+
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from crawl_helpers import PAGES, REPORTS, REPO_DIR, TESTS_DIR, crawl, make_crawler, read_outputs, report_urls
+from dji_output_sinks import OutputSinks
+
+# Proceso que se corta con SIGKILL: mismo crawler que los tests, en otro intérprete
+CRASH_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from crawl_helpers import make_crawler
+crawler = make_crawler(sys.argv[2], checkpoint=sys.argv[3])
+# Reportes sin buffer: lo escrito después del último checkpoint llega al disco
+for sink in crawler.sinks.sinks.values():
+    sink.buffer_size = 0
+crawler.start_crawl(sys.argv[2] + 'index.html')
+"""
+
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_resume_handles_each_sink_on_its_own(tmp_path):
+    paths = {name: str(tmp_path / f'{name}.txt') for name in ('trim', 'short', 'new', 'missing')}
+    write(paths['trim'], 'confirmado|sin confirmar')
+    write(paths['short'], 'corto')
+    write(paths['new'], 'de antes')
+    sinks = OutputSinks(paths.values())
+
+    offsets = {paths['trim']: len('confirmado'), paths['short']: 100, str(tmp_path / 'viejo.txt'): 7}
+    restart = sinks.resume(offsets)
+
+    # Solo se empieza de cero lo que no llega a su offset o no existe
+    assert sorted(restart) == sorted([paths['short'], paths['missing']])
+    assert read(paths['trim']) == 'confirmado'
+    assert read(paths['short']) == 'corto'
+    # Una salida que el checkpoint no conocía sigue al final de lo que había
+    sinks.write(paths['new'], '|nuevo')
+    sinks.close()
+    assert read(paths['new']) == 'de antes|nuevo'
+    assert sinks.offsets()[paths['new']] == len('de antes|nuevo')
+    assert not os.path.exists(tmp_path / 'viejo.txt')
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_continue_with_another_output_keeps_the_text_reports(site, tmp_path, monkeypatch, checkpoint):
+    crawl(tmp_path / 'ref', monkeypatch, site.base_url, checkpoint=checkpoint)
+
+    os.makedirs(tmp_path / 'switch')
+    monkeypatch.chdir(tmp_path / 'switch')
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    crawler.frontier = crawler.make_frontier([site.base_url + 'index.html'])
+    crawler.process_batch(3)
+    crawler.save_progress(compact=True)
+    crawler.checkpoint.close()
+    first = report_urls(tmp_path / 'switch', 'dji_docs_full_content.txt')
+    assert 0 < len(first) < len(PAGES)
+
+    # El continue suma el corpus: los reportes de texto siguen, el corpus empieza vacío
+    resumed = make_crawler(site.base_url, checkpoint=checkpoint, output='both')
+    resumed.start_crawl()
+    urls = report_urls(tmp_path / 'switch', 'dji_docs_full_content.txt')
+    assert urls[:len(first)] == first
+    assert sorted(urls) == sorted(site.base_url + page for page in PAGES)
+    assert read_outputs(tmp_path / 'switch') == read_outputs(tmp_path / 'ref')
+    assert resumed.corpus.records == len(PAGES) - len(first)
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_resume_after_kill_records_each_url_once(site, tmp_path, monkeypatch, checkpoint):
+    crawl(tmp_path / 'ref', monkeypatch, site.base_url, checkpoint=checkpoint)
+    site.reset()
+
+    # El proceso queda colgado en Gimbal.html (último lote) y se corta con SIGKILL:
+    # sin snapshot final y con páginas escritas después del último checkpoint
+    directory = tmp_path / 'crash'
+    os.makedirs(directory)
+    site.gate_page = 'Gimbal.html'
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    process = subprocess.Popen([sys.executable, '-c', CRASH_SCRIPT, TESTS_DIR, site.base_url, checkpoint],
+                               cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert site.gate_reached.wait(60), "el crawler no llegó a Gimbal.html"
+        process.send_signal(signal.SIGKILL)
+        process.wait(10)
+    finally:
+        if process.poll() is None:
+            process.kill()
+        site.gate_page = None
+        site.gate_release.set()
+
+    monkeypatch.chdir(directory)
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    assert crawler.resumed
+    assert 0 < len(crawler.visited_urls) < len(PAGES)
+    # Hay páginas en los reportes que el checkpoint no confirmó: el continue las descarta
+    assert len(report_urls(directory, 'dji_docs_full_content.txt')) > len(crawler.visited_urls)
+    crawler.start_crawl()
+
+    urls = report_urls(directory, 'dji_docs_full_content.txt')
+    assert sorted(urls) == sorted(site.base_url + page for page in PAGES)
+    for name in REPORTS[1:4]:
+        urls = report_urls(directory, name)
+        assert len(urls) == len(set(urls)), name
+    assert read_outputs(directory) == read_outputs(tmp_path / 'ref')
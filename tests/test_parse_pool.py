@@ -0,0 +1,41 @@
+"""
+Parseo en un pool de procesos (--parse-workers) en paralelo con las descargas
+"""
+
+import os
+
+from conftest import SITE_DIR
+from crawl_helpers import PAGES, crawl, make_crawler, read_outputs
+
+
+def test_parse_workers_output_matches_sequential(site, tmp_path, monkeypatch):
+    crawl(tmp_path / 'seq', monkeypatch, site.base_url)
+    crawler = crawl(tmp_path / 'pool', monkeypatch, site.base_url, concurrency=4, parse_workers=2)
+
+    # Los resultados se registran en orden de envío: mismas páginas, mismo orden, mismos reportes
+    assert read_outputs(tmp_path / 'pool') == read_outputs(tmp_path / 'seq')
+    assert crawler.parse_pool is None
+
+
+def test_parse_queue_bounds_pages_in_flight(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    crawler = make_crawler(site.base_url, parse_workers=1)
+    crawler.init_text_files()
+    consumed = []
+
+    def downloads():
+        for page in PAGES:
+            consumed.append(page)
+            with open(os.path.join(SITE_DIR, 'api-reference', 'android-api', *page.split('/')), 'rb') as f:
+                yield site.base_url + page, (f.read(), None)
+
+    try:
+        results = crawler.parse_pipeline(downloads())
+        # La primera página se registra con la cola llena, sin descargar de más
+        url, _ = next(results)
+        assert url == site.base_url + PAGES[0]
+        assert len(consumed) == crawler.parse_queue_size + 1
+        assert [url for url, _ in results] == [site.base_url + page for page in PAGES[1:]]
+    finally:
+        crawler.close_parse_pool()
+    assert set(crawler.visited_urls) == {site.base_url + page for page in PAGES}
@@ -0,0 +1,81 @@
+"""
+Scheduler de cortesía: 429/503 frenan el host y se respeta Retry-After
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from dji_fetcher import DJIFetcher
+from dji_politeness import PolitenessScheduler, parse_retry_after
+
+URL = 'https://developer.dji.com/api-reference/android-api/index.html'
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(' 0 ') == 0.0
+    when = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert 85 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 90
+    # Fecha pasada: no se espera, no se devuelve negativo
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('pronto') is None
+
+
+@pytest.mark.parametrize('status_code', [429, 503])
+def test_throttle_doubles_delay_and_pauses_for_retry_after(status_code):
+    scheduler = PolitenessScheduler(start_delay=1.0, min_delay=0.1, max_delay=60.0)
+    scheduler.reserve(URL)
+    scheduler.record(URL, 0.2, status_code, {'Retry-After': '30'})
+
+    stats = scheduler.stats()['developer.dji.com']
+    assert stats['delay'] == 2.0
+    assert stats['throttled'] == 1
+    assert 29 <= scheduler.reserve(URL) <= 30
+    # La latencia de un 429/503 no acelera el ritmo
+    assert stats['latency'] is None
+
+
+def test_throttle_without_retry_after_pauses_for_the_new_delay():
+    scheduler = PolitenessScheduler(start_delay=1.0, max_delay=3.0)
+    scheduler.reserve(URL)
+    scheduler.record(URL, 0.2, 503)
+    scheduler.record(URL, 0.2, 503)
+    # Tope en max_delay
+    assert scheduler.stats()['developer.dji.com']['delay'] == 3.0
+    assert 2.5 <= scheduler.reserve(URL) <= 3.0
+
+
+def test_other_errors_never_speed_up_the_host():
+    scheduler = PolitenessScheduler(start_delay=1.0, min_delay=0.1)
+    scheduler.record(URL, 0.01, 500)
+    assert scheduler.stats()['developer.dji.com']['delay'] == 1.0
+    scheduler.record(URL, 0.01, 200)
+    assert scheduler.stats()['developer.dji.com']['delay'] < 1.0
+
+
+def test_fetcher_waits_retry_after_then_gets_the_page(site):
+    site.statuses['Gimbal.html'] = [(429, {'Retry-After': '1'}), (503, {})]
+    scheduler = PolitenessScheduler(start_delay=0.01, min_delay=0.01, max_delay=0.2)
+    fetcher = DJIFetcher(cache=False, archive=False, scheduler=scheduler)
+
+    started = time.monotonic()
+    response = fetcher.get(site.base_url + 'Components/Gimbal.html')
+    assert b'Gimbal' in response.content
+    assert time.monotonic() - started >= 0.9
+    assert site.hits['Gimbal.html'] == 3
+    assert fetcher.stats['throttled'] == 2
+
+
+def test_fetcher_gives_up_after_max_throttle_retries(site):
+    site.statuses['Gimbal.html'] = [(429, {'Retry-After': '0'})] * 5
+    scheduler = PolitenessScheduler(start_delay=0.01, min_delay=0.01, max_delay=0.05)
+    fetcher = DJIFetcher(cache=False, archive=False, scheduler=scheduler, max_throttle_retries=2)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetcher.get(site.base_url + 'Components/Gimbal.html')
+    assert site.hits['Gimbal.html'] == 3
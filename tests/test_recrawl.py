@@ -0,0 +1,92 @@
+"""
+Refresh con calendario adaptativo: solo las páginas que cambiaron se vuelven a registrar
+"""
+
+import collections
+
+import pytest
+
+from crawl_helpers import crawl, make_crawler
+import dji_docs_crawler_v3
+
+DAY = 24 * 3600
+
+
+def component_page(title, methods, link):
+    body = ''.join(f'<div class="method"><pre>{method}</pre></div>' for method in methods)
+    return (f'<html><head><title>{title}</title></head><body><h1>{title}</h1>{body}'
+            f'<a href="{link}">{link}</a></body></html>').encode('utf-8')
+
+
+# Más de 20 métodos (los docs guardan solo los primeros 20) y los primeros
+# iguales en dos páginas: Battery y Gimbal comparten nombres de métodos
+COMMON = [f'public void getSharedValue{i}(CompletionCallback callback)' for i in range(20)]
+BATTERY_V2 = component_page('Battery v2', COMMON + [f'public int getCell{i}Voltage()' for i in range(5)],
+                            'FlightController.html')
+GIMBAL_V2 = component_page('Gimbal v2', COMMON + [f'public void setAxis{i}(float angle)' for i in range(5)],
+                           'FlightController.html')
+GIMBAL_V3 = component_page('Gimbal v3', ['public void reset(CompletionCallback callback)'],
+                           'FlightController.html')
+
+
+def refresh(checkpoint, site):
+    """Refresh con todo el calendario vencido; devuelve el crawler recargado desde el checkpoint"""
+    crawler = make_crawler(site.base_url, checkpoint=checkpoint)
+    entries = crawler.recrawl.entries
+    for url in list(entries):
+        entry = entries[url]
+        entry['last_checked'] -= 60 * DAY
+        entries[url] = entry
+    crawler.refresh()
+    crawler.checkpoint.close()
+    return make_crawler(site.base_url, checkpoint=checkpoint)
+
+
+def method_counts(crawler):
+    return collections.Counter(crawler.all_methods)
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_refresh_replaces_only_the_changed_page(site, tmp_path, monkeypatch, checkpoint):
+    crawl(tmp_path / 'crawl', monkeypatch, site.base_url, checkpoint=checkpoint)
+    gimbal = site.base_url + 'Components/Gimbal.html'
+
+    # Battery cambia primero y después Gimbal: sus métodos quedan en ese orden al final
+    site.overrides['Battery.html'] = BATTERY_V2
+    refresh(checkpoint, site)
+    site.overrides['Gimbal.html'] = GIMBAL_V2
+    refresh(checkpoint, site)
+    site.overrides['Gimbal.html'] = GIMBAL_V3
+    crawler = refresh(checkpoint, site)
+
+    assert crawler.all_docs[gimbal]['title'] == 'Gimbal v3'
+    # Los métodos viejos de Gimbal se quitan por su URL: los de Battery (mismos nombres) quedan
+    reference = crawl(tmp_path / 'fresh', monkeypatch, site.base_url, checkpoint=checkpoint)
+    assert method_counts(crawler) == method_counts(reference)
+    assert len(crawler.all_methods) == sum(doc['methods_count'] for doc in crawler.all_docs.values())
+
+
+@pytest.mark.parametrize('checkpoint', ['sqlite', 'journal'])
+def test_refresh_parse_failure_keeps_the_page_due(site, tmp_path, monkeypatch, checkpoint):
+    crawl(tmp_path / 'crawl', monkeypatch, site.base_url, checkpoint=checkpoint)
+    gimbal = site.base_url + 'Components/Gimbal.html'
+    methods_before = method_counts(make_crawler(site.base_url, checkpoint=checkpoint))
+
+    parse_page = dji_docs_crawler_v3.parse_page
+
+    def failing_parse(url, html, base_url):
+        if url == gimbal:
+            raise ValueError("HTML roto")
+        return parse_page(url, html, base_url)
+
+    site.overrides['Gimbal.html'] = GIMBAL_V3
+    monkeypatch.setattr(dji_docs_crawler_v3, 'parse_page', failing_parse)
+    crawler = refresh(checkpoint, site)
+    assert crawler.all_docs[gimbal]['title'] == 'Gimbal - DJI Mobile SDK'
+    assert method_counts(crawler) == methods_before
+    assert crawler.recrawl.entries[gimbal]['changes'] == 1
+
+    # El próximo refresh la vuelve a tomar como cambiada y ahora sí la registra
+    monkeypatch.setattr(dji_docs_crawler_v3, 'parse_page', parse_page)
+    crawler = refresh(checkpoint, site)
+    assert crawler.all_docs[gimbal]['title'] == 'Gimbal v3'
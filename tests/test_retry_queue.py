@@ -0,0 +1,73 @@
+"""
+Cola de reintentos: backoff exponencial, plazo total y cuarentena por URL
+"""
+
+from crawl_helpers import crawl, make_crawler
+from dji_retry_queue import RetryQueue
+
+
+def test_backoff_doubles_up_to_max_delay():
+    queue = RetryQueue(base_delay=10, max_delay=35, jitter=0)
+    assert [queue.backoff(attempts) for attempts in range(1, 5)] == [10, 20, 35, 35]
+
+
+def test_failures_are_rescheduled_until_attempts_run_out():
+    queue = RetryQueue(base_delay=10, max_attempts=3, jitter=0)
+    url = 'https://example.com/Gimbal.html'
+    assert queue.record_failure(url, 'HTTP 500', now=1000) == 'retry'
+    assert queue.due(now=1005) == []
+    assert queue.due(now=1010) == [url]
+    assert queue.seconds_until_next(now=1004) == 6
+
+    assert queue.record_failure(url, 'HTTP 500', now=1010) == 'retry'
+    assert queue.entries[url]['next_attempt'] == 1030
+    assert queue.record_failure(url, 'HTTP 500', now=1030) == 'quarantined'
+    assert url not in queue
+    assert queue.quarantined[url]['reason'] == 'intentos agotados'
+
+
+def test_deadline_and_permanent_errors_go_to_quarantine():
+    queue = RetryQueue(base_delay=10, max_attempts=10, deadline=100, jitter=0)
+    queue.record_failure('a', 'timeout', now=1000)
+    assert queue.record_failure('a', 'timeout', now=1100) == 'quarantined'
+    assert queue.quarantined['a']['reason'] == 'plazo vencido'
+    assert queue.record_failure('b', 'HTTP 404', now=1000, permanent=True) == 'quarantined'
+    assert queue.quarantined['b']['reason'] == 'error permanente'
+
+    restored = RetryQueue()
+    restored.load_dict(queue.to_dict())
+    assert sorted(restored.release_quarantine()) == ['a', 'b']
+    assert not restored.quarantined
+
+
+def test_advance_moves_the_schedule_without_waiting():
+    queue = RetryQueue(base_delay=30, jitter=0)
+    queue.record_failure('a', 'HTTP 503', now=1000)
+    queue.advance(30)
+    assert queue.due(now=1000) == ['a']
+    assert queue.entries['a']['first_failure'] == 970
+
+
+def test_failed_pages_are_retried_with_backoff_then_quarantined(site, tmp_path, monkeypatch):
+    crawler = crawl(tmp_path / 'retry', monkeypatch, site.base_url, retry_delay=0.2, max_attempts=3)
+    broken = site.base_url + 'Components/Broken.html'
+    missing = site.base_url + 'Components/Missing.html'
+
+    # 404: error permanente, un solo intento
+    assert site.hits['Missing.html'] == 1
+    assert crawler.retry_queue.quarantined[missing]['reason'] == 'error permanente'
+
+    # 500: tres intentos, cada uno después de su backoff aunque otras páginas
+    # (MediaManager, PlaybackManager, MediaFile) lo vuelvan a enlazar
+    assert site.hits['Broken.html'] == 3
+    times = site.hit_times['Broken.html']
+    assert times[1] - times[0] >= 0.2 * 0.9
+    assert times[2] - times[1] >= 0.4 * 0.9
+    assert crawler.retry_queue.quarantined[broken]['attempts'] == 3
+    assert crawler.retry_queue.quarantined[broken]['reason'] == 'intentos agotados'
+    assert broken not in crawler.visited_urls and missing not in crawler.visited_urls
+
+    # La cuarentena sobrevive al checkpoint y no se vuelve a encolar
+    resumed = make_crawler(site.base_url)
+    assert set(resumed.retry_queue.quarantined) == {broken, missing}
+    assert not resumed.frontier and not len(resumed.retry_queue)
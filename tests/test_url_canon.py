@@ -0,0 +1,48 @@
+"""
+Canonicalización de URLs: las variantes de una misma página colapsan en una
+"""
+
+import pytest
+
+from dji_url_canon import URLCanonicalizer, canonicalize_url
+
+BASE = 'https://developer.dji.com/api-reference/android-api/'
+
+
+@pytest.mark.parametrize('variant', [
+    BASE + 'Components/Camera.html#getMode',
+    BASE + 'Components/./Camera.html',
+    BASE + 'Components/Gimbal/../Camera.html',
+    BASE + 'Components//Camera.html',
+    'HTTPS://Developer.DJI.com:443/api-reference/android-api/Components/Camera.html',
+    BASE + 'Components/Camera.html?utm_source=mail&gclid=abc',
+    ' ' + BASE + 'Components/Camera.html\n',
+])
+def test_variants_collapse_to_one_url(variant):
+    assert canonicalize_url(variant) == BASE + 'Components/Camera.html'
+
+
+def test_directories_point_to_their_index():
+    assert canonicalize_url(BASE) == BASE + 'index.html'
+    assert canonicalize_url(BASE + 'Components/.') == BASE + 'Components/index.html'
+    assert canonicalize_url('https://developer.dji.com') == 'https://developer.dji.com/index.html'
+
+
+def test_query_is_sorted_and_kept_when_it_changes_the_page():
+    assert canonicalize_url(BASE + 'search.html?b=2&a=1&utm_medium=x&a=0') == BASE + 'search.html?a=0&a=1&b=2'
+    assert canonicalize_url(BASE + 'search.html?q=') == BASE + 'search.html?q='
+
+
+def test_other_ports_and_schemes_are_kept():
+    assert canonicalize_url('http://127.0.0.1:8000/docs/') == 'http://127.0.0.1:8000/docs/index.html'
+    assert canonicalize_url('mailto:dev@dji.com') == 'mailto:dev@dji.com'
+
+
+def test_canonicalizer_counts_collapsed_variants():
+    canon = URLCanonicalizer()
+    for url in [BASE + 'Components/Camera.html', BASE + 'Components/Camera.html#a',
+                BASE + 'Components/Camera.html#b', BASE + 'Components/Camera.html#a', BASE]:
+        canon.canonical(url)
+    assert len(canon.variants) == 2
+    assert canon.rewritten == 3
+    assert canon.saved_fetches() == 2